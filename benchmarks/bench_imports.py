@@ -0,0 +1,110 @@
+"""Check the import time, memory and dependencies of the engine's entry points.
+
+Each module is imported in a fresh interpreter, as a pool worker would, and
+compared with importing numpy and pandas alone, which every entry point needs
+anyway. The script exits with status 1 when a module exceeds its time or
+memory budget over that baseline, or loads a dependency it should only load
+on use (xgboost, scipy, matplotlib, yfinance...).
+
+Usage:
+    python benchmarks/bench_imports.py [--repeat 5] [--scale 1.0] [--output imports.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Dependencies no entry point may import eagerly.
+HEAVY = ("xgboost", "sklearn", "scipy", "matplotlib", "yfinance", "flask")
+
+# module -> (seconds, MB of peak RSS) allowed on top of the numpy + pandas baseline.
+BUDGETS = {
+    "src": (0.05, 10),
+    "src.strategies": (0.15, 20),
+    "src.strategies.mean_reversion": (0.15, 20),
+    "src.data_pipeline": (0.15, 20),
+    "src.engine.backtester": (0.25, 30),
+    "src.engine.jobs": (0.25, 30),
+}
+
+BASELINE = "numpy, pandas"
+
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss /= 1024
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss / 1024, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module: str, repeat: int) -> dict:
+    """Fastest of *repeat* cold imports of *module* and the heavy dependencies it loaded."""
+    runs = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            cwd=ROOT, check=True, capture_output=True, text=True,
+        ).stdout
+        runs.append(json.loads(output.splitlines()[-1]))
+    best = min(runs, key=lambda run: run["seconds"])
+    loaded = {name.split(".")[0] for name in best["modules"]}
+    return {
+        "module": module,
+        "seconds": best["seconds"],
+        "rss_mb": best["rss_mb"],
+        "heavy": sorted(loaded & set(HEAVY)),
+    }
+
+
+def run(repeat: int, scale: float) -> list:
+    baseline = probe(BASELINE, repeat)
+    print(f"{'module':<32}{'import':>10}{'over base':>11}{'RSS':>9}{'over base':>11}  status")
+    print(f"{BASELINE:<32}{baseline['seconds']:>9.3f}s{'':>11}{baseline['rss_mb']:>6.0f} MB")
+    rows = []
+    for module, (seconds, megabytes) in BUDGETS.items():
+        row = probe(module, repeat)
+        row["extra_seconds"] = row["seconds"] - baseline["seconds"]
+        row["extra_rss_mb"] = row["rss_mb"] - baseline["rss_mb"]
+        problems = []
+        if row["extra_seconds"] > seconds * scale:
+            problems.append(f"time over {seconds * scale:.2f}s")
+        if row["extra_rss_mb"] > megabytes * scale:
+            problems.append(f"RSS over {megabytes * scale:.0f} MB")
+        if row["heavy"]:
+            problems.append("loads " + ", ".join(row["heavy"]))
+        row["problems"] = problems
+        rows.append(row)
+        print(
+            f"{module:<32}{row['seconds']:>9.3f}s{row['extra_seconds']:>+10.3f}s"
+            f"{row['rss_mb']:>6.0f} MB{row['extra_rss_mb']:>+8.0f} MB  {'; '.join(problems) or 'ok'}"
+        )
+    return [baseline] + rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import-time budget check")
+    parser.add_argument("--repeat", type=int, default=5, help="Cold imports per module; the fastest counts")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply every budget, e.g. on slow CI machines")
+    parser.add_argument("--output", default=None, help="Write the measurements as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.repeat, args.scale)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    failed = [row["module"] for row in rows[1:] if row["problems"]]
+    if failed:
+        print(f"Over budget: {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""Benchmark the C++ rolling kernels against pandas' rolling() equivalents.
+
+Usage:
+    python benchmarks/bench_rolling.py [--length 1000000] [--windows 20 50 200] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from src.cpp import bridge
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def run(length: int, windows, repeat: int) -> list:
+    rng = np.random.default_rng(42)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, length)))
+    series = pd.Series(close)
+    rows = []
+
+    for op, pandas_func, single_func, multi_func in (
+        ("sma", lambda w: series.rolling(w).mean().to_numpy(), bridge.calculate_sma, bridge.calculate_sma_multi),
+        ("stddev", lambda w: series.rolling(w).std().to_numpy(), bridge.calculate_stddev, bridge.calculate_stddev_multi),
+    ):
+        pandas_time, expected = best_of(repeat, lambda: np.vstack([pandas_func(w) for w in windows]))
+        single_time, single = best_of(repeat, lambda: np.vstack([single_func(close, w) for w in windows]))
+        multi_time, multi = best_of(repeat, lambda: multi_func(close, windows))
+
+        rows.append({
+            "op": op,
+            "length": length,
+            "windows": list(windows),
+            "pandas_s": pandas_time,
+            "cpp_single_s": single_time,
+            "cpp_multi_s": multi_time,
+            "speedup_multi_vs_pandas": pandas_time / multi_time,
+            "max_rel_diff": float(np.nanmax(np.abs(multi - expected) / np.maximum(np.abs(expected), 1e-12))),
+            "nan_pattern_equal": bool(np.array_equal(np.isnan(multi), np.isnan(expected))),
+            "single_equals_multi": bool(np.allclose(single, multi, equal_nan=True)),
+        })
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--length", type=int, default=1_000_000)
+    parser.add_argument("--windows", type=int, nargs="+", default=[20, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = run(args.length, args.windows, args.repeat)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+
+    print(f"{'op':<8}{'pandas':>12}{'cpp':>12}{'cpp multi':>12}{'speedup':>10}{'max rel diff':>14}")
+    for row in rows:
+        print(
+            f"{row['op']:<8}{row['pandas_s']:>11.4f}s{row['cpp_single_s']:>11.4f}s"
+            f"{row['cpp_multi_s']:>11.4f}s{row['speedup_multi_vs_pandas']:>9.1f}x{row['max_rel_diff']:>14.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+"""Time and memory-profile the data loader, strategies, backtester and C++ kernels.
+
+Every benchmark runs on reproducible synthetic data (see synthetic.py) and the
+results are written as JSON, so runs on different commits can be compared.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--bars 1000 100000] [--tickers 1 100] [--model gbm]
+                                        [--suites loader strategies backtester bridge panel]
+                                        [--repeat 3] [--output benchmark_results.json]
+    python benchmarks/run_benchmarks.py --compare old.json new.json
+"""
+import argparse
+import contextlib
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import synthetic
+
+SUITES = ("loader", "strategies", "backtester", "bridge", "panel")
+
+# (module, class, kwargs) for every strategy; modules are imported one by one so
+# a missing optional dependency only skips the strategies that need it.
+STRATEGIES = (
+    ("src.strategies.buy_and_hold", "BuyAndHoldStrategy", {}),
+    ("src.strategies.mean_reversion", "MeanReversionStrategy", {}),
+    ("src.strategies.trend_following", "TrendFollowingStrategy", {}),
+    ("src.strategies.numpy_momentum", "MomentumStrategy", {}),
+    ("src.strategies.cpp_strategy", "CppStrategy", {}),
+    ("src.strategies.xgboost", "XGBoostStrategy", {}),
+)
+
+# Strategies run together by the backtester suite; the ML strategy is left out
+# so the timing reflects the engine rather than model training.
+BACKTEST_STRATEGIES = ("BuyAndHoldStrategy", "MeanReversionStrategy", "TrendFollowingStrategy",
+                       "MomentumStrategy", "CppStrategy")
+
+BRIDGE_WINDOW = 20
+
+
+def freq_for(n_bars: int) -> str:
+    """Daily bars while the calendar fits pandas' timestamp range, minute bars beyond that."""
+    return "D" if n_bars <= 80_000 else "min"
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the engine's progress prints so they neither skew timings nor clutter output."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def measure(func, repeat: int, setup=None) -> dict:
+    """Time ``func(*setup())`` *repeat* times, then run it once more under tracemalloc.
+
+    *setup* runs outside the timed and traced region, so per-call preparation
+    (fresh copies, clearing caches) is not counted.
+    """
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        with quiet():
+            start = time.perf_counter()
+            func(*args)
+            timings.append(time.perf_counter() - start)
+
+    args = setup() if setup else ()
+    tracemalloc.start()
+    try:
+        with quiet():
+            func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(timings),
+        "mean_s": sum(timings) / len(timings),
+        "repeat": repeat,
+        "peak_mb": peak / 2 ** 20,
+    }
+
+
+def record(results: list, suite: str, name: str, bars: int, tickers: int, func, repeat: int, setup=None, **extra):
+    """Run one benchmark and append its result; failures are recorded rather than raised."""
+    entry = {"suite": suite, "name": name, "bars": bars, "tickers": tickers}
+    try:
+        entry.update(measure(func, repeat, setup))
+        entry["bars_per_s"] = bars * tickers / entry["best_s"] if entry["best_s"] > 0 else None
+        entry.update(extra)
+    except Exception as e:
+        entry["error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+    results.append(entry)
+    status = entry.get("error") or f"{entry['best_s']:.4f}s  peak {entry['peak_mb']:.1f} MB"
+    print(f"  {suite:<11}{name:<40}{bars:>12,}{tickers:>7}  {status}", file=sys.stderr)
+    return entry
+
+
+def load_strategies() -> dict:
+    classes = {}
+    for module_name, class_name, kwargs in STRATEGIES:
+        try:
+            cls = getattr(importlib.import_module(module_name), class_name)
+        except Exception as e:
+            print(f"  skipping {class_name}: {type(e).__name__}: {e}", file=sys.stderr)
+            continue
+        classes[class_name] = (cls, kwargs)
+    return classes
+
+
+def bench_loader(results, bars, tickers, model, repeat):
+    tmp = tempfile.mkdtemp(prefix="bench_loader_")
+    try:
+        # Intraday fixtures exercise the resample step the way real downloads do.
+        frames = synthetic.universe(tickers, bars, model=model, freq="min")
+        for ticker, frame in frames.items():
+            synthetic.write_csv_fixture(frame, os.path.join(tmp, f"{ticker}.csv"))
+
+        from src.data_pipeline import DataLoader
+        cache_dir = os.path.join(tmp, ".cache")
+
+        def load_all(loader):
+            for ticker in frames:
+                loader.load_data(ticker)
+
+        def clear_cache():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            return ()
+
+        record(results, "loader", "load_data[csv]", bars, tickers,
+               lambda: load_all(DataLoader(data_dir=tmp, use_cache=False)), repeat)
+        record(results, "loader", "load_data[csv+cache write]", bars, tickers,
+               lambda: load_all(DataLoader(data_dir=tmp)), repeat, setup=clear_cache)
+        with quiet():
+            load_all(DataLoader(data_dir=tmp))
+        record(results, "loader", "load_data[cache]", bars, tickers,
+               lambda: load_all(DataLoader(data_dir=tmp)), repeat)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_strategies(results, bars, model, repeat, classes):
+    df = synthetic.ohlcv_frame(bars, model=model, freq=freq_for(bars))
+
+    for class_name, (cls, kwargs) in classes.items():
+        record(results, "strategies", f"{class_name}.generate_features", bars, 1,
+               lambda s, frame: s.generate_features(frame), repeat,
+               setup=lambda: (cls(**kwargs), df.copy()))
+
+        def with_features():
+            # Strategies may keep state from generate_features (e.g. the feature list).
+            strategy = cls(**kwargs)
+            with quiet():
+                return strategy, strategy.generate_features(df.copy())
+
+        record(results, "strategies", f"{class_name}.generate_signals", bars, 1,
+               lambda s, frame: s.generate_signals(frame), repeat, setup=with_features)
+
+
+def bench_backtester(results, bars, model, repeat, classes):
+    from src.engine.backtester import Backtester
+
+    df = synthetic.ohlcv_frame(bars, model=model, freq=freq_for(bars))
+    selected = [classes[name] for name in BACKTEST_STRATEGIES if name in classes]
+
+    def make():
+        return (Backtester(df, [cls(**kwargs) for cls, kwargs in selected]),)
+
+    record(results, "backtester", "Backtester.run", bars, 1, lambda bt: bt.run(), repeat,
+           setup=make, strategies=len(selected))
+
+    def make_run():
+        (bt,) = make()
+        with quiet():
+            bt.run()
+        return (bt,)
+
+    record(results, "backtester", "Backtester.get_metrics", bars, 1, lambda bt: bt.get_metrics(), repeat,
+           setup=make_run, strategies=len(selected))
+    record(results, "backtester", "Backtester.bootstrap[1000 paths]", bars, 1,
+           lambda bt: bt.bootstrap(n_paths=1_000, seed=0), repeat, setup=make_run, strategies=len(selected))
+    record(results, "backtester", "Portfolio.evaluate[weight grid 0.05]", bars, 1,
+           lambda portfolio: portfolio.evaluate(step=0.05, rebalance=21), repeat,
+           setup=lambda: (make_run()[0].portfolio(),), strategies=len(selected))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "equity.png")
+        record(results, "backtester", "Backtester.plot_equity[png 1200px]", bars, 1,
+               lambda bt: bt.plot_equity(path, width=1200), repeat, setup=make_run, strategies=len(selected))
+
+    if "MeanReversionStrategy" in classes:
+        grid = {"short_window": list(range(5, 55, 5)), "long_window": list(range(60, 260, 20))}
+        record(results, "backtester", "Backtester.sweep[MeanReversion 10x10]", bars, 1,
+               lambda bt: bt.sweep(classes["MeanReversionStrategy"][0], grid), repeat,
+               setup=lambda: (Backtester(df, []),))
+
+
+def bench_panel(results, bars, tickers, model, repeat):
+    from src.engine.panel import Panel
+    from src.engine.panel_backtester import PanelBacktester
+    from src.strategies.cross_sectional_momentum import CrossSectionalMomentum
+
+    generator = {"gbm": synthetic.gbm_close, "regime": synthetic.regime_switching_close}[model]
+    closes = generator(bars, n_tickers=tickers, seed=0)
+    index = pd.date_range("2000-01-01", periods=bars, freq=freq_for(bars), tz="UTC", name="Date")
+    lookback = min(252, max(bars // 4, 2))
+
+    def make():
+        panel = Panel(index, [f"T{i:05d}" for i in range(tickers)], {"Close": closes})
+        strategy = CrossSectionalMomentum(lookback=lookback, skip=lookback // 12, rebalance=21)
+        return (PanelBacktester(panel, [strategy]),)
+
+    record(results, "panel", "PanelBacktester.run[CrossSectionalMomentum]", bars, tickers,
+           lambda bt: bt.run(), repeat, setup=make)
+
+
+def _pandas_rsi(frame: pd.DataFrame, window: int) -> pd.DataFrame:
+    change = frame.diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / window, adjust=False).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / window, adjust=False).mean()
+    return 100 - 100 / (1 + gain / loss)
+
+
+def _pandas_drawdown(frame: pd.DataFrame) -> pd.DataFrame:
+    peak = frame.cummax()
+    return (frame - peak) / peak
+
+
+def bench_bridge(results, bars, tickers, model, repeat):
+    from src.cpp import bridge
+
+    generator = {"gbm": synthetic.gbm_close, "regime": synthetic.regime_switching_close}[model]
+    closes = generator(bars, n_tickers=tickers)
+    # pandas works column-wise, so it gets the (bars, tickers) layout it is fastest on.
+    frame = pd.DataFrame(closes.T)
+    data = closes[0] if tickers == 1 else closes
+    w = BRIDGE_WINDOW
+
+    # (name, C++ call, pandas equivalent, exact): EMA and RSI are seeded with a
+    # simple average in C++, so their values only converge to pandas' after warm-up.
+    ops = (
+        ("sma", lambda: bridge.calculate_sma(data, w), lambda: frame.rolling(w).mean(), True),
+        ("ema", lambda: bridge.calculate_ema(data, w), lambda: frame.ewm(span=w, adjust=False).mean(), False),
+        ("rsi", lambda: bridge.calculate_rsi(data, w), lambda: _pandas_rsi(frame, w), False),
+        ("stddev", lambda: bridge.calculate_stddev(data, w), lambda: frame.rolling(w).std(), True),
+        ("max_drawdown", lambda: bridge.calculate_max_drawdown(data), lambda: _pandas_drawdown(frame), True),
+    )
+
+    for op, cpp_func, pandas_func, exact in ops:
+        pandas_entry = record(results, "bridge", f"pandas.{op}", bars, tickers, pandas_func, repeat)
+        extra = {"exact_equivalent": exact}
+        try:
+            expected = pandas_func().to_numpy().T.reshape(np.shape(data))
+            actual = cpp_func()
+            tail = slice(None) if exact else (Ellipsis, slice(10 * w, None))
+            diff = np.abs(actual[tail] - expected[tail]) / np.maximum(np.abs(expected[tail]), 1e-12)
+            extra["max_rel_diff"] = float(np.nanmax(diff)) if np.isfinite(diff).any() else None
+        except Exception:
+            pass
+        cpp_entry = record(results, "bridge", f"bridge.calculate_{op}", bars, tickers, cpp_func, repeat, **extra)
+        if "best_s" in cpp_entry and "best_s" in pandas_entry:
+            cpp_entry["speedup_vs_pandas"] = pandas_entry["best_s"] / cpp_entry["best_s"]
+
+        # The same indicator on the NumPy and pandas backends, which follow the
+        # kernel's seeding, so they should agree with it to rounding.
+        function = getattr(bridge, f"calculate_{op}")
+        args = () if op == "max_drawdown" else (w,)
+        for backend in ("numpy", "pandas"):
+            extra = {}
+            try:
+                native = function(data, *args, backend="native")
+                actual = function(data, *args, backend=backend)
+                diff = np.abs(actual - native) / np.maximum(np.abs(native), 1e-12)
+                extra["max_rel_diff_vs_native"] = float(np.nanmax(diff)) if np.isfinite(diff).any() else None
+                extra["nan_mask_equal"] = bool((np.isnan(actual) == np.isnan(native)).all())
+            except Exception:
+                pass
+            entry = record(results, "bridge", f"bridge.calculate_{op}[{backend}]", bars, tickers,
+                           lambda: function(data, *args, backend=backend), repeat, **extra)
+            if "best_s" in entry and "best_s" in cpp_entry:
+                entry["native_speedup"] = entry["best_s"] / cpp_entry["best_s"]
+
+    # Path-dependent execution: one signal row per ticker over the first ticker's prices.
+    close = closes[0]
+    signals = np.sign(np.sin(np.arange(bars) / 50.0 + np.arange(tickers)[:, None]))
+    params = (0.001, 0.05, 0.1, 0.03, 100)
+    entry = record(results, "bridge", "bridge.simulate_execution", bars, tickers,
+                   lambda: bridge.simulate_execution(close, close * 1.01, close * 0.99, close,
+                                                     signals[0] if tickers == 1 else signals, params), repeat)
+    if "best_s" in entry:
+        entry["bars_per_second"] = bars * tickers / entry["best_s"]
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True
+        ).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        commit, dirty = None, None
+    try:
+        from src.cpp import bridge
+
+        backend = bridge.get_backend()
+    except Exception:
+        backend = None
+
+    return {
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": commit,
+        "dirty": dirty,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "analytics_backend": backend,
+    }
+
+
+def run(bars_sizes, ticker_counts, model, suites, repeat) -> dict:
+    classes = load_strategies() if {"strategies", "backtester"} & set(suites) else {}
+    results = []
+
+    def suite(name, bars, tickers, func, *args):
+        if name not in suites:
+            return
+        try:
+            func(results, bars, *args)
+        except Exception as e:
+            # e.g. an optional dependency the suite imports is missing
+            results.append({"suite": name, "name": "*", "bars": bars, "tickers": tickers,
+                            "error": f"{type(e).__name__}: {e}"})
+            print(f"  {name:<11}failed: {type(e).__name__}: {e}", file=sys.stderr)
+
+    for bars in bars_sizes:
+        suite("strategies", bars, 1, bench_strategies, model, repeat, classes)
+        suite("backtester", bars, 1, bench_backtester, model, repeat, classes)
+        for tickers in ticker_counts:
+            suite("loader", bars, tickers, bench_loader, tickers, model, repeat)
+            suite("bridge", bars, tickers, bench_bridge, tickers, model, repeat)
+            suite("panel", bars, tickers, bench_panel, tickers, model, repeat)
+
+    return {
+        "environment": environment(),
+        "config": {"bars": list(bars_sizes), "tickers": list(ticker_counts), "model": model,
+                   "suites": list(suites), "repeat": repeat},
+        "results": results,
+    }
+
+
+def compare(old_path: str, new_path: str) -> None:
+    """Print the best-time ratio (new / old) of every benchmark present in both files."""
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+
+    def keyed(report):
+        return {(r["suite"], r["name"], r["bars"], r["tickers"]): r for r in report["results"] if "best_s" in r}
+
+    old_results, new_results = keyed(old), keyed(new)
+    print(f"{old['environment'].get('commit')} -> {new['environment'].get('commit')}")
+    print(f"{'benchmark':<52}{'bars':>12}{'tickers':>8}{'old':>11}{'new':>11}{'ratio':>8}")
+    for key in sorted(old_results.keys() & new_results.keys()):
+        suite, name, bars, tickers = key
+        before, after = old_results[key]["best_s"], new_results[key]["best_s"]
+        print(f"{suite + ':' + name:<52}{bars:>12,}{tickers:>8}{before:>10.4f}s{after:>10.4f}s{after / before:>7.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--tickers", type=int, nargs="+", default=[1, 100],
+                        help="Ticker counts for the loader, bridge and panel suites")
+    parser.add_argument("--model", choices=("gbm", "regime"), default="gbm")
+    parser.add_argument("--suites", nargs="+", choices=SUITES, default=list(SUITES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="Compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run(args.bars, args.tickers, args.model, args.suites, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
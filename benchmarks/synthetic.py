@@ -0,0 +1,77 @@
+"""Reproducible synthetic OHLCV generators for benchmarks.
+
+All generators are seeded and fully vectorized, so the same arguments always
+produce the same data regardless of size.
+"""
+import numpy as np
+import pandas as pd
+
+
+def gbm_close(n_bars: int, n_tickers: int = 1, mu: float = 0.0002, sigma: float = 0.02,
+              start_price: float = 100.0, seed: int = 0, dtype=np.float64) -> np.ndarray:
+    """Geometric Brownian motion close prices, shape (n_tickers, n_bars)."""
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(mu - 0.5 * sigma ** 2, sigma, size=(n_tickers, n_bars)).astype(dtype)
+    log_returns[:, 0] = 0
+    return (start_price * np.exp(np.cumsum(log_returns, axis=1))).astype(dtype, copy=False)
+
+
+def regime_switching_close(n_bars: int, n_tickers: int = 1, regimes=((0.001, 0.01), (-0.002, 0.04)),
+                           switch_prob: float = 0.01, start_price: float = 100.0, seed: int = 0,
+                           dtype=np.float64) -> np.ndarray:
+    """Close prices from a Markov regime-switching GBM, shape (n_tickers, n_bars).
+
+    Args:
+        regimes: (drift, volatility) per regime, e.g. a calm bull and a volatile bear regime.
+        switch_prob: Probability of jumping to another regime at each bar.
+    """
+    rng = np.random.default_rng(seed)
+    regimes = np.asarray(regimes, dtype=np.float64)
+    n_regimes = len(regimes)
+
+    # A regime switch happens with switch_prob; the cumulative number of switches
+    # (with a random regime offset per switch) gives the regime path without a Python loop.
+    switches = rng.random((n_tickers, n_bars)) < switch_prob
+    offsets = np.where(switches, rng.integers(1, max(n_regimes, 2), size=(n_tickers, n_bars)), 0)
+    state = np.cumsum(offsets, axis=1) % n_regimes
+
+    mu = regimes[state, 0]
+    sigma = regimes[state, 1]
+    log_returns = (mu - 0.5 * sigma ** 2 + sigma * rng.standard_normal((n_tickers, n_bars))).astype(dtype)
+    log_returns[:, 0] = 0
+    return (start_price * np.exp(np.cumsum(log_returns, axis=1))).astype(dtype, copy=False)
+
+
+def to_ohlcv(close: np.ndarray, freq: str = "D", start: str = "2000-01-01", seed: int = 0) -> pd.DataFrame:
+    """Build an OHLCV frame around one close path, indexed by a UTC DatetimeIndex."""
+    rng = np.random.default_rng(seed)
+    close = np.asarray(close, dtype=np.float64)
+    n_bars = close.size
+
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.005, size=(2, n_bars)))
+    high = np.maximum(open_, close) * (1 + spread[0])
+    low = np.minimum(open_, close) * (1 - spread[1])
+    volume = rng.lognormal(10, 1, size=n_bars)
+
+    index = pd.date_range(start, periods=n_bars, freq=freq, tz="UTC", name="Date")
+    return pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+def ohlcv_frame(n_bars: int, model: str = "gbm", freq: str = "D", seed: int = 0) -> pd.DataFrame:
+    """One synthetic ticker as an OHLCV frame. *model* is ``"gbm"`` or ``"regime"``."""
+    generator = {"gbm": gbm_close, "regime": regime_switching_close}[model]
+    return to_ohlcv(generator(n_bars, seed=seed)[0], freq=freq, seed=seed)
+
+
+def universe(n_tickers: int, n_bars: int, model: str = "gbm", freq: str = "D", seed: int = 0) -> dict:
+    """A {ticker: OHLCV frame} universe sharing one calendar."""
+    generator = {"gbm": gbm_close, "regime": regime_switching_close}[model]
+    closes = generator(n_bars, n_tickers=n_tickers, seed=seed)
+    return {f"T{i:05d}": to_ohlcv(closes[i], freq=freq, seed=seed + i) for i in range(n_tickers)}
+
+
+def write_csv_fixture(df: pd.DataFrame, path: str) -> str:
+    """Write *df* in the layout DataLoader reads (a 'Date' column plus OHLCV)."""
+    df.reset_index().to_csv(path, index=False)
+    return path
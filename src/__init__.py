@@ -1,8 +1,35 @@
-from .data_pipeline import DataLoader
-from .engine.backtester import Backtester
-from .strategies import *
+"""Top-level entry points, imported on first access (PEP 562).
+
+``from src import Backtester`` works as before, but importing a submodule
+such as ``src.strategies.mean_reversion`` no longer loads the data pipeline
+and the whole engine with it.
+"""
+import importlib
+
+# Public name -> module defining it.
+_LAZY = {
+    "DataLoader": ".data_pipeline",
+    "Backtester": ".engine.backtester",
+}
 
 __all__ = [
 	"DataLoader",
 	"Backtester",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    else:
+        # Strategy classes have always been re-exported from here; resolve them lazily too.
+        strategies = importlib.import_module(".strategies", __name__)
+        if name not in strategies.__all__:
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = getattr(strategies, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,321 @@
+"""Run a batch of backtests described by a JSON or YAML job file.
+
+Usage:
+    python -m src.batch jobs.yaml [--output results.jsonl] [--workers N] [--restart]
+
+A job file expands to tickers x strategies x parameter grids x fees::
+
+    tickers: [BTC, ETH]
+    fees: [0.001, 0.002]
+    initial_capital: 10000
+    strategies:
+      - name: MeanReversionStrategy
+        grid: {short_window: [10, 20, 30], long_window: [60, 100]}
+      - name: BuyAndHoldStrategy
+
+Each ticker is loaded once and shared with the worker processes, which run
+its jobs in parallel; its shared memory is released as soon as its last job
+finishes, while the next ticker's jobs are already running. Every finished
+job is appended to the output as one JSON line, so results stream to disk
+instead of being held in memory. The output doubles as the checkpoint:
+rerunning the same command skips the jobs it already holds and retries
+failed ones.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ALL_COMPLETED, FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from src.data_pipeline import DataLoader
+from src.engine.jobs import _json_values, strategy_from_spec, strategy_registry, strategy_spec
+from src.engine.shared_frame import SharedStore, attach
+from src.engine.sweep import expand_grid
+
+logger = logging.getLogger(__name__)
+
+# Top-level fields of a job file and their defaults.
+BATCH_DEFAULTS = {
+    "tickers": None,
+    "strategies": None,
+    "fees": [0.001],
+    "initial_capital": 10000.0,
+    "freq": None,
+    "periods_per_year": 365,
+    "execution": None,
+    "output": None,
+}
+
+
+def read_job_file(path: str) -> dict:
+    """Parse a ``.json``, ``.yaml`` or ``.yml`` job file (YAML needs PyYAML)."""
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML job files requires PyYAML (pip install pyyaml)") from None
+            spec = yaml.safe_load(f)
+        else:
+            spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path} must contain a mapping")
+    return spec
+
+
+def expand_jobs(spec: dict) -> list:
+    """Expand a job file into one job per (ticker, strategy parameters, fee), grouped by ticker.
+
+    Strategies may give ``params`` (fixed) and ``grid`` (lists to combine);
+    missing parameters take the class defaults. Each job carries an ``id``
+    hashed from its content.
+    """
+    unknown = set(spec) - set(BATCH_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown job file fields: {sorted(unknown)}")
+    spec = {**BATCH_DEFAULTS, **spec}
+    tickers = [spec["tickers"]] if isinstance(spec["tickers"], str) else spec["tickers"]
+    fees = spec["fees"] if isinstance(spec["fees"], list) else [spec["fees"]]
+    if not tickers or not spec["strategies"]:
+        raise ValueError("A job file needs tickers and strategies")
+
+    registry = strategy_registry()
+    variants = []
+    for entry in spec["strategies"]:
+        entry = strategy_spec(entry)
+        cls = registry.get(entry["name"])
+        if cls is None:
+            raise ValueError(f"Unknown strategy {entry['name']!r}; expected one of {sorted(registry)}")
+        grid = {name: [value] for name, value in entry.get("params", {}).items()}
+        grid.update({name: list(values) for name, values in entry.get("grid", {}).items()})
+        for params in expand_grid(cls, grid):
+            variant = {"name": entry["name"], "params": params}
+            strategy_from_spec(variant, registry)
+            variants.append(variant)
+
+    jobs = []
+    for ticker in dict.fromkeys(tickers):
+        for variant in variants:
+            for fee in fees:
+                job = {
+                    "ticker": ticker,
+                    "strategy": variant,
+                    "fee": fee,
+                    "initial_capital": spec["initial_capital"],
+                    "freq": spec["freq"],
+                    "periods_per_year": spec["periods_per_year"],
+                    "execution": spec["execution"],
+                }
+                job["id"] = hashlib.blake2b(json.dumps(job, sort_keys=True, default=str).encode(), digest_size=12).hexdigest()
+                jobs.append(job)
+    return jobs
+
+
+def completed_jobs(path: str) -> set:
+    """Ids of the successful jobs already in the output *path*.
+
+    A line cut short by an interruption is ignored, so its job runs again.
+    """
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def run_job(frame, job: dict) -> dict:
+    """Backtest one job on *frame* and return its output record."""
+    from src.engine.backtester import Backtester
+    from src.engine.execution import ExecutionConfig
+
+    started = time.perf_counter()
+    record = {"id": job["id"], "ticker": job["ticker"], "strategy": job["strategy"]["name"],
+              "params": job["strategy"]["params"], "fee": job["fee"]}
+    try:
+        execution = ExecutionConfig(**job["execution"]) if job["execution"] is not None else None
+        backtester = Backtester(
+            frame,
+            [strategy_from_spec(job["strategy"])],
+            initial_capital=job["initial_capital"],
+            fee=job["fee"],
+            execution=execution,
+        )
+        backtester.run()
+        metrics = backtester.get_metrics(periods_per_year=job["periods_per_year"])
+        record["bars"] = len(backtester.results)
+        record["metrics"] = _json_values(metrics.iloc[0])
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["elapsed"] = time.perf_counter() - started
+    return record
+
+
+def _run_shared(handle, job: dict) -> dict:
+    return run_job(attach(handle), job)
+
+
+class BatchRunner:
+    """Runs expanded jobs ticker by ticker and streams their records to a JSON-lines file.
+
+    Args:
+        output (str): Output path; also the checkpoint read on resume.
+        max_workers (int, optional): Worker processes; ``1`` runs in this
+            process, ``None`` uses every core.
+        data_dir (str, optional): Data directory passed to DataLoader.
+        max_pending (int, optional): Jobs queued on the pool at once; bounds
+            memory on very large batches. Four per worker by default.
+
+    If a worker process dies (e.g. killed for running out of memory), the jobs
+    on the pool at the time are recorded as failed and a new pool runs the
+    rest; rerunning the batch retries them.
+    """
+
+    def __init__(self, output: str, max_workers: int = None, data_dir: str = None, max_pending: int = None) -> None:
+        self.output = output
+        self.max_workers = max_workers if max_workers is not None else os.cpu_count()
+        self.data_dir = data_dir
+        self.max_pending = max_pending if max_pending is not None else 4 * self.max_workers
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self.executor = None
+
+    def run(self, jobs: list, restart: bool = False) -> dict:
+        """Run every job not already in the output and return the done/failed/skipped counts."""
+        if restart and os.path.exists(self.output):
+            os.remove(self.output)
+        finished = completed_jobs(self.output)
+        pending = [job for job in jobs if job["id"] not in finished]
+        self.counts["skipped"] = len(jobs) - len(pending)
+        logger.info("%d jobs, %d already done, %d to run", len(jobs), self.counts["skipped"], len(pending))
+
+        by_ticker = {}
+        for job in pending:
+            by_ticker.setdefault((job["ticker"], job["freq"]), []).append(job)
+
+        loader = DataLoader(data_dir=self.data_dir)
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers) if self.max_workers > 1 else None
+        started = time.perf_counter()
+        try:
+            with open(self.output, "a") as out, SharedStore() as store:
+                if out.tell() and not _ends_with_newline(self.output):
+                    # Seal a line cut short by an interruption so the next record starts cleanly.
+                    out.write("\n")
+                running = {}
+                for (ticker, freq), ticker_jobs in by_ticker.items():
+                    try:
+                        frame = loader.load_data(ticker, freq)
+                    except Exception as e:
+                        logger.error("Failed to load %s: %s", ticker, e)
+                        for job in ticker_jobs:
+                            self._write(out, {"id": job["id"], "ticker": ticker, "error": f"{type(e).__name__}: {e}"})
+                        continue
+                    if self.executor is None:
+                        for job in ticker_jobs:
+                            self._write(out, run_job(frame, job))
+                    else:
+                        self._fan_out(store, (ticker, freq), frame, ticker_jobs, running, out)
+                    logger.info(
+                        "%s queued: %d done, %d failed (%.1f jobs/s)", ticker, self.counts["done"],
+                        self.counts["failed"], (self.counts["done"] + self.counts["failed"]) / (time.perf_counter() - started),
+                    )
+                if running:
+                    self._collect(running, out, ALL_COMPLETED)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown(cancel_futures=True)
+                self.executor = None
+        return dict(self.counts)
+
+    def _fan_out(self, store, key, frame, jobs: list, running: dict, out) -> None:
+        # The frame is copied into shared memory once and attached by every
+        # worker. Each job holds a reference to the segment until its future
+        # is done, even if its worker crashed, and the store drops its own
+        # once everything is queued, so the segment goes with the last job.
+        handle = store.publish(key, frame)
+        try:
+            for job in jobs:
+                if len(running) >= self.max_pending:
+                    self._collect(running, out, FIRST_COMPLETED)
+                running[store.track(key, self._submit(handle, job, running, out))] = (job, self.executor)
+        finally:
+            store.unpublish(key)
+
+    def _submit(self, handle, job: dict, running: dict, out):
+        try:
+            return self.executor.submit(_run_shared, handle, job)
+        except BrokenProcessPool:
+            # A worker died before its failure was collected: every job still
+            # on the pool is lost. Record them, then carry on with a new pool.
+            self._collect(running, out, ALL_COMPLETED)
+            self._replace_pool(self.executor)
+            return self.executor.submit(_run_shared, handle, job)
+
+    def _replace_pool(self, broken) -> None:
+        if broken is not self.executor:
+            return
+        logger.error("A worker process died; restarting the pool for the remaining jobs")
+        broken.shutdown(wait=False)
+        self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _collect(self, running: dict, out, return_when) -> None:
+        done, _ = wait(running, return_when=return_when)
+        for future in done:
+            job, executor = running.pop(future)
+            try:
+                record = future.result()
+            except Exception as e:
+                # E.g. BrokenProcessPool after a worker died; the job is retried on the next run.
+                record = {"id": job["id"], "ticker": job["ticker"], "error": f"{type(e).__name__}: {e}"}
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_pool(executor)
+            self._write(out, record)
+
+    def _write(self, out, record: dict) -> None:
+        out.write(json.dumps(record) + "\n")
+        # Flushed per record so an interrupted run keeps everything it finished.
+        out.flush()
+        self.counts["failed" if "error" in record else "done"] += 1
+        if "error" in record:
+            logger.warning("Job %s (%s %s) failed: %s", record["id"], record["ticker"], record.get("strategy"), record["error"])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("job_file", help="JSON or YAML job file")
+    parser.add_argument("--output", help="JSON-lines results file (default: the job file's 'output', "
+                                         "or <job file>.jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (all cores by default)")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--restart", action="store_true", help="Discard existing results instead of resuming")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # Per-strategy progress from the engine would drown the batch progress.
+    for name in ("src.engine", "src.strategies", "src.data_pipeline"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+    spec = read_job_file(args.job_file)
+    output = args.output or spec.get("output") or os.path.splitext(args.job_file)[0] + ".jsonl"
+    jobs = expand_jobs(spec)
+    counts = BatchRunner(output, max_workers=args.workers, data_dir=args.data_dir).run(jobs, restart=args.restart)
+    print(f"{counts['done']} done, {counts['failed']} failed, {counts['skipped']} skipped -> {output}")
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
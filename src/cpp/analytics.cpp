@@ -2,26 +2,138 @@
 #include <cmath>
 #include <algorithm>
 #include <numeric>
+#include <cstddef>
 
-extern "C" {
+namespace {
+
+    // An update shrinking the sliding stddev's sum of squared deviations below
+    // this fraction of its previous value triggers an exact recomputation.
+    const double STDDEV_CANCELLATION = 1e-3;
+
+    // Kahan-compensated accumulation: keeps a running sum accurate when the
+    // same values are added and later subtracted again.
+    inline void kahan_add(double& sum, double& compensation, double value) {
+        double y = value - compensation;
+        double t = sum + y;
+        compensation = (t - sum) - y;
+        sum = t;
+    }
+
+    // Running-sum SMA, O(n) in the series length and independent of window.
+    // Windows containing NaN produce NaN, matching pandas' rolling().mean().
+    void sma_kernel(const double* data, int length, int window, double* result) {
+        if (window <= 0) {
+            std::fill(result, result + length, NAN);
+            return;
+        }
+
+        double sum = 0.0;
+        double compensation = 0.0;
+        int nan_count = 0;
 
-    // 1. Simple Moving Average
-    void calculate_sma(const double* data, int length, int window, double* result) {
         for (int i = 0; i < length; ++i) {
-            if (i < window - 1) {
-                result[i] = NAN; // Not enough data
+            if (std::isnan(data[i])) {
+                ++nan_count;
             } else {
-                double sum = 0.0;
-                for (int j = 0; j < window; ++j) {
-                    sum += data[i - j];
+                kahan_add(sum, compensation, data[i]);
+            }
+
+            if (i >= window) {
+                double leaving = data[i - window];
+                if (std::isnan(leaving)) {
+                    --nan_count;
+                } else {
+                    kahan_add(sum, compensation, -leaving);
                 }
-                result[i] = sum / window;
             }
+
+            result[i] = (i < window - 1 || nan_count > 0) ? NAN : sum / window;
         }
     }
 
-    // 2. Exponential Moving Average
-    void calculate_ema(const double* data, int length, int window, double* result) {
+    // Exact two-pass mean and sum of squared deviations over data[end - window + 1 .. end],
+    // with the mean taken relative to shift.
+    void window_moments(const double* data, int end, int window, double shift, double& mean, double& m2) {
+        double sum = 0.0;
+        for (int j = 0; j < window; ++j) {
+            sum += data[end - j] - shift;
+        }
+        mean = sum / window;
+
+        m2 = 0.0;
+        for (int j = 0; j < window; ++j) {
+            double diff = data[end - j] - shift - mean;
+            m2 += diff * diff;
+        }
+    }
+
+    // Sliding Welford-style sample standard deviation, O(n) in the series length.
+    // When one value leaves and one enters the window, the mean and the sum of
+    // squared deviations are updated in place instead of being recomputed.
+    // Values are shifted by a price from the window, so nearby prices subtract
+    // exactly and the price level does not swamp a small variance. The moments
+    // are recomputed exactly every `window` bars (amortized O(1) per bar) and
+    // whenever an update cancels most of m2, where its rounding error would
+    // dominate the result (e.g. a window turning flat).
+    void stddev_kernel(const double* data, int length, int window, double* result) {
+        if (window < 2) {
+            std::fill(result, result + length, NAN);
+            return;
+        }
+
+        double shift = 0.0;
+        double mean = 0.0; // Relative to shift
+        double m2 = 0.0;
+        int nan_count = 0;
+        bool synced = false;
+        int since_sync = 0;
+
+        for (int i = 0; i < length; ++i) {
+            if (std::isnan(data[i])) {
+                ++nan_count;
+            }
+            if (i >= window && std::isnan(data[i - window])) {
+                --nan_count;
+            }
+
+            if (i < window - 1 || nan_count > 0) {
+                result[i] = NAN;
+                synced = false;
+                continue;
+            }
+
+            bool resync = !synced || since_sync >= window;
+            if (!resync) {
+                double entering = data[i] - shift;
+                double leaving = data[i - window] - shift;
+                double new_mean = mean + (entering - leaving) / window;
+                double new_m2 = m2 + (entering - leaving) * (entering - new_mean + leaving - mean);
+                resync = new_m2 < STDDEV_CANCELLATION * m2;
+                mean = new_mean;
+                m2 = new_m2;
+                ++since_sync;
+            }
+            if (resync) {
+                shift = data[i];
+                window_moments(data, i, window, shift, mean, m2);
+                synced = true;
+                since_sync = 0;
+            }
+
+            if (m2 < 0.0) {
+                m2 = 0.0;
+            }
+            result[i] = std::sqrt(m2 / (window - 1)); // Sample standard deviation
+        }
+    }
+
+    // EMA seeded with the SMA of the first window.
+    void ema_kernel(const double* data, int length, int window, double* result) {
+        if (window <= 0 || length < window) {
+            std::fill(result, result + length, NAN);
+            return;
+        }
+
         double multiplier = 2.0 / (window + 1);
 
         // Initialize first EMA with SMA
@@ -44,20 +156,12 @@ extern "C" {
         }
     }
 
-    // 3. Relative Strength Index (RSI)
-    void calculate_rsi(const double* data, int length, int window, double* result) {
-        if (length <= window) return;
-
-        std::vector<double> gains(length, 0.0);
-        std::vector<double> losses(length, 0.0);
-
-        for (int i = 1; i < length; ++i) {
-            double change = data[i] - data[i - 1];
-            if (change > 0) {
-                gains[i] = change;
-            } else {
-                losses[i] = -change;
-            }
+    // Wilder-smoothed RSI. Gains and losses are derived on the fly, so no
+    // per-call scratch buffers are allocated.
+    void rsi_kernel(const double* data, int length, int window, double* result) {
+        if (window <= 0 || length <= window) {
+            std::fill(result, result + length, NAN);
+            return;
         }
 
         double avg_gain = 0.0;
@@ -65,8 +169,12 @@ extern "C" {
 
         // First average
         for (int i = 1; i <= window; ++i) {
-            avg_gain += gains[i];
-            avg_loss += losses[i];
+            double change = data[i] - data[i - 1];
+            if (change > 0) {
+                avg_gain += change;
+            } else {
+                avg_loss -= change;
+            }
         }
         avg_gain /= window;
         avg_loss /= window;
@@ -74,46 +182,27 @@ extern "C" {
         for (int i = 0; i < length; ++i) {
             if (i < window) {
                 result[i] = NAN;
-            } else {
-                if (i > window) {
-                    avg_gain = (avg_gain * (window - 1) + gains[i]) / window;
-                    avg_loss = (avg_loss * (window - 1) + losses[i]) / window;
-                }
+                continue;
+            }
 
-                if (avg_loss == 0) {
-                    result[i] = 100.0;
-                } else {
-                    double rs = avg_gain / avg_loss;
-                    result[i] = 100.0 - (100.0 / (1.0 + rs));
-                }
+            if (i > window) {
+                double change = data[i] - data[i - 1];
+                double gain = change > 0 ? change : 0.0;
+                double loss = change > 0 ? 0.0 : -change;
+                avg_gain = (avg_gain * (window - 1) + gain) / window;
+                avg_loss = (avg_loss * (window - 1) + loss) / window;
             }
-        }
-    }
 
-    // 4. Rolling Standard Deviation (Volatility)
-    void calculate_stddev(const double* data, int length, int window, double* result) {
-        for (int i = 0; i < length; ++i) {
-            if (i < window - 1) {
-                result[i] = NAN;
+            if (avg_loss == 0) {
+                result[i] = 100.0;
             } else {
-                double sum = 0.0;
-                for (int j = 0; j < window; ++j) {
-                    sum += data[i - j];
-                }
-                double mean = sum / window;
-
-                double sq_sum = 0.0;
-                for (int j = 0; j < window; ++j) {
-                    double diff = data[i - j] - mean;
-                    sq_sum += diff * diff;
-                }
-                result[i] = std::sqrt(sq_sum / (window - 1)); // Sample standard deviation
+                double rs = avg_gain / avg_loss;
+                result[i] = 100.0 - (100.0 / (1.0 + rs));
             }
         }
     }
 
-    // 5. Maximum Drawdown (Running)
-    void calculate_max_drawdown(const double* data, int length, double* result) {
+    void drawdown_kernel(const double* data, int length, double* result) {
         double peak = -1e9; // Initialize with a very small number
 
         for (int i = 0; i < length; ++i) {
@@ -128,4 +217,331 @@ extern "C" {
             }
         }
     }
+
+    // Rolling maximum over a monotonic deque of indices (values decreasing from
+    // the front), O(n) in the series length regardless of window. Windows
+    // containing NaN produce NaN, matching pandas' rolling().max().
+    void rolling_max_kernel(const double* data, int length, int window, double* result) {
+        if (window <= 0) {
+            std::fill(result, result + length, NAN);
+            return;
+        }
+
+        std::vector<int> candidates(length > 0 ? length : 1);
+        int head = 0;
+        int tail = 0;
+        int nan_count = 0;
+
+        for (int i = 0; i < length; ++i) {
+            if (std::isnan(data[i])) {
+                ++nan_count;
+            } else {
+                while (tail > head && data[candidates[tail - 1]] <= data[i]) {
+                    --tail;
+                }
+                candidates[tail++] = i;
+            }
+            if (i >= window && std::isnan(data[i - window])) {
+                --nan_count;
+            }
+            while (tail > head && candidates[head] <= i - window) {
+                ++head;
+            }
+
+            result[i] = (i < window - 1 || nan_count > 0) ? NAN : data[candidates[head]];
+        }
+    }
+
+    // Exit reasons reported by execution_kernel; keep in sync with EXIT_REASONS in src/engine/execution.py.
+    enum ExitReason { EXIT_NONE = 0, EXIT_STOP_LOSS = 1, EXIT_TAKE_PROFIT = 2, EXIT_TRAILING_STOP = 3, EXIT_MAX_HOLDING = 4 };
+
+    // Execution rules, passed from Python as a double array in this order.
+    // A rule is off when its value is not positive (or NaN).
+    struct ExecutionParams {
+        double fee;
+        double stop_loss;
+        double take_profit;
+        double trailing_stop;
+        double max_holding;
+    };
+
+    inline bool enabled(double value) {
+        return value > 0.0;
+    }
+
+    // Path-dependent execution of one signal series, one pass over the bars.
+    //
+    // Conventions match the vectorized backtester: the signal at bar t is
+    // filled at close[t] and held from bar t + 1, position[t] is the position
+    // held entering bar t, trades[t] its absolute change, and
+    // strategy_returns[t] = position * return - fee * trades (NaN on bar 0 and
+    // wherever the close is missing). On top of that, a position is closed
+    // intrabar when the low/high crosses its stop-loss, trailing stop or
+    // take-profit level (filled at that level, or at the open when the bar
+    // gaps through it; the stop wins if both are hit), or at the close once it
+    // has been held max_holding bars. After such an exit the strategy stays
+    // flat until its signal changes. The size of a position (signal * size at
+    // entry) is kept for as long as the signal is unchanged.
+    void execution_kernel(
+        const double* open, const double* high, const double* low, const double* close,
+        const double* signal, const double* size, int length, const ExecutionParams& params,
+        double* position, double* trades, double* strategy_returns, double* exit_price, int* exit_reason
+    ) {
+        if (length <= 0) {
+            return;
+        }
+
+        const bool use_stop = enabled(params.stop_loss);
+        const bool use_take = enabled(params.take_profit);
+        const bool use_trail = enabled(params.trailing_stop);
+        const bool use_hold = enabled(params.max_holding);
+
+        double held = 0.0;            // position entering the current bar
+        double end_position = 0.0;    // position at the end of the previous bar
+        double entry_price = NAN;
+        double entry_signal = 0.0;    // signal that opened the current position
+        double extreme = NAN;         // highest high (long) / lowest low (short) since entry
+        double blocked_signal = NAN;  // after a rule-based exit, stay flat while the signal equals this
+        int bars_held = 0;
+        bool force_flat = false;
+
+        position[0] = 0.0;
+        trades[0] = NAN;
+        strategy_returns[0] = NAN;
+        exit_price[0] = NAN;
+        exit_reason[0] = EXIT_NONE;
+
+        for (int t = 0; t < length; ++t) {
+            if (t > 0) {
+                double previous_close = close[t - 1];
+                double trade = std::fabs(held - end_position);
+                if (held != 0.0 && held != end_position) {
+                    entry_price = previous_close;
+                    extreme = previous_close;
+                    bars_held = 0;
+                }
+
+                position[t] = held;
+                exit_price[t] = NAN;
+                exit_reason[t] = EXIT_NONE;
+                double bar_return = held * (close[t] / previous_close - 1.0);
+                end_position = held;
+
+                if (held != 0.0) {
+                    ++bars_held;
+                    const bool is_long = held > 0.0;
+                    const double direction = is_long ? 1.0 : -1.0;
+                    const double adverse = is_long ? low[t] : high[t];
+                    const double favourable = is_long ? high[t] : low[t];
+
+                    // Protective level: the tighter of the fixed and trailing stops.
+                    double stop_level = NAN;
+                    int stop_reason = EXIT_NONE;
+                    if (use_stop) {
+                        stop_level = entry_price * (1.0 - direction * params.stop_loss);
+                        stop_reason = EXIT_STOP_LOSS;
+                    }
+                    if (use_trail) {
+                        double trail_level = extreme * (1.0 - direction * params.trailing_stop);
+                        if (stop_reason == EXIT_NONE || direction * (trail_level - stop_level) > 0.0) {
+                            stop_level = trail_level;
+                            stop_reason = EXIT_TRAILING_STOP;
+                        }
+                    }
+
+                    double fill = NAN;
+                    int reason = EXIT_NONE;
+                    if (stop_reason != EXIT_NONE && direction * (adverse - stop_level) <= 0.0) {
+                        // Gapped through the stop: filled at the open instead.
+                        fill = direction * (open[t] - stop_level) < 0.0 ? open[t] : stop_level;
+                        reason = stop_reason;
+                    } else if (use_take) {
+                        double take_level = entry_price * (1.0 + direction * params.take_profit);
+                        if (direction * (favourable - take_level) >= 0.0) {
+                            fill = direction * (open[t] - take_level) > 0.0 ? open[t] : take_level;
+                            reason = EXIT_TAKE_PROFIT;
+                        }
+                    }
+
+                    if (reason != EXIT_NONE) {
+                        bar_return = held * (fill / previous_close - 1.0);
+                        trade += std::fabs(held);
+                        end_position = 0.0;
+                        exit_price[t] = fill;
+                        exit_reason[t] = reason;
+                        blocked_signal = entry_signal;
+                    } else {
+                        if (is_long ? favourable > extreme : favourable < extreme) {
+                            extreme = favourable;
+                        }
+                        if (use_hold && bars_held >= params.max_holding) {
+                            // Closed at this bar's close, like a signal exit.
+                            exit_price[t] = close[t];
+                            exit_reason[t] = EXIT_MAX_HOLDING;
+                            blocked_signal = entry_signal;
+                            force_flat = true;
+                        }
+                    }
+                }
+
+                trades[t] = trade;
+                strategy_returns[t] = bar_return - params.fee * trade;
+            }
+
+            // Target for the next bar, decided at this bar's close.
+            double current = std::isnan(signal[t]) ? 0.0 : signal[t];
+            if (!std::isnan(blocked_signal) && current != blocked_signal) {
+                blocked_signal = NAN;
+            }
+
+            double target;
+            if (force_flat || !std::isnan(blocked_signal)) {
+                target = 0.0;
+            } else if (end_position != 0.0 && current == entry_signal) {
+                target = end_position;
+            } else {
+                double scale = size ? size[t] : 1.0;
+                target = std::isnan(scale) ? 0.0 : current * scale;
+                if (target != 0.0) {
+                    entry_signal = current;
+                }
+            }
+            force_flat = false;
+            held = target;
+        }
+    }
+
+
+    inline std::size_t row_offset(int row, int length) {
+        return static_cast<std::size_t>(row) * length;
+    }
+
+}
+
+extern "C" {
+
+    // 1. Simple Moving Average
+    void calculate_sma(const double* data, int length, int window, double* result) {
+        sma_kernel(data, length, window, result);
+    }
+
+    // 2. Exponential Moving Average
+    void calculate_ema(const double* data, int length, int window, double* result) {
+        ema_kernel(data, length, window, result);
+    }
+
+    // 3. Relative Strength Index (RSI)
+    void calculate_rsi(const double* data, int length, int window, double* result) {
+        rsi_kernel(data, length, window, result);
+    }
+
+    // 4. Rolling Standard Deviation (Volatility)
+    void calculate_stddev(const double* data, int length, int window, double* result) {
+        stddev_kernel(data, length, window, result);
+    }
+
+    // 5. Maximum Drawdown (Running)
+    void calculate_max_drawdown(const double* data, int length, double* result) {
+        drawdown_kernel(data, length, result);
+    }
+
+    // 6. Rolling Maximum (e.g. the trailing equity peak for rolling drawdowns)
+    void calculate_rolling_max(const double* data, int length, int window, double* result) {
+        rolling_max_kernel(data, length, window, result);
+    }
+
+    // 7. Simple Moving Average for several windows at once.
+    // Fills result as an (n_windows x length) row-major block; windows run in
+    // parallel when compiled with OpenMP.
+    void calculate_sma_multi(const double* data, int length, const int* windows, int n_windows, double* result) {
+        #pragma omp parallel for schedule(dynamic)
+        for (int k = 0; k < n_windows; ++k) {
+            sma_kernel(data, length, windows[k], result + row_offset(k, length));
+        }
+    }
+
+    // 8. Rolling Standard Deviation for several windows at once (same layout as 7).
+    void calculate_stddev_multi(const double* data, int length, const int* windows, int n_windows, double* result) {
+        #pragma omp parallel for schedule(dynamic)
+        for (int k = 0; k < n_windows; ++k) {
+            stddev_kernel(data, length, windows[k], result + row_offset(k, length));
+        }
+    }
+
+    // 9-14. Batch versions of 1-6 over an (n_series x length) row-major block,
+    // e.g. one row per ticker. result uses the same layout; rows run in
+    // parallel when compiled with OpenMP.
+    void calculate_sma_batch(const double* data, int n_series, int length, int window, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            sma_kernel(data + row_offset(k, length), length, window, result + row_offset(k, length));
+        }
+    }
+
+    void calculate_ema_batch(const double* data, int n_series, int length, int window, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            ema_kernel(data + row_offset(k, length), length, window, result + row_offset(k, length));
+        }
+    }
+
+    void calculate_rsi_batch(const double* data, int n_series, int length, int window, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            rsi_kernel(data + row_offset(k, length), length, window, result + row_offset(k, length));
+        }
+    }
+
+    void calculate_stddev_batch(const double* data, int n_series, int length, int window, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            stddev_kernel(data + row_offset(k, length), length, window, result + row_offset(k, length));
+        }
+    }
+
+    void calculate_max_drawdown_batch(const double* data, int n_series, int length, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            drawdown_kernel(data + row_offset(k, length), length, result + row_offset(k, length));
+        }
+    }
+
+    void calculate_rolling_max_batch(const double* data, int n_series, int length, int window, double* result) {
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            rolling_max_kernel(data + row_offset(k, length), length, window, result + row_offset(k, length));
+        }
+    }
+
+    // 15. Path-dependent execution with stops, take-profit, trailing stop and
+    // max holding time; see execution_kernel. params holds fee, stop_loss,
+    // take_profit, trailing_stop and max_holding. size may be null (size 1).
+    void simulate_execution(
+        const double* open, const double* high, const double* low, const double* close,
+        const double* signal, const double* size, int length, const double* params,
+        double* position, double* trades, double* strategy_returns, double* exit_price, int* exit_reason
+    ) {
+        ExecutionParams p = {params[0], params[1], params[2], params[3], params[4]};
+        execution_kernel(open, high, low, close, signal, size, length, p,
+                         position, trades, strategy_returns, exit_price, exit_reason);
+    }
+
+    // 16. Batch version of 15: n_series signal (and size) rows over the same
+    // prices, e.g. parameter variants of one strategy. Outputs use the
+    // (n_series x length) layout of the signals; rows run in parallel when
+    // compiled with OpenMP.
+    void simulate_execution_batch(
+        const double* open, const double* high, const double* low, const double* close,
+        const double* signal, const double* size, int n_series, int length, const double* params,
+        double* position, double* trades, double* strategy_returns, double* exit_price, int* exit_reason
+    ) {
+        ExecutionParams p = {params[0], params[1], params[2], params[3], params[4]};
+        #pragma omp parallel for schedule(static)
+        for (int k = 0; k < n_series; ++k) {
+            std::size_t offset = row_offset(k, length);
+            execution_kernel(open, high, low, close, signal + offset, size ? size + offset : nullptr, length, p,
+                             position + offset, trades + offset, strategy_returns + offset,
+                             exit_price + offset, exit_reason + offset);
+        }
+    }
 }
@@ -1,149 +1,349 @@
 import ctypes
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import platform
-
-# Determine the library extension based on the OS
-system = platform.system()
-if system == "Windows":
-    lib_ext = ".dll"
-elif system == "Linux":
-    lib_ext = ".so"
-elif system == "Darwin":
-    lib_ext = ".dylib"
-else:
-    lib_ext = ".so"
-
-# Path to the compiled library
-lib_path = os.path.join(os.path.dirname(__file__), f"analytics{lib_ext}")
+
+from src.cpp import build
+
+logger = logging.getLogger(__name__)
+
+# A library built by hand with 'python src/cpp/build.py' takes precedence over
+# the cached build while it matches the current source (see build.is_current).
+lib_path = os.path.join(os.path.dirname(__file__), f"analytics{build.library_extension()}")
+
+# Path of a library to load instead of building one, e.g. compiled elsewhere.
+LIBRARY = os.environ.get("BACKTEST_LIBRARY")
+
+# Compile analytics.cpp into the user cache dir on first use when no library is found.
+AUTO_BUILD = os.environ.get("BACKTEST_AUTO_BUILD", "1") != "0"
+# Cached builds are optimised for the build machine's CPU with -march=native.
+MARCH_NATIVE = os.environ.get("BACKTEST_MARCH_NATIVE", "0") == "1"
+
+# "native" (analytics.cpp through ctypes), "numpy" (numpy_backend) and "pandas"
+# (pandas_backend) compute the same indicators; "auto" uses native when the
+# library loads or builds and falls back to numpy otherwise.
+BACKENDS = ("native", "numpy", "pandas")
+_backend = os.environ.get("BACKTEST_BACKEND", "auto")
+_resolved_backend = None
+_load_error = None
 
 _analytics_lib = None
 
+# Resolved function pointers, filled once by load_library().
+_functions = {}
+
+# Pointers are passed as raw addresses (arr.ctypes.data) to keep per-call overhead low.
+_SIGNATURES = {
+    # void calculate_sma(const double* data, int length, int window, double* result)
+    "calculate_sma": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_ema(const double* data, int length, int window, double* result)
+    "calculate_ema": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_rsi(const double* data, int length, int window, double* result)
+    "calculate_rsi": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_stddev(const double* data, int length, int window, double* result)
+    "calculate_stddev": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_max_drawdown(const double* data, int length, double* result)
+    "calculate_max_drawdown": [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_rolling_max(const double* data, int length, int window, double* result)
+    "calculate_rolling_max": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_<op>_multi(const double* data, int length, const int* windows, int n_windows, double* result)
+    "calculate_sma_multi": [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p],
+    "calculate_stddev_multi": [ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_<op>_batch(const double* data, int n_series, int length, int window, double* result)
+    "calculate_sma_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    "calculate_ema_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    "calculate_rsi_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    "calculate_stddev_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    "calculate_rolling_max_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void calculate_max_drawdown_batch(const double* data, int n_series, int length, double* result)
+    "calculate_max_drawdown_batch": [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_void_p],
+    # void simulate_execution(open, high, low, close, signal, size, int length, params,
+    #                         position, trades, strategy_returns, exit_price, int* exit_reason)
+    "simulate_execution": [ctypes.c_void_p] * 6 + [ctypes.c_int] + [ctypes.c_void_p] * 6,
+    # void simulate_execution_batch(open, high, low, close, signal, size, int n_series, int length, params, ...)
+    "simulate_execution_batch": [ctypes.c_void_p] * 6 + [ctypes.c_int, ctypes.c_int] + [ctypes.c_void_p] * 6,
+}
+
+# Entry points every build of analytics.cpp provides. The others are optional so
+# that libraries compiled from an older source still load.
+_REQUIRED = (
+    "calculate_sma",
+    "calculate_ema",
+    "calculate_rsi",
+    "calculate_stddev",
+    "calculate_max_drawdown",
+)
+
+def _library_path() -> str:
+    if LIBRARY:
+        return LIBRARY
+    if os.path.exists(lib_path):
+        if build.is_current(lib_path):
+            return lib_path
+        logger.info("Ignoring %s: it was not built from the current analytics.cpp", lib_path)
+    if not AUTO_BUILD:
+        raise FileNotFoundError(
+            f"No C++ library built from the current analytics.cpp at {lib_path}. "
+            "Please compile 'analytics.cpp' with 'python src/cpp/build.py' or set BACKTEST_LIBRARY."
+        )
+    try:
+        return build.build_cached(march_native=MARCH_NATIVE)
+    except (RuntimeError, OSError) as e:
+        raise FileNotFoundError(f"C++ library for the current analytics.cpp could not be built: {e}") from e
+
 def load_library():
-    global _analytics_lib
+    """Load the shared library, building it into the user cache dir on first use if needed.
+
+    A failure is remembered, so later calls raise again without retrying the build.
+    """
+    global _analytics_lib, _load_error
     if _analytics_lib is not None:
         return _analytics_lib
+    if _load_error is not None:
+        raise _load_error
 
-    if not os.path.exists(lib_path):
-        raise FileNotFoundError(
-            f"C++ library not found at {lib_path}. "
-            "Please compile 'analytics.cpp' to a shared library."
-        )
+    try:
+        path = _library_path()
+    except FileNotFoundError as e:
+        _load_error = e
+        raise
 
     try:
-        _analytics_lib = ctypes.CDLL(lib_path)
+        lib = ctypes.CDLL(path)
 
         # Define argument types for safety
-        # void calculate_sma(const double* data, int length, int window, double* result)
-        _analytics_lib.calculate_sma.argtypes = [
-            ctypes.POINTER(ctypes.c_double),
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.POINTER(ctypes.c_double)
-        ]
-
-        # void calculate_ema(const double* data, int length, int window, double* result)
-        _analytics_lib.calculate_ema.argtypes = [
-            ctypes.POINTER(ctypes.c_double),
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.POINTER(ctypes.c_double)
-        ]
-
-        # void calculate_rsi(const double* data, int length, int window, double* result)
-        _analytics_lib.calculate_rsi.argtypes = [
-            ctypes.POINTER(ctypes.c_double),
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.POINTER(ctypes.c_double)
-        ]
-
-        # void calculate_stddev(const double* data, int length, int window, double* result)
-        _analytics_lib.calculate_stddev.argtypes = [
-            ctypes.POINTER(ctypes.c_double),
-            ctypes.c_int,
-            ctypes.c_int,
-            ctypes.POINTER(ctypes.c_double)
-        ]
-
-        # void calculate_max_drawdown(const double* data, int length, double* result)
-        _analytics_lib.calculate_max_drawdown.argtypes = [
-            ctypes.POINTER(ctypes.c_double),
-            ctypes.c_int,
-            ctypes.POINTER(ctypes.c_double)
-        ]
+        for name, argtypes in _SIGNATURES.items():
+            function = getattr(lib, name, None)
+            if function is None:
+                if name in _REQUIRED:
+                    raise AttributeError(f"missing symbol {name}")
+                continue
+            function.argtypes = argtypes
+            function.restype = None
+            _functions[name] = function
 
+        _analytics_lib = lib
         return _analytics_lib
 
     except Exception as e:
         # Re-raise the exception so the user knows why it failed
-        raise RuntimeError(f"Failed to load C++ library at {lib_path}: {e}") from e
+        _load_error = RuntimeError(f"Failed to load C++ library at {path}: {e}")
+        raise _load_error from e
 
-def _prepare_array(arr):
-    arr = np.ascontiguousarray(arr, dtype=np.float64)
-    return arr, arr.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+def set_backend(backend: str) -> None:
+    """Select the default backend of the calculate_* functions: "auto", "native", "numpy" or "pandas"."""
+    global _backend, _resolved_backend
+    if backend != "auto" and backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}; expected 'auto' or one of {BACKENDS}")
+    _backend = backend
+    _resolved_backend = None
 
-def calculate_sma(data: np.ndarray, window: int) -> np.ndarray:
-    lib = load_library()
-    if lib is None:
-        raise RuntimeError("C++ library not loaded")
+def get_backend() -> str:
+    """The backend used when no ``backend=`` is passed, resolving "auto" on first call."""
+    global _resolved_backend
+    if _resolved_backend is None:
+        if _backend != "auto":
+            _resolved_backend = _backend
+        else:
+            try:
+                load_library()
+                _resolved_backend = "native"
+            except (FileNotFoundError, RuntimeError) as e:
+                logger.warning("Native analytics unavailable (%s); using the NumPy backend", e)
+                _resolved_backend = "numpy"
+    return _resolved_backend
 
-    data_arr, data_ptr = _prepare_array(data)
-    length = len(data_arr)
-    result = np.zeros(length, dtype=np.float64)
-    result_ptr = result.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+def _python_backend(backend: str):
+    if backend == "numpy":
+        from src.cpp import numpy_backend
 
-    lib.calculate_sma(data_ptr, length, window, result_ptr)
-    return result
+        return numpy_backend
+    if backend == "pandas":
+        from src.cpp import pandas_backend
 
-def calculate_ema(data: np.ndarray, window: int) -> np.ndarray:
-    lib = load_library()
-    if lib is None:
-        raise RuntimeError("C++ library not loaded")
+        return pandas_backend
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {BACKENDS}")
 
-    data_arr, data_ptr = _prepare_array(data)
-    length = len(data_arr)
-    result = np.zeros(length, dtype=np.float64)
-    result_ptr = result.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+def _function(name: str):
+    function = _functions.get(name)
+    if function is None:
+        load_library()
+        function = _functions.get(name)
+        if function is None:
+            raise RuntimeError(
+                f"{name} is missing from {lib_path}; rebuild the library with 'python src/cpp/build.py'."
+            )
+    return function
 
-    lib.calculate_ema(data_ptr, length, window, result_ptr)
-    return result
+def _as_input(data) -> np.ndarray:
+    # No copy when data is already a C-contiguous float64 array.
+    return np.ascontiguousarray(data, dtype=np.float64)
 
-def calculate_rsi(data: np.ndarray, window: int) -> np.ndarray:
-    lib = load_library()
-    if lib is None:
-        raise RuntimeError("C++ library not loaded")
+def _as_output(out, shape) -> np.ndarray:
+    if out is None:
+        return np.empty(shape, dtype=np.float64)
+    if (
+        out.shape != shape
+        or out.dtype != np.float64
+        or not out.flags.c_contiguous
+        or not out.flags.writeable
+    ):
+        raise ValueError(f"out must be a writeable C-contiguous float64 array of shape {shape}")
+    return out
 
-    data_arr, data_ptr = _prepare_array(data)
-    length = len(data_arr)
-    result = np.zeros(length, dtype=np.float64)
-    result_ptr = result.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+# One pool per requested size. Pools are never shut down, since another
+# thread may still be submitting to one; idle workers cost little.
+_pools = {}
+_pool_lock = threading.Lock()
 
-    lib.calculate_rsi(data_ptr, length, window, result_ptr)
-    return result
+def _thread_pool(n_threads: int) -> ThreadPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(n_threads)
+        if pool is None:
+            pool = _pools[n_threads] = ThreadPoolExecutor(max_workers=n_threads, thread_name_prefix="analytics")
+        return pool
+
+def _run_batch(function, data: np.ndarray, result: np.ndarray, extra: tuple, n_threads) -> None:
+    n_series, length = data.shape
+    if not n_threads or n_threads <= 1 or n_series < 2:
+        function(data.ctypes.data, n_series, length, *extra, result.ctypes.data)
+        return
 
-def calculate_stddev(data: np.ndarray, window: int) -> np.ndarray:
-    lib = load_library()
-    if lib is None:
-        raise RuntimeError("C++ library not loaded")
+    # ctypes releases the GIL for the duration of each native call, so row
+    # blocks of the universe are processed concurrently.
+    row_bytes = length * data.itemsize
+    bounds = np.linspace(0, n_series, min(n_threads, n_series) + 1).astype(int).tolist()
 
-    data_arr, data_ptr = _prepare_array(data)
-    length = len(data_arr)
-    result = np.zeros(length, dtype=np.float64)
-    result_ptr = result.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+    def call(lo, hi):
+        function(data.ctypes.data + lo * row_bytes, hi - lo, length, *extra, result.ctypes.data + lo * row_bytes)
 
-    lib.calculate_stddev(data_ptr, length, window, result_ptr)
+    list(_thread_pool(n_threads).map(call, bounds[:-1], bounds[1:]))
+
+def _calculate(name: str, data, extra: tuple, out, n_threads, backend) -> np.ndarray:
+    data_arr = _as_input(data)
+    if data_arr.ndim not in (1, 2):
+        raise ValueError("data must be 1-D (time) or 2-D (series x time)")
+    backend = backend or get_backend()
+    if backend != "native":
+        values = getattr(_python_backend(backend), name[len("calculate_"):])(data_arr, *extra)
+        if out is None:
+            return values
+        result = _as_output(out, data_arr.shape)
+        result[...] = values
+        return result
+
+    result = _as_output(out, data_arr.shape)
+    if data_arr.ndim == 1:
+        _function(name)(data_arr.ctypes.data, data_arr.shape[0], *extra, result.ctypes.data)
+    else:
+        _run_batch(_function(f"{name}_batch"), data_arr, result, extra, n_threads)
     return result
 
-def calculate_max_drawdown(data: np.ndarray) -> np.ndarray:
-    lib = load_library()
-    if lib is None:
-        raise RuntimeError("C++ library not loaded")
+# The calculate_* functions accept either one series (1-D) or an
+# (n_series x length) block such as assets x time (2-D), computed in one native
+# call. Pass out= to write into a preallocated float64 buffer of the same shape,
+# and n_threads= to split a 2-D block across a thread pool. Libraries built with
+# OpenMP already parallelise 2-D blocks, so n_threads is mainly for builds without it.
+# backend= overrides the default backend (see set_backend) for one call;
+# n_threads only applies to the native backend.
+
+def calculate_sma(data: np.ndarray, window: int, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_sma", data, (window,), out, n_threads, backend)
+
+def calculate_ema(data: np.ndarray, window: int, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_ema", data, (window,), out, n_threads, backend)
+
+def calculate_rsi(data: np.ndarray, window: int, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_rsi", data, (window,), out, n_threads, backend)
+
+def calculate_stddev(data: np.ndarray, window: int, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_stddev", data, (window,), out, n_threads, backend)
 
-    data_arr, data_ptr = _prepare_array(data)
-    length = len(data_arr)
-    result = np.zeros(length, dtype=np.float64)
-    result_ptr = result.ctypes.data_as(ctypes.POINTER(ctypes.c_double))
+def calculate_max_drawdown(data: np.ndarray, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_max_drawdown", data, (), out, n_threads, backend)
 
-    lib.calculate_max_drawdown(data_ptr, length, result_ptr)
+def calculate_rolling_max(data: np.ndarray, window: int, out: np.ndarray = None, n_threads: int = None, backend: str = None) -> np.ndarray:
+    return _calculate("calculate_rolling_max", data, (window,), out, n_threads, backend)
+
+def _calculate_multi(name: str, data: np.ndarray, windows, out, backend) -> np.ndarray:
+    data_arr = _as_input(data)
+    windows_arr = np.ascontiguousarray(windows, dtype=np.intc)
+    result = _as_output(out, (len(windows_arr), len(data_arr)))
+
+    backend = backend or get_backend()
+    if backend != "native":
+        result[...] = getattr(_python_backend(backend), name[len("calculate_"):])(data_arr, windows_arr)
+        return result
+    _function(name)(data_arr.ctypes.data, len(data_arr), windows_arr.ctypes.data, len(windows_arr), result.ctypes.data)
     return result
+
+def calculate_sma_multi(data: np.ndarray, windows, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Return an (len(windows), len(data)) block with one SMA row per window."""
+    return _calculate_multi("calculate_sma_multi", data, windows, out, backend)
+
+def calculate_stddev_multi(data: np.ndarray, windows, out: np.ndarray = None, backend: str = None) -> np.ndarray:
+    """Return an (len(windows), len(data)) block with one rolling sample stddev row per window."""
+    return _calculate_multi("calculate_stddev_multi", data, windows, out, backend)
+
+def simulate_execution(open_, high, low, close, signal, params, size=None, n_threads: int = None) -> dict:
+    """Run the path-dependent execution kernel over *signal*.
+
+    Args:
+        open_, high, low, close: Price series of length n.
+        signal: (n,) signal series, or an (n_series, n) block of signals over the same prices.
+        params: fee, stop_loss, take_profit, trailing_stop, max_holding (non-positive disables a rule).
+        size (optional): Position size multipliers shaped like *signal*; 1 when omitted.
+        n_threads (int, optional): Split a 2-D block across a thread pool.
+
+    Only the native backend implements the execution kernel; without the
+    library this raises, and ``src.engine.execution`` uses its Python loop.
+
+    Returns:
+        dict: ``position``, ``trades``, ``strategy_returns`` and ``exit_price``
+        (float64) and ``exit_reason`` (int32), each shaped like *signal*.
+    """
+    prices = [_as_input(series) for series in (open_, high, low, close)]
+    signal_arr = _as_input(signal)
+    length = prices[3].shape[0]
+    if signal_arr.shape[-1] != length or any(series.shape != (length,) for series in prices):
+        raise ValueError("prices must be 1-D and match the length of signal")
+    size_arr = None if size is None else _as_input(size)
+    if size_arr is not None and size_arr.shape != signal_arr.shape:
+        raise ValueError("size must have the shape of signal")
+    params_arr = np.ascontiguousarray(params, dtype=np.float64)
+
+    outputs = {name: np.empty(signal_arr.shape) for name in ("position", "trades", "strategy_returns", "exit_price")}
+    outputs["exit_reason"] = np.empty(signal_arr.shape, dtype=np.int32)
+    order = ("position", "trades", "strategy_returns", "exit_price", "exit_reason")
+    price_ptrs = [series.ctypes.data for series in prices]
+
+    if signal_arr.ndim == 1:
+        _function("simulate_execution")(
+            *price_ptrs, signal_arr.ctypes.data, size_arr.ctypes.data if size_arr is not None else None,
+            length, params_arr.ctypes.data, *(outputs[name].ctypes.data for name in order),
+        )
+        return outputs
+    if signal_arr.ndim != 2:
+        raise ValueError("signal must be 1-D (time) or 2-D (series x time)")
+
+    function = _function("simulate_execution_batch")
+    row_bytes = length * 8
+
+    def call(lo, hi):
+        offset = lo * row_bytes
+        function(
+            *price_ptrs, signal_arr.ctypes.data + offset,
+            size_arr.ctypes.data + offset if size_arr is not None else None,
+            hi - lo, length, params_arr.ctypes.data,
+            *(outputs[name].ctypes.data + lo * length * outputs[name].itemsize for name in order),
+        )
+
+    n_series = len(signal_arr)
+    if not n_threads or n_threads <= 1 or n_series < 2:
+        call(0, n_series)
+    else:
+        bounds = np.linspace(0, n_series, min(n_threads, n_series) + 1).astype(int).tolist()
+        list(_thread_pool(n_threads).map(call, bounds[:-1], bounds[1:]))
+    return outputs
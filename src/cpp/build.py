@@ -1,41 +1,171 @@
+"""Compile analytics.cpp into a shared library.
+
+Run directly (``python src/cpp/build.py [--march-native] [--no-openmp]``) to
+build next to the source, or let ``bridge`` call ``build_cached`` on first
+use, which compiles once per source hash and flag set into a user cache dir.
+A library built next to the source records the hash of the source it came
+from, and ``bridge`` only loads it while that still matches.
+"""
+import argparse
+import hashlib
+import logging
 import os
-import subprocess
 import platform
+import subprocess
 import sys
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_FILE = os.path.join(SRC_DIR, "analytics.cpp")
+
+
+def library_extension() -> str:
+    return {"Windows": ".dll", "Darwin": ".dylib"}.get(platform.system(), ".so")
 
-def build():
-    src_dir = os.path.dirname(os.path.abspath(__file__))
-    src_file = os.path.join(src_dir, "analytics.cpp")
 
+def cache_dir() -> str:
+    """Per-user directory for compiled libraries (``~/.cache/equity-backtest/native`` on Linux)."""
     system = platform.system()
     if system == "Windows":
-        output_file = os.path.join(src_dir, "analytics.dll")
-        cmd_msvc = ["cl", "/LD", "/O2", src_file, f"/Fe{output_file}"]
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif system == "Darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "equity-backtest", "native")
+
+
+def source_digest() -> str:
+    """Hash of analytics.cpp."""
+    with open(SRC_FILE, "rb") as f:
+        return hashlib.blake2b(f.read(), digest_size=12).hexdigest()
+
+
+def stamp_path(library: str) -> str:
+    """File next to an in-tree library holding the source_digest it was built from."""
+    return f"{library}.source"
+
 
-        cmd_mingw = ["g++", "-shared", "-o", output_file, src_file, "-O3", "-static"]
+def is_current(library: str) -> bool:
+    """Whether *library* was built by ``build`` from the current analytics.cpp."""
+    try:
+        with open(stamp_path(library)) as f:
+            return f.read().strip() == source_digest()
+    except FileNotFoundError:
+        return False
 
-        commands = [("MinGW (g++)", cmd_mingw), ("MSVC (cl)", cmd_msvc)]
+
+def compile_commands(output_file: str, march_native: bool = False, openmp: bool = True) -> list:
+    """Candidate (name, command) pairs to try in order, best first."""
+    if platform.system() == "Windows":
+        cmd_msvc = ["cl", "/LD", "/O2", SRC_FILE, f"/Fe{output_file}"]
+        cmd_mingw = ["g++", "-shared", "-o", output_file, SRC_FILE, "-O3", "-static"]
+        if march_native:
+            cmd_mingw.append("-march=native")
+        commands = [
+            ("MinGW (g++) + OpenMP", cmd_mingw + ["-fopenmp"]),
+            ("MinGW (g++)", cmd_mingw),
+            ("MSVC (cl) + OpenMP", cmd_msvc[:2] + ["/openmp"] + cmd_msvc[2:]),
+            ("MSVC (cl)", cmd_msvc),
+        ]
     else:
-        output_file = os.path.join(src_dir, "analytics.so")
-        cmd_gcc = ["g++", "-shared", "-fPIC", "-o", output_file, src_file, "-O3"]
-        cmd_clang = ["clang++", "-shared", "-fPIC", "-o", output_file, src_file, "-O3"]
-        commands = [("GCC", cmd_gcc), ("Clang", cmd_clang)]
-
-    success = False
-    for name, cmd in commands:
-        print(f"Trying to compile with {name}...")
+        flags = ["-O3"] + (["-march=native"] if march_native else [])
+        cmd_gcc = ["g++", "-shared", "-fPIC", "-o", output_file, SRC_FILE] + flags
+        cmd_clang = ["clang++", "-shared", "-fPIC", "-o", output_file, SRC_FILE] + flags
+        # OpenMP parallelises the multi-window kernels; fall back to a serial build without it.
+        commands = [
+            ("GCC + OpenMP", cmd_gcc + ["-fopenmp"]),
+            ("GCC", cmd_gcc),
+            ("Clang + OpenMP", cmd_clang + ["-fopenmp"]),
+            ("Clang", cmd_clang),
+        ]
+    if not openmp:
+        commands = [(name, cmd) for name, cmd in commands if "OpenMP" not in name]
+    return commands
+
+
+def build(output_file: str = None, march_native: bool = False, openmp: bool = True) -> str:
+    """Compile with the first compiler that works and return the library path.
+
+    Without *output_file* the library goes next to the source, stamped with
+    the source hash (see is_current).
+
+    Raises:
+        RuntimeError: No compiler could build the library.
+    """
+    in_tree = output_file is None
+    if in_tree:
+        output_file = os.path.join(SRC_DIR, f"analytics{library_extension()}")
+    for name, cmd in compile_commands(output_file, march_native, openmp):
+        logger.info("Trying to compile with %s...", name)
         try:
-            subprocess.check_call(cmd)
-            print(f"Successfully compiled to {output_file}")
-            success = True
-            break
+            subprocess.run(cmd, check=True, capture_output=True)
+            logger.info("Successfully compiled to %s", output_file)
+            if in_tree:
+                with open(stamp_path(output_file), "w") as f:
+                    f.write(source_digest())
+            return output_file
         except (subprocess.CalledProcessError, FileNotFoundError):
-            print(f"Failed with {name}")
+            logger.info("Failed with %s", name)
+    raise RuntimeError(
+        "Could not compile the C++ library. Please ensure you have a C++ compiler installed (g++, clang++, or MSVC)."
+    )
+
+
+def build_key(march_native: bool = False, openmp: bool = True) -> str:
+    """Hash of the source, the compile commands and the platform; names the cached library."""
+    digest = hashlib.blake2b(digest_size=12)
+    with open(SRC_FILE, "rb") as f:
+        digest.update(f.read())
+    for name, cmd in compile_commands("<out>", march_native, openmp):
+        digest.update(" ".join(cmd).replace(SRC_FILE, "<src>").encode())
+    digest.update(f"{platform.system()}-{platform.machine()}".encode())
+    return digest.hexdigest()
 
-    if not success:
-        print("Could not compile the C++ library. Please ensure you have a C++ compiler installed (g++, clang++, or MSVC).")
+
+def build_cached(march_native: bool = False, openmp: bool = True, directory: str = None) -> str:
+    """Path of the library built from the current source with these flags, compiling it if needed.
+
+    The library is compiled to a temporary file and moved into place, so
+    processes building at the same time never load a partial file.
+    """
+    directory = directory or cache_dir()
+    path = os.path.join(directory, f"analytics-{build_key(march_native, openmp)}{library_extension()}")
+    if os.path.exists(path):
+        return path
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=library_extension())
+    os.close(fd)
+    try:
+        build(tmp, march_native, openmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile analytics.cpp")
+    parser.add_argument("--march-native", action="store_true", help="Optimise for this machine's CPU")
+    parser.add_argument("--no-openmp", action="store_true", help="Build without OpenMP")
+    parser.add_argument("--cache", action="store_true", help="Build into the user cache dir used by bridge")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    try:
+        if args.cache:
+            path = build_cached(args.march_native, not args.no_openmp)
+        else:
+            path = build(march_native=args.march_native, openmp=not args.no_openmp)
+    except RuntimeError as e:
+        print(e)
         print("On Windows, you can install MinGW or Visual Studio Build Tools.")
         sys.exit(1)
+    print(path)
+
 
 if __name__ == "__main__":
-    build()
+    main()
@@ -0,0 +1,167 @@
+"""Vectorized NumPy versions of the analytics.cpp indicators.
+
+Used by ``bridge`` when the shared library cannot be loaded or built, and
+selectable with ``backend="numpy"`` for comparisons. Every function takes one
+series (1-D) or an (n_series, length) block and works along the last axis,
+with the conventions of the C++ kernels: NaN until a window is full, NaN for
+windows containing NaN, EMA seeded with the SMA of the first window and RSI
+with the mean gain/loss of the first *window* changes.
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Cap on the (bars x window) deviations materialised at once by stddev.
+_WINDOW_CHUNK = 1 << 22
+
+# Bars covered by one run of prefix sums in sma.
+_SUM_BLOCK = 1 << 12
+
+# Largest growth of the scale factors in one block of the EMA recursion;
+# bounds the rounding error of the blocked solution to about 1e-12.
+_EMA_SCALE = 1e4
+
+
+def _nan_like(data: np.ndarray) -> np.ndarray:
+    return np.full(data.shape, np.nan)
+
+
+def sma(data: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average from prefix sums, O(n) in the series length.
+
+    The prefix sums restart every _SUM_BLOCK bars and are centred on the
+    block's first value, which keeps their rounding error near that of a
+    direct window sum on long, trending series.
+    """
+    result = _nan_like(data)
+    length = data.shape[-1]
+    if window <= 0 or length < window:
+        return result
+    step = max(_SUM_BLOCK, 4 * window)
+    for first in range(window - 1, length, step):
+        last = min(first + step, length)
+        segment = data[..., first - window + 1:last]
+        missing = np.isnan(segment)
+        origin = np.nan_to_num(segment[..., :1], nan=0.0)
+        sums = np.cumsum(np.where(missing, 0.0, segment - origin), axis=-1)
+        counts = np.cumsum(missing, axis=-1)
+        window_sums = sums[..., window - 1:].copy()
+        window_sums[..., 1:] -= sums[..., :-window]
+        window_missing = counts[..., window - 1:].copy()
+        window_missing[..., 1:] -= counts[..., :-window]
+        result[..., first:last] = np.where(window_missing > 0, np.nan, window_sums / window + origin)
+    return result
+
+
+def stddev(data: np.ndarray, window: int) -> np.ndarray:
+    """Rolling sample standard deviation, two-pass per window: O(n * window), but
+    free of the drift of running updates (a flat stretch gives exactly 0)."""
+    result = _nan_like(data)
+    length = data.shape[-1]
+    if window < 2 or length < window:
+        return result
+    rows = int(np.prod(data.shape[:-1], dtype=np.int64))
+    step = max(1, _WINDOW_CHUNK // (window * max(rows, 1)))
+    for first in range(window - 1, length, step):
+        last = min(first + step, length)
+        view = sliding_window_view(data[..., first - window + 1:last], window, axis=-1)
+        deviations = view - view.mean(axis=-1, keepdims=True)
+        squares = np.einsum("...i,...i->...", deviations, deviations)
+        result[..., first:last] = np.sqrt(squares / (window - 1))
+    return result
+
+
+def rolling_max(data: np.ndarray, window: int) -> np.ndarray:
+    """Rolling maximum by doubling: O(n log window) with NaN propagated like pandas."""
+    result = _nan_like(data)
+    length = data.shape[-1]
+    if window <= 0 or length < window:
+        return result
+    span = 1
+    spans = data
+    # spans[..., i] holds the maximum of data[..., i:i + span].
+    while span * 2 <= window:
+        spans = np.maximum(spans[..., :-span], spans[..., span:])
+        span *= 2
+    count = length - window + 1
+    result[..., window - 1:] = np.maximum(spans[..., :count], spans[..., window - span:window - span + count])
+    return result
+
+
+def _recursive(values: np.ndarray, alpha: float, seed: np.ndarray) -> np.ndarray:
+    """``y[t] = y[t-1] + alpha * (values[t] - y[t-1])`` with ``y[-1] = seed``, solved in blocks.
+
+    Within a block of *k* bars the recursion has the closed form
+    ``y[j] = r^(j+1) * y[-1] + alpha * sum_i r^(j-i) * values[i]`` with
+    ``r = 1 - alpha``, which is a scaled prefix sum. Blocks are kept short
+    enough that the scale factors stay within _EMA_SCALE.
+    """
+    decay = 1.0 - alpha
+    length = values.shape[-1]
+    result = np.empty(values.shape)
+    if decay <= 0.0:
+        # y[t] = values[t], except that a NaN, as in the kernels' update, never leaves the state.
+        stuck = np.logical_or.accumulate(np.isnan(values), axis=-1)
+        stuck |= np.isnan(np.asarray(seed, dtype=np.float64))[..., None]
+        result[...] = np.where(stuck, np.nan, values)
+        return result
+    block = int(max(1, min(length, np.log(_EMA_SCALE) / -np.log(decay)))) if decay < 1.0 else length
+    powers = decay ** np.arange(1, block + 1)
+    previous = np.asarray(seed, dtype=np.float64)
+    for first in range(0, length, block):
+        last = min(first + block, length)
+        size = last - first
+        scale = powers[:size]
+        sums = np.cumsum(values[..., first:last] / scale, axis=-1)
+        result[..., first:last] = scale * (previous[..., None] + alpha * sums)
+        previous = result[..., last - 1]
+    return result
+
+
+def ema(data: np.ndarray, window: int) -> np.ndarray:
+    """Exponential moving average with ``alpha = 2 / (window + 1)``, seeded with the first window's SMA."""
+    result = _nan_like(data)
+    length = data.shape[-1]
+    if window <= 0 or length < window:
+        return result
+    seed = data[..., :window].sum(axis=-1) / window
+    result[..., window - 1] = seed
+    if length > window:
+        result[..., window:] = _recursive(data[..., window:], 2.0 / (window + 1), seed)
+    return result
+
+
+def rsi(data: np.ndarray, window: int) -> np.ndarray:
+    """Wilder RSI: gains and losses smoothed with ``alpha = 1 / window`` after a simple-mean seed."""
+    result = _nan_like(data)
+    length = data.shape[-1]
+    if window <= 0 or length <= window:
+        return result
+    change = np.diff(data, axis=-1)
+    gains = np.where(change > 0, change, 0.0)
+    losses = np.where(change > 0, 0.0, -change)
+    avg_gain = np.empty(gains.shape[:-1] + (length - window,))
+    avg_loss = np.empty(avg_gain.shape)
+    avg_gain[..., 0] = gains[..., :window].sum(axis=-1) / window
+    avg_loss[..., 0] = losses[..., :window].sum(axis=-1) / window
+    if length > window + 1:
+        avg_gain[..., 1:] = _recursive(gains[..., window:], 1.0 / window, avg_gain[..., 0])
+        avg_loss[..., 1:] = _recursive(losses[..., window:], 1.0 / window, avg_loss[..., 0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    result[..., window:] = np.where(avg_loss == 0, 100.0, values)
+    return result
+
+
+def max_drawdown(data: np.ndarray) -> np.ndarray:
+    """Running drawdown from the highest value so far (NaNs do not move the peak)."""
+    peak = np.fmax(np.fmax.accumulate(data, axis=-1), -1e9)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(peak != 0, (data - peak) / peak, 0.0)
+
+
+def sma_multi(data: np.ndarray, windows) -> np.ndarray:
+    return np.stack([sma(data, int(window)) for window in windows]) if len(windows) else np.empty((0, len(data)))
+
+
+def stddev_multi(data: np.ndarray, windows) -> np.ndarray:
+    return np.stack([stddev(data, int(window)) for window in windows]) if len(windows) else np.empty((0, len(data)))
@@ -0,0 +1,85 @@
+"""pandas versions of the analytics.cpp indicators, the reference for ``backend="pandas"``.
+
+Same inputs, outputs and conventions as ``numpy_backend``; the EMA and RSI
+recursions start from the same simple-average seeds as the C++ kernels, so
+all three backends agree to rounding.
+"""
+import numpy as np
+import pandas as pd
+
+
+def _frame(data: np.ndarray) -> pd.DataFrame:
+    # pandas works column-wise, so series become columns.
+    return pd.DataFrame(np.atleast_2d(data).T)
+
+
+def _values(frame: pd.DataFrame, data: np.ndarray) -> np.ndarray:
+    return frame.to_numpy().T.reshape(data.shape)
+
+
+def sma(data: np.ndarray, window: int) -> np.ndarray:
+    if window <= 0:
+        return np.full(data.shape, np.nan)
+    return _values(_frame(data).rolling(window).mean(), data)
+
+
+def stddev(data: np.ndarray, window: int) -> np.ndarray:
+    if window < 2:
+        return np.full(data.shape, np.nan)
+    return _values(_frame(data).rolling(window).std(), data)
+
+
+def rolling_max(data: np.ndarray, window: int) -> np.ndarray:
+    if window <= 0:
+        return np.full(data.shape, np.nan)
+    return _values(_frame(data).rolling(window).max(), data)
+
+
+def _seeded_ewm(frame: pd.DataFrame, seed: pd.Series, alpha: float) -> pd.DataFrame:
+    """EWM (adjust=False) of *frame* whose first row is replaced by *seed*."""
+    seeded = pd.concat([seed.to_frame().T, frame], ignore_index=True)
+    # ignore_na=False matches the kernels: a NaN stays NaN for the rest of the series.
+    return seeded.ewm(alpha=alpha, adjust=False).mean().where(~seeded.isna().cummax())
+
+
+def ema(data: np.ndarray, window: int) -> np.ndarray:
+    length = data.shape[-1]
+    result = np.full(data.shape, np.nan)
+    if window <= 0 or length < window:
+        return result
+    frame = _frame(data)
+    smoothed = _seeded_ewm(frame.iloc[window:], frame.iloc[:window].sum(skipna=False) / window, 2.0 / (window + 1))
+    result[..., window - 1:] = _values(smoothed, result[..., window - 1:])
+    return result
+
+
+def rsi(data: np.ndarray, window: int) -> np.ndarray:
+    length = data.shape[-1]
+    result = np.full(data.shape, np.nan)
+    if window <= 0 or length <= window:
+        return result
+    change = _frame(data).diff().iloc[1:]
+    gains = change.where(change > 0, 0.0).where(change.notna())
+    losses = (-change).where(change <= 0, 0.0).where(change.notna())
+    avg_gain = _seeded_ewm(gains.iloc[window:], gains.iloc[:window].sum(skipna=False) / window, 1.0 / window)
+    avg_loss = _seeded_ewm(losses.iloc[window:], losses.iloc[:window].sum(skipna=False) / window, 1.0 / window)
+    values = (100.0 - 100.0 / (1.0 + avg_gain / avg_loss)).where(avg_loss != 0, 100.0)
+    result[..., window:] = _values(values, result[..., window:])
+    return result
+
+
+def max_drawdown(data: np.ndarray) -> np.ndarray:
+    frame = _frame(data)
+    # The peak holds through missing values, as in the kernel.
+    peak = frame.cummax().ffill().fillna(-1e9).clip(lower=-1e9)
+    return _values(((frame - peak) / peak).where(peak != 0, 0.0), data)
+
+
+def sma_multi(data: np.ndarray, windows) -> np.ndarray:
+    series = pd.Series(data)
+    return np.array([series.rolling(int(window)).mean().to_numpy() for window in windows]).reshape(len(windows), len(data))
+
+
+def stddev_multi(data: np.ndarray, windows) -> np.ndarray:
+    series = pd.Series(data)
+    return np.array([series.rolling(int(window)).std().to_numpy() for window in windows]).reshape(len(windows), len(data))
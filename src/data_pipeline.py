@@ -1,56 +1,503 @@
+import copy
+import json
+import logging
 import os
+import random
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
+import numpy as np
 import warnings
-import yfinance as yf
+from pandas.tseries.frequencies import to_offset
+
+from src.data_providers import DataProvider, YahooProvider
+from src.engine.profiler import NullProfiler, Profiler
 
 warnings.filterwarnings('ignore')
+
+logger = logging.getLogger(__name__)
+
+# Default bar frequency; pass DataLoader(freq=...) for intraday bars, e.g. '1min'.
+RESAMPLE_FREQ = '1D'
+CACHE_VERSION = 2
+# Rows parsed per CSV chunk; bounds the loader's memory independently of the file size.
+CHUNK_ROWS = 500_000
+
+# How each OHLCV column is aggregated into a bar.
+OHLCV_AGGREGATION = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+
+class _UnsortedSource(Exception):
+    """A CSV chunk starts before bars that were already completed."""
+
+
 class DataLoader:
-    
-    def load_data(self, ticker: str):   
-        print("--- Loading Data... ---")
-        # Resolve project root and data directory reliably (file-location based)
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        data_dir = os.path.join(base_dir, 'data')
-        filepath = os.path.join(data_dir, f"{ticker}.csv")
+
+    def __init__(
+        self,
+        data_dir: str = None,
+        use_cache: bool = True,
+        mmap: bool = True,
+        profiler=None,
+        freq: str = RESAMPLE_FREQ,
+        chunksize: int = CHUNK_ROWS,
+        provider: DataProvider = None,
+        retries: int = 3,
+        backoff: float = 1.0,
+    ) -> None:
+        """
+        Args:
+            data_dir (str, optional): Directory holding ``<TICKER>.csv`` files.
+                Defaults to ``data/`` at the project root.
+            use_cache (bool): Keep parsed, resampled frames in a binary cache
+                under ``<data_dir>/.cache`` and reuse them while the CSV is unchanged.
+            mmap (bool): Memory-map cached arrays instead of reading them into memory.
+                Frames loaded this way are read-only views of the cache files.
+            profiler (Profiler, optional): Receives a ``load_data`` stage per call,
+                split into cache read, CSV streaming and cache write.
+            freq (str): Bar frequency the source is aggregated to, as a pandas
+                offset alias such as ``'1D'``, ``'1h'`` or ``'1min'``.
+            chunksize (int): CSV rows parsed at a time. Bars are aggregated chunk by
+                chunk and, with the cache on, written straight to it, so peak memory
+                depends on this rather than on the size of the file.
+            provider (DataProvider, optional): Where missing or stale histories are
+                fetched from. Defaults to YahooProvider (daily bars).
+            retries (int): Extra attempts for a failed fetch.
+            backoff (float): Seconds before the first retry, doubled per attempt
+                with random jitter.
+        """
+        if data_dir is None:
+            # Resolve project root and data directory reliably (file-location based)
+            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+            data_dir = os.path.join(base_dir, 'data')
+        self.data_dir = data_dir
+        self.use_cache = use_cache
+        self.mmap = mmap
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.freq = freq
+        self.chunksize = chunksize
+        self.provider = provider if provider is not None else YahooProvider()
+        self.retries = retries
+        self.backoff = backoff
+
+    def load_data(self, ticker: str, freq: str = None):
+        """Load *ticker* as OHLCV bars of *freq* (defaults to the loader's ``freq``)."""
+        logger.info("--- Loading Data... ---")
+        freq = to_offset(freq or self.freq).freqstr
+        with self.profiler.stage(f"load_data:{ticker}") as stage:
+            df = self._load(ticker, freq)
+            stage.rows = len(df)
+        return df
+
+    def load_many(self, tickers, max_workers: int = 8, refresh: bool = True, freq: str = None, skip_errors: bool = False) -> dict:
+        """Bring every ticker up to date and load it, fetching concurrently.
+
+        Args:
+            tickers: Symbols to load; duplicates are loaded once.
+            max_workers (int): Size of the thread pool. Fetches are I/O bound,
+                so threads overlap the network waits.
+            refresh (bool): Append bars newer than each CSV's last row (see
+                ``refresh``) before loading. Otherwise only missing CSVs are fetched.
+            freq (str, optional): Bar frequency, defaulting to the loader's ``freq``.
+            skip_errors (bool): Log tickers that fail and leave them out instead
+                of raising once every ticker has been tried.
+
+        Returns:
+            dict: Maps each loaded ticker to its frame, in input order.
+        """
+        tickers = list(dict.fromkeys(tickers))
+
+        def task(ticker):
+            # Profiler stages nest per thread, so each task records into its own and is merged below.
+            loader = copy.copy(self)
+            loader.profiler = Profiler(memory=False) if self.profiler.enabled else NullProfiler()
+            if refresh:
+                with loader.profiler.stage(f"refresh:{ticker}") as stage:
+                    stage.rows = loader.refresh(ticker)
+            return loader.load_data(ticker, freq), loader.profiler.records
+
+        frames = {}
+        errors = {}
+        with self.profiler.stage("load_many", rows=len(tickers)):
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+                futures = [(ticker, pool.submit(task, ticker)) for ticker in tickers]
+                for ticker, future in futures:
+                    try:
+                        frames[ticker], records = future.result()
+                    except Exception as e:
+                        logger.error("Failed to load %s: %s", ticker, e)
+                        errors[ticker] = e
+                        continue
+                    self.profiler.merge(records)
+
+        if errors and not skip_errors:
+            first = next(iter(errors.values()))
+            raise RuntimeError(f"Failed to load {len(errors)} of {len(tickers)} tickers: {sorted(errors)}") from first
+        return frames
+
+    def load_panel(self, tickers, fields=None, dtype=np.float64, **kwargs):
+        """Load *tickers* with load_many and align them into a ``src.engine.panel.Panel``.
+
+        Args:
+            fields: Columns to keep; see Panel.from_frames.
+            dtype: Float dtype of the panel's arrays.
+            **kwargs: Passed to load_many.
+        """
+        from src.engine.panel import Panel
+
+        return Panel.from_frames(self.load_many(tickers, **kwargs), fields=fields, dtype=dtype)
+
+    def load_shared(self, tickers, store=None, **kwargs):
+        """Load *tickers* with load_many and publish each into shared memory once.
+
+        Worker processes get ``store.handle(ticker)`` and rebuild the frame
+        with ``src.engine.shared_frame.attach`` as zero-copy views instead of
+        unpickling a copy per task.
+
+        Args:
+            store (SharedStore, optional): Store to publish into; a new one by default.
+            **kwargs: Passed to load_many.
+
+        Returns:
+            SharedStore: Keyed by ticker. Close it (or use it as a context
+            manager) to unlink the segments.
+        """
+        from src.engine.shared_frame import SharedStore
+
+        store = store if store is not None else SharedStore()
+        for ticker, frame in self.load_many(tickers, **kwargs).items():
+            store.publish(ticker, frame)
+        return store
+
+    def refresh(self, ticker: str) -> int:
+        """Append bars newer than the last row of ``<ticker>.csv``, downloading it when missing.
+
+        Only the missing tail is requested from the provider, starting at the
+        last stored bar, which is replaced when it changed: a bar saved while
+        its session was still open is corrected on the next refresh. The cache
+        notices the changed file and is rebuilt on the next load.
+
+        Returns:
+            int: Number of rows written, including a replaced last row.
+        """
+        filepath = os.path.join(self.data_dir, f"{ticker}.csv")
+        if not os.path.exists(filepath):
+            return len(self._download_data(ticker, self.data_dir))
+
+        last, offset, last_line = _last_row(filepath)
+        history = self._fetch(ticker, start=last)
+        if last is not None:
+            history = history[history.index >= last]
+        if history.empty:
+            return 0
+
+        columns = pd.read_csv(filepath, nrows=0).columns
+        rows = history.rename_axis('Date').reset_index().reindex(columns=columns)
+        lines = rows.to_csv(header=False, index=False).encode()
+        replace = last is not None and history.index[0] == last
+        if replace:
+            if lines.split(b'\n', 1)[0].rstrip(b'\r') == last_line:
+                # The stored bar is final; only newer ones are written.
+                rows = rows.iloc[1:]
+                lines = lines.split(b'\n', 1)[1]
+                replace = False
+            if rows.empty:
+                return 0
+        with open(filepath, 'rb+') as f:
+            if replace:
+                f.truncate(offset)
+            # Start on a new line even if the file does not end with one.
+            f.seek(0, os.SEEK_END)
+            if f.tell() and (f.seek(-1, os.SEEK_END), f.read(1))[1] != b'\n':
+                f.write(b'\n')
+            f.write(lines)
+        if replace:
+            logger.info("Replaced the last bar of %s and appended %d", filepath, len(rows) - 1)
+        else:
+            logger.info("Appended %d bars to %s", len(rows), filepath)
+        return len(rows)
+
+    def _fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        """Fetch from the provider, retrying failures with exponential backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                history = self.provider.fetch(ticker, start)
+                break
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                delay = self.backoff * 2 ** attempt * (0.5 + random.random())
+                logger.warning("Fetching %s failed (%s); retry %d/%d in %.1fs", ticker, e, attempt + 1, self.retries, delay)
+                time.sleep(delay)
+
+        if history.empty and start is None:
+            raise ValueError(f"No price history returned for {ticker}")
+        if not history.empty and history.index.tz is None:
+            history = history.tz_localize('UTC')
+        return history
+
+    def _load(self, ticker: str, freq: str) -> pd.DataFrame:
+        profiler = self.profiler
+        filepath = os.path.join(self.data_dir, f"{ticker}.csv")
 
         # download_data will ensure the directory exists
         if not os.path.exists(filepath):
-            self._download_data(ticker, data_dir)
+            with profiler.stage("download"):
+                self._download_data(ticker, self.data_dir)
+
+        if self.use_cache:
+            with profiler.stage("cache_read"):
+                df = self._read_cache(ticker, filepath, freq)
+            if df is not None:
+                logger.info("--- Data is loaded (cache) ---")
+                return df
 
+        writer = _CacheWriter(self._cache_path(ticker, freq)) if self.use_cache else None
+        bars = []
         try:
-            df = pd.read_csv(filepath)
+            with profiler.stage("stream_csv") as stage:
+                stage.rows = self._stream_csv(filepath, freq, writer.append if writer else bars.append)
+        except _UnsortedSource:
+            logger.warning("%s is not sorted by date; loading it into memory to sort it", filepath)
+            if writer is not None:
+                writer.abort()
+            with profiler.stage("read_csv") as stage:
+                df = self._read_csv(filepath, freq)
+                stage.rows = len(df)
+            if not self.use_cache:
+                return df
+            writer = _CacheWriter(self._cache_path(ticker, freq))
+            writer.append(df)
+        except BaseException:
+            if writer is not None:
+                writer.abort()
+            raise
+
+        if not self.use_cache:
+            logger.info("--- Data is loaded ---")
+            return pd.concat(bars) if bars else _empty_bars()
+
+        with profiler.stage("cache_write", rows=writer.rows):
+            writer.commit(self._cache_key(ticker, filepath, freq))
+        df = self._read_cache(ticker, filepath, freq)
+
+        logger.info("--- Data is loaded ---")
+        return df
+
+    def _stream_csv(self, filepath: str, freq: str, sink) -> int:
+        """Aggregate *filepath* into *freq* bars chunk by chunk, passing completed bars to *sink*.
+
+        The last bar of each chunk stays open and is merged with the first bar of
+        the next chunk when both fall in the same period, so bars spanning a
+        chunk boundary come out the same as from one in-memory resample. Rows
+        are sorted within each chunk; raises _UnsortedSource when a chunk
+        starts before the last timestamp of the previous one.
+
+        Returns:
+            int: Number of CSV rows read.
+        """
+        rows = 0
+        origin = None
+        pending = None
+        last_timestamp = None
+        try:
+            reader = pd.read_csv(filepath, usecols=_is_source_column, chunksize=self.chunksize)
         except FileNotFoundError:
             raise FileNotFoundError(f"No file at {filepath}")
 
-        df['Date'] = pd.to_datetime(df['Date'], utc=True)
-        df.set_index('Date', inplace=True)
-        
-        df.sort_index(inplace=True)
-            
-        # TODO: Make resampling frequency configurable
-        df = df.resample('1D').agg({
-            'Open': 'first',
-            'High': 'max',
-            'Low': 'min',
-            'Close': 'last',
-            'Volume': 'sum'
-        }).dropna()    
-        
-        if df[['Open', 'High', 'Low', 'Close']].isnull().any().any():
-            df.fillna(method='ffill', inplace=True)
-            
-        print("--- Data is loaded ---")
-        return df
-    
-    def _download_data(self, ticker: str, data_dir: str) -> str:
-        """Download daily history for *ticker* into *data_dir*."""
+        with reader:
+            for chunk in reader:
+                rows += len(chunk)
+                chunk = _parse_dates(chunk).astype(np.float64)
+                if chunk.empty:
+                    continue
+                if last_timestamp is not None and chunk.index[0] < last_timestamp:
+                    raise _UnsortedSource(filepath)
+                last_timestamp = chunk.index[-1]
+                if origin is None:
+                    # Anchor every chunk's periods where one resample of the whole file would.
+                    origin = chunk.index[0].floor('D')
+                bars = chunk.resample(freq, origin=origin).agg(OHLCV_AGGREGATION)
+
+                if pending is not None:
+                    if bars.index[0] == pending.index[0]:
+                        bars.iloc[0] = _merge_bars(pending.to_numpy()[0], bars.to_numpy()[0])
+                    else:
+                        sink(pending.dropna())
+                completed = bars.iloc[:-1].dropna()
+                if len(completed):
+                    sink(completed)
+                pending = bars.iloc[-1:]
+
+        if pending is not None:
+            sink(pending.dropna())
+        return rows
+
+    def _read_csv(self, filepath: str, freq: str) -> pd.DataFrame:
+        """Read and sort the whole of *filepath* in memory, then aggregate it to *freq* bars."""
+        df = _parse_dates(pd.read_csv(filepath, usecols=_is_source_column))
+        return df.astype(np.float64).resample(freq).agg(OHLCV_AGGREGATION).dropna()
+
+    def _download_data(self, ticker: str, data_dir: str) -> pd.DataFrame:
+        """Download the full history of *ticker* into ``<data_dir>/<ticker>.csv``."""
         os.makedirs(data_dir, exist_ok=True)
         dest_path = os.path.join(data_dir, f"{ticker}.csv")
 
-        ticker_obj = yf.Ticker(ticker)
-        history = ticker_obj.history(period="max", interval="1d")
-        if history.empty:
-            raise ValueError(f"No price history returned for {ticker}")
+        history = self._fetch(ticker)
+        # Written aside and moved into place, so concurrent readers never see a partial file.
+        tmp_path = f"{dest_path}.tmp-{os.getpid()}-{id(history)}"
+        history.rename_axis('Date').to_csv(tmp_path)
+        os.replace(tmp_path, dest_path)
+        return history
+
+    def _cache_path(self, ticker: str, freq: str) -> str:
+        return os.path.join(self.data_dir, '.cache', f"{ticker}_{freq}")
+
+    def _cache_key(self, ticker: str, filepath: str, freq: str) -> dict:
+        stat = os.stat(filepath)
+        return {
+            'version': CACHE_VERSION,
+            'ticker': ticker,
+            'freq': freq,
+            'source_mtime_ns': stat.st_mtime_ns,
+            'source_size': stat.st_size,
+        }
+
+    def _read_cache(self, ticker: str, filepath: str, freq: str):
+        """Return the cached frame for *ticker*, or None when missing or stale."""
+        cache_path = self._cache_path(ticker, freq)
+        try:
+            with open(os.path.join(cache_path, 'meta.json')) as f:
+                meta = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        if meta.get('key') != self._cache_key(ticker, filepath, freq):
+            return None
+
+        rows, columns = meta['rows'], meta['columns']
+        index = _read_array(os.path.join(cache_path, 'index.bin'), np.int64, (rows,), self.mmap)
+        values = _read_array(os.path.join(cache_path, 'values.bin'), np.float64, (rows, len(columns)), self.mmap)
+
+        index = pd.DatetimeIndex(index.view('M8[ns]')).tz_localize('UTC').tz_convert(meta['tz'])
+        index.name = meta['index_name']
+        return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+class _CacheWriter:
+    """Appends bars to a new cache entry, which replaces the old one on ``commit``.
+
+    Timestamps and values are written as raw little-endian int64/float64 rows
+    as they arrive, so the full frame is never held in memory; ``meta.json``
+    records the row count needed to map them back.
+    """
+
+    def __init__(self, cache_path: str) -> None:
+        self.cache_path = cache_path
+        self.tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+        os.makedirs(self.tmp_path)
+        self.rows = 0
+        self.columns = list(OHLCV_AGGREGATION)
+        self.tz = 'UTC'
+        self.index_name = 'Date'
+        self._index = open(os.path.join(self.tmp_path, 'index.bin'), 'wb')
+        self._values = open(os.path.join(self.tmp_path, 'values.bin'), 'wb')
+
+    def append(self, df: pd.DataFrame) -> None:
+        if self.rows == 0:
+            self.columns = list(df.columns)
+            self.tz = str(df.index.tz)
+            self.index_name = df.index.name
+        index = df.index.tz_convert('UTC').tz_localize(None).astype('datetime64[ns]')
+        index.asi8.astype('<i8').tofile(self._index)
+        np.ascontiguousarray(df.to_numpy(dtype='<f8')).tofile(self._values)
+        self.rows += len(df)
+
+    def commit(self, key: dict) -> None:
+        self._index.close()
+        self._values.close()
+        with open(os.path.join(self.tmp_path, 'meta.json'), 'w') as f:
+            json.dump({
+                'key': key,
+                'rows': self.rows,
+                'columns': self.columns,
+                'tz': self.tz,
+                'index_name': self.index_name,
+            }, f)
+
+        shutil.rmtree(self.cache_path, ignore_errors=True)
+        os.replace(self.tmp_path, self.cache_path)
+
+    def abort(self) -> None:
+        self._index.close()
+        self._values.close()
+        shutil.rmtree(self.tmp_path, ignore_errors=True)
+
+
+def _last_row(filepath: str):
+    """Last data row of a CSV with a ``Date`` column, read from the end of the file.
+
+    Returns:
+        tuple: ``(timestamp, offset, line)``: the row's ``Date``, the byte
+        offset where its line starts and the line itself, or three Nones when
+        the file has no rows.
+    """
+    with open(filepath, 'rb') as f:
+        header_line = f.readline()
+        header = header_line.decode().strip().split(',')
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        block = min(size, 64 * 1024)
+        f.seek(size - block)
+        data = f.read()
+    if 'Date' not in header:
+        raise ValueError(f"{filepath} has no 'Date' column")
+    end = len(data)
+    while end > 0:
+        start = data.rfind(b'\n', 0, end - 1) + 1
+        line = data[start:end].rstrip(b'\r\n')
+        fields = line.decode(errors='replace').split(',')
+        if line.strip() and fields != header:
+            return pd.to_datetime(fields[header.index('Date')], utc=True), size - block + start, line
+        end = start
+    return None, None, None
+
+
+def _is_source_column(column: str) -> bool:
+    return column == 'Date' or column in OHLCV_AGGREGATION
+
+
+def _parse_dates(df: pd.DataFrame) -> pd.DataFrame:
+    df['Date'] = pd.to_datetime(df['Date'], utc=True)
+    return df.set_index('Date').sort_index()
+
+
+def _merge_bars(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    """Combine two partial OHLCV bars of the same period, *first* covering the earlier rows."""
+    open_, high, low, close, volume = first
+    return np.array([
+        open_ if not np.isnan(open_) else second[0],
+        np.fmax(high, second[1]),
+        np.fmin(low, second[2]),
+        second[3] if not np.isnan(second[3]) else close,
+        volume + second[4],
+    ])
+
+
+def _empty_bars() -> pd.DataFrame:
+    index = pd.DatetimeIndex([], tz='UTC', name='Date')
+    return pd.DataFrame(columns=list(OHLCV_AGGREGATION), index=index, dtype=np.float64)
+
 
-        history.to_csv(dest_path)
-        return dest_path
\ No newline at end of file
+def _read_array(path: str, dtype, shape: tuple, mmap: bool) -> np.ndarray:
+    if not mmap or shape[0] == 0:
+        return np.fromfile(path, dtype=dtype).reshape(shape)
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape)
@@ -0,0 +1,69 @@
+import pandas as pd
+
+
+class DataProvider:
+    """Source of OHLCV history for DataLoader.
+
+    Subclasses implement ``fetch``; pass an instance as
+    ``DataLoader(provider=...)`` to download from another vendor, or use
+    FrameProvider to serve local frames in tests.
+    """
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        """Return bars for *ticker*.
+
+        Args:
+            ticker (str): Symbol to fetch.
+            start (pandas.Timestamp, optional): Earliest bar wanted; the full
+                history when omitted. Bars before it may be included and are
+                dropped by the caller.
+
+        Returns:
+            pandas.DataFrame: Open, High, Low, Close and Volume columns (others
+            are kept as-is) on a timezone-aware index named ``Date``; empty when
+            nothing is available.
+        """
+        raise NotImplementedError
+
+
+class YahooProvider(DataProvider):
+    """Yahoo Finance history through yfinance, imported on first use.
+
+    Args:
+        interval (str): Bar interval understood by yfinance, e.g. ``'1d'`` or ``'1m'``.
+        period (str): History requested for a full download.
+    """
+
+    def __init__(self, interval: str = "1d", period: str = "max") -> None:
+        self.interval = interval
+        self.period = period
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        import yfinance as yf
+
+        ticker_obj = yf.Ticker(ticker)
+        if start is None:
+            return ticker_obj.history(period=self.period, interval=self.interval)
+        # Yahoo takes calendar dates; the caller drops bars it already has.
+        return ticker_obj.history(start=start.strftime("%Y-%m-%d"), interval=self.interval)
+
+
+class FrameProvider(DataProvider):
+    """Serves in-memory frames, e.g. synthetic data standing in for Yahoo in tests.
+
+    Args:
+        frames (dict): Maps tickers to OHLCV frames indexed by timestamp.
+
+    Every call is recorded in ``calls`` as ``(ticker, start)``.
+    """
+
+    def __init__(self, frames: dict) -> None:
+        self.frames = frames
+        self.calls = []
+
+    def fetch(self, ticker: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        self.calls.append((ticker, start))
+        df = self.frames.get(ticker)
+        if df is None:
+            return pd.DataFrame()
+        return df if start is None else df[df.index >= start]
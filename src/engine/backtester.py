@@ -1,128 +1,450 @@
+import logging
 from typing import List
 import pandas as pd
-import matplotlib.pyplot as plt
 import numpy as np
 
 from src.strategies import BaseStrategy
+from src.engine.bootstrap import bootstrap_metrics
+from src.engine.execution import ExecutionConfig
+from src.engine.feature_store import FeatureStore
+from src.engine.metrics import metrics_frame
+from src.engine.plotting import draw_equity, save_equity
+from src.engine.portfolio import Portfolio
+from src.engine.profiler import NullProfiler
+from src.engine.result_cache import ResultCache, frame_fingerprint
+from src.engine.results import BacktestResult, strategy_labels
+from src.engine.runner import asset_returns, run_strategies
+from src.engine.sweep import run_sweep
+
+logger = logging.getLogger(__name__)
 
 class Backtester:
-    def __init__(self, df: pd.DataFrame, strategies: List[BaseStrategy], initial_capital=10000.0, fee=0.001):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        strategies: List[BaseStrategy],
+        initial_capital=10000.0,
+        fee=0.001,
+        feature_store: FeatureStore = None,
+        profiler=None,
+        dtype=np.float64,
+        execution: ExecutionConfig = None,
+        result_cache: ResultCache = None,
+    ):
         self.df = df
         self.strategies = strategies
         self.initial_capital = initial_capital
         self.fee = fee
-        self.returns = None
-        
-    def plot_equity(self) -> None:
-        if self.returns is None:
-            raise "Run .run() first"
-        
-        plt.figure(figsize=(12,6))
-        for strategy in self.strategies:
-            strategy_name = strategy.__class__.__name__
-            self.returns[f'Strategy_Equity_{strategy_name}'].plot()
-            
-        plt.legend([s.__class__.__name__ for s in self.strategies])
-        plt.title("Equity - For strategies")
-        plt.ylabel('Portfolio size ($)')
-        plt.xlabel('Date')
+        # Indicators shared between strategies; pass FeatureStore(persist=True) to keep them across runs.
+        self.feature_store = feature_store if feature_store is not None else FeatureStore()
+        # Per-stage timing/memory instrumentation; pass a Profiler to collect a report.
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        # Float dtype of the result arrays; np.float32 halves their memory.
+        self.dtype = np.dtype(dtype)
+        # Stop-loss, take-profit, trailing stop, holding limit and volatility-targeted sizing;
+        # None keeps the vectorized signal-following execution.
+        self.execution = execution
+        # On-disk per-strategy results; run() re-executes only strategies whose inputs changed.
+        self.result_cache = result_cache
+        self.results = None
+        self.labels = None
+        # Exits made by the execution rules: Strategy, Price and Reason per exit bar.
+        self.fills = None
+        # Per-strategy state carried forward by update(); built lazily after run().
+        self._live = None
+
+    # Bars appended by update() are buffered and concatenated only when df is
+    # read, so an update itself never copies the history (results do the same).
+    @property
+    def df(self) -> pd.DataFrame:
+        if self._pending_bars:
+            self._df = pd.concat([self._df, *self._pending_bars])
+            self._pending_bars = []
+        return self._df
+
+    @df.setter
+    def df(self, value: pd.DataFrame) -> None:
+        self._df = value
+        self._pending_bars = []
+
+    @property
+    def returns(self) -> pd.DataFrame:
+        """Wide, labelled view of ``results`` (``Strategy_Equity_<label>`` etc.), built on first access."""
+        return self.results.frame() if self.results is not None else None
+
+
+    def plot_equity(self, path: str = None, **kwargs):
+        """Plot the equity curves, decimated to the image width (see ``src.engine.plotting``).
+
+        Args:
+            path (str, optional): Write the figure to this file (``.png``,
+                ``.svg``...) with the headless Agg backend. Without it the
+                figure is shown with pyplot.
+            **kwargs: Passed to ``equity_figure`` (``labels``, ``width``,
+                ``height``, ``method``, ``log_scale``...); when showing, only
+                ``width`` and the ``draw_equity`` arguments apply.
+
+        Returns:
+            The written path, or the shown Figure.
+        """
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        if path is not None:
+            return save_equity(self.results, path, **kwargs)
+
+        import matplotlib.pyplot as plt
+
+        figure, ax = plt.subplots(figsize=(12, 6))
+        draw_equity(ax, self.results, n_points=kwargs.pop("width", 1200), **kwargs)
+        figure.autofmt_xdate()
         plt.show()
-         
-    def run(self) -> None:
-        print("--- BackTester running ---")
-        compiled = pd.DataFrame(index=self.df.index.copy())
-        activation_points = []
-
-        for i, strategy in enumerate(self.strategies):
-            print(f"--- Running Strategy {i+1}/{len(self.strategies)}: {strategy.__class__.__name__} ---")
-            print(strategy)
-
-            strategy_df = strategy.generate_features(self.df.copy())
-            strategy_df = strategy.generate_signals(strategy_df)
-
-            strategy_name = strategy.__class__.__name__
-
-            strategy_df[f'Returns_{strategy_name}'] = strategy_df['Close'].pct_change()
-            strategy_df[f'Position_{strategy_name}'] = strategy_df['Signal'].shift(1).fillna(0)
-            strategy_df[f'Trades_{strategy_name}'] = strategy_df[f'Position_{strategy_name}'].diff().abs()
-            
-            strategy_df[f'Strategy_Returns_{strategy_name}'] = (
-                strategy_df[f'Returns_{strategy_name}'] * strategy_df[f'Position_{strategy_name}']
-            ) - (self.fee * strategy_df[f'Trades_{strategy_name}'])
-            strategy_df[f'Strategy_Equity_{strategy_name}'] = (
-                (1 + strategy_df[f'Strategy_Returns_{strategy_name}']).cumprod() * self.initial_capital
-            )
+        return figure
+
+    def run(self, n_jobs=None, executor=None) -> None:
+        """Run every strategy and compile their aligned equity curves into ``results``.
+
+        Args:
+            n_jobs (int, optional): Run strategies in this many worker processes
+                (``-1`` for all cores). Defaults to running serially.
+            executor (concurrent.futures.Executor, optional): Existing pool to use
+                instead of creating one.
+
+        With a ``result_cache``, strategies whose data, class, parameters and
+        settings match a cached run are loaded instead of executed.
+        """
+        logger.info("--- BackTester running ---")
+        df = self.df
+        with self.profiler.stage("run", rows=len(df)):
+            self.feature_store.bind(df)
+            buffer = np.empty((4, len(self.strategies), len(df)), dtype=self.dtype)
+            results = [None] * len(self.strategies)
+            keys = None
+            if self.result_cache is not None:
+                with self.profiler.stage("result_cache_read") as stage:
+                    fingerprint = frame_fingerprint(df)
+                    keys = [
+                        self.result_cache.key(
+                            fingerprint, strategy, self.fee, self.initial_capital, self.dtype, self.execution
+                        )
+                        for strategy in self.strategies
+                    ]
+                    for i, key in enumerate(keys):
+                        cached = self.result_cache.get(key)
+                        if cached is not None:
+                            strategy, block, activation, exits = cached
+                            buffer[:, i] = block
+                            results[i] = (strategy, buffer[:, i], activation, exits)
+                    stage.rows = len(keys) - results.count(None)
+                logger.info("Result cache: %d of %d strategies reused", stage.rows, len(keys))
+
+            pending = [i for i, result in enumerate(results) if result is None]
+            if pending:
+                executed = run_strategies(
+                    df,
+                    [self.strategies[i] for i in pending],
+                    self.fee,
+                    self.initial_capital,
+                    n_jobs=n_jobs,
+                    executor=executor,
+                    feature_store=self.feature_store,
+                    profiler=self.profiler,
+                    dtype=self.dtype,
+                    out=buffer if len(pending) == len(results) else None,
+                    execution=self.execution,
+                )
+                for i, (strategy, block, activation, exits) in zip(pending, executed):
+                    if not np.shares_memory(block, buffer):
+                        buffer[:, i] = block
+                    results[i] = (strategy, buffer[:, i], activation, exits)
+                del executed
+                if keys is not None:
+                    with self.profiler.stage("result_cache_write", rows=len(pending)):
+                        for i in pending:
+                            self.result_cache.put(keys[i], *results[i])
+
+            with self.profiler.stage("alignment") as stage:
+                activation_points = []
+                exits = []
+                for i, (strategy, _, activation_point, strategy_exits) in enumerate(results):
+                    # Workers return the strategy they ran so fitted state (e.g. models) is kept.
+                    self.strategies[i] = strategy
+                    activation_points.append(activation_point)
+                    exits.append(strategy_exits)
+
+                start_candidates = [idx for idx in activation_points if idx is not None]
+                if not start_candidates:
+                    raise ValueError("No strategy produced valid signals; cannot run backtest.")
+
+                start = max(start_candidates)
+                logger.debug("Activation points: %s, aligned at %s", activation_points, df.index[start])
+
+                # Compact the aligned bars to the front of the buffer in place, giving one
+                # contiguous (field, strategy, bar) block without a second allocation.
+                # Rows are moved in order and never overlap a row that is still unread.
+                del results
+                length = len(df) - start
+                data = buffer.reshape(-1)[:buffer.shape[0] * buffer.shape[1] * length].reshape(
+                    buffer.shape[0], buffer.shape[1], length
+                )
+                for field in range(buffer.shape[0]):
+                    for row in range(buffer.shape[1]):
+                        data[field, row] = buffer[field, row, start:]
+                position, trades, strategy_returns, equity = data
+
+                for row in range(len(equity)):
+                    base = equity[row, 0]
+                    if np.isnan(base) or base == 0:
+                        equity[row] = pd.Series(equity[row]).bfill().to_numpy()
+                        base = equity[row, 0]
+                    if np.isnan(base) or base == 0:
+                        equity[row] = self.initial_capital
+                    else:
+                        equity[row] /= base
+                        equity[row] *= self.initial_capital
+
+                self.labels = strategy_labels(self.strategies)
+                if self.execution is not None:
+                    self.fills = pd.concat(
+                        [frame.assign(Strategy=label)[['Strategy', 'Price', 'Reason']]
+                         for label, frame in zip(self.labels, exits)]
+                    ).sort_index(kind='stable')
+                self.results = BacktestResult(
+                    df.index[start:],
+                    self.labels,
+                    asset_returns(df['Close'].to_numpy(dtype=np.float64))[start:].astype(self.dtype),
+                    position,
+                    trades,
+                    strategy_returns,
+                    equity,
+                )
+                stage.rows = len(self.results)
+
+        logger.info("--- BackTester ended running ---")
+        self._live = None
+
+    def update(self, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """Append new bars and extend every strategy's results without recomputing the history.
+
+        Strategies implementing ``warm_up``/``update_signal`` carry O(window) rolling state, and
+        equity, peak and drawdown are carried forward, so each bar costs O(strategies). Other
+        strategies are recomputed over the full history once per call.
+
+        Args:
+            new_bars (pandas.DataFrame): Bars with the same columns as ``df``. Rows at or before
+                the last known timestamp are ignored.
+
+        Returns:
+            pandas.DataFrame: The result rows appended to ``results`` for the new bars, in the
+            wide ``returns`` layout.
+
+        Raises:
+            ValueError: Before ``run()``, or when the backtester has execution rules.
+        """
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        if self.execution is not None:
+            raise ValueError("update() cannot apply execution rules; call run() on the extended data")
+        if self._live is None:
+            self._live = self._init_live()
 
-            compiled[f'Returns_{strategy_name}'] = strategy_df[f'Returns_{strategy_name}']
-            compiled[f'Position_{strategy_name}'] = strategy_df[f'Position_{strategy_name}']
-            compiled[f'Trades_{strategy_name}'] = strategy_df[f'Trades_{strategy_name}']
-            compiled[f'Strategy_Returns_{strategy_name}'] = strategy_df[f'Strategy_Returns_{strategy_name}']
-            compiled[f'Strategy_Equity_{strategy_name}'] = strategy_df[f'Strategy_Equity_{strategy_name}']
-
-            active_positions = strategy_df[strategy_df[f'Position_{strategy_name}'] != 0]
-            if not active_positions.empty:
-                activation_points.append(active_positions.index[0])
-            else:
-                activation_points.append(strategy_df[f'Strategy_Equity_{strategy_name}'].first_valid_index())
-            print(activation_points)
-            print(f"--- Strategy {i+1} completed ---")
-
-
-        start_candidates = [idx for idx in activation_points if idx is not None]
-        if not start_candidates:
-            raise ValueError("No strategy produced valid signals; cannot run backtest.")
-
-        start_index = max(start_candidates)
-        compiled = compiled.loc[start_index:].copy()
-
-        for strategy in self.strategies:
-            equity_col = f'Strategy_Equity_{strategy.__class__.__name__}'
-            if equity_col in compiled.columns and not compiled[equity_col].empty:
-                base_val = compiled[equity_col].iloc[0]
-                if pd.isna(base_val) or base_val == 0:
-                    compiled[equity_col] = compiled[equity_col].fillna(method='bfill')
-                    base_val = compiled[equity_col].iloc[0]
-                if pd.isna(base_val) or base_val == 0:
-                    compiled[equity_col] = self.initial_capital
+        new_bars = new_bars.loc[new_bars.index > self._live_timestamp, self._df.columns]
+        if new_bars.empty:
+            return self.returns.iloc[0:0]
+
+        with self.profiler.stage("update", rows=len(new_bars)):
+            closes = new_bars['Close'].to_numpy(dtype=float)
+            bar_returns = closes / np.concatenate(([self._live_close], closes[:-1])) - 1
+            bars = [bar for _, bar in new_bars.iterrows()]
+            history = None
+
+            shape = (len(self.strategies), len(new_bars))
+            position, trades, strategy_returns, equity = (np.empty(shape) for _ in range(4))
+            for row, (strategy, state) in enumerate(zip(self.strategies, self._live)):
+                if state['incremental']:
+                    signals = np.array([strategy.update_signal(bar) for bar in bars], dtype=float)
                 else:
-                    compiled[equity_col] = (compiled[equity_col] / base_val) * self.initial_capital
-        
-        print("--- BackTester ended running ---")
-        
-        self.returns = compiled
-        
-    def get_metrics(self):
-        if self.returns is None:
-            raise "Run .run() first"
-        stats = {
-            "Total Return": [],
-            "Annualized Return": [],
-            "Annualized Volatility": [],
-            "Max Drawdown": [],
-            "Sharpe Ratio": []
+                    if history is None:
+                        history = pd.concat([self.df, new_bars])
+                    signals = self._recompute_signals(strategy, history)[-len(new_bars):]
+
+                position[row, 0] = state['next_position']
+                position[row, 1:] = signals[:-1]
+                trades[row] = np.abs(np.diff(position[row], prepend=state['position']))
+                strategy_returns[row] = bar_returns * position[row] - self.fee * trades[row]
+                equity[row] = state['equity'] * np.cumprod(1 + strategy_returns[row])
+                peak = np.maximum.accumulate(np.concatenate(([state['peak']], equity[row])))[1:]
+
+                state['next_position'] = signals[-1]
+                state['position'] = position[row, -1]
+                state['equity'] = equity[row, -1]
+                state['peak'] = peak[-1]
+                state['max_drawdown'] = min(state['max_drawdown'], ((equity[row] - peak) / peak).min())
+
+            arrays = {
+                'returns': bar_returns,
+                'position': position,
+                'trades': trades,
+                'strategy_returns': strategy_returns,
+                'equity': equity,
+            }
+            self.results.append(new_bars.index, **arrays)
+            self._pending_bars.append(new_bars)
+            self._live_timestamp = new_bars.index[-1]
+            self._live_close = closes[-1]
+            return BacktestResult.labelled(new_bars.index, self.labels, arrays)
+
+    def live_status(self) -> pd.DataFrame:
+        """Carried-forward equity, peak, drawdown and positions for every strategy."""
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        if self._live is None:
+            self._live = self._init_live()
+
+        status = {
+            label: {
+                "Equity": state['equity'],
+                "Peak": state['peak'],
+                "Drawdown": state['equity'] / state['peak'] - 1,
+                "Max Drawdown": state['max_drawdown'],
+                "Position": state['position'],
+                "Next Position": state['next_position'],
+            }
+            for label, state in zip(self.labels, self._live)
         }
-        self.returns.dropna(inplace=True)
-        for strategy in self.strategies:
-            strategy_name = strategy.__class__.__name__
-            equity = self.returns[f'Strategy_Equity_{strategy_name}']
-
-            total_return = (equity.iloc[-1] / equity.iloc[0]) - 1
-            
-            peak = equity.cummax()
-            
-            drawdown = (equity - peak) / peak
-            max_drawdown = drawdown.min()
-            
-            length = (equity.index[-1] - equity.index[0]).days / 365.25
-            annualised_return = (1 + total_return) ** (1 / length) - 1
-            annualised_volatility = self.returns[f'Strategy_Returns_{strategy_name}'].std() * np.sqrt(365)
-            
-            sharpe_ratio = annualised_return / annualised_volatility
-            stats["Total Return"].append(f"{total_return * 100:.2f}%")
-            stats["Annualized Return"].append(f"{annualised_return * 100:.2f}%")
-            stats["Annualized Volatility"].append(f"{annualised_volatility * 100:.2f}%")
-            stats["Max Drawdown"].append(f"{max_drawdown * 100:.2f}%")
-            stats["Sharpe Ratio"].append(f"{sharpe_ratio:.2f}")
-
-        metrics_df = pd.DataFrame(stats, index=[s.__class__.__name__ for s in self.strategies])
-        return metrics_df.to_dict(orient='index')
\ No newline at end of file
+        return pd.DataFrame.from_dict(status, orient='index')
+
+    def _init_live(self) -> list:
+        """Prime every strategy's incremental state from the history covered by run()."""
+        df = self.df
+        results = self.results
+        live = []
+        for row, strategy in enumerate(self.strategies):
+            try:
+                next_position = strategy.warm_up(df)
+                incremental = True
+            except NotImplementedError:
+                next_position = self._recompute_signals(strategy, df)[-1]
+                incremental = False
+
+            equity = results.equity[row].astype(np.float64)
+            equity = equity[~np.isnan(equity)]
+            position = results.position[row]
+            position = position[~np.isnan(position)]
+            peak = np.maximum.accumulate(equity)
+            live.append({
+                'incremental': incremental,
+                'next_position': float(next_position),
+                'position': float(position[-1]) if position.size else 0.0,
+                'equity': float(equity[-1]),
+                'peak': float(peak[-1]),
+                'max_drawdown': float(((equity - peak) / peak).min()),
+            })
+
+        self._live_timestamp = df.index[-1]
+        self._live_close = float(df['Close'].iloc[-1])
+        return live
+
+    @staticmethod
+    def _recompute_signals(strategy, df: pd.DataFrame) -> np.ndarray:
+        strategy_df = strategy.generate_features(df.copy())
+        strategy_df = strategy.generate_signals(strategy_df)
+        return strategy_df['Signal'].reindex(df.index).fillna(0).to_numpy(dtype=float)
+        
+    def sweep(self, strategy_cls, param_grid: dict, chunk_size: int = 256) -> pd.DataFrame:
+        """Backtest every parameter combination of *strategy_cls* in one batched pass.
+
+        Args:
+            strategy_cls: Strategy class to tune, e.g. ``TrendFollowingStrategy``.
+            param_grid (dict): Maps constructor argument names to candidate values,
+                e.g. ``{"short_window": range(5, 55), "long_window": range(60, 260, 4)}``.
+            chunk_size (int): Number of combinations evaluated per NumPy block.
+
+        Returns:
+            pandas.DataFrame: Numeric metrics indexed by the swept parameters.
+        """
+        logger.info("--- Sweeping %s ---", strategy_cls.__name__)
+        with self.profiler.stage(f"sweep:{strategy_cls.__name__}", rows=len(self.df)):
+            results = run_sweep(
+                self.df,
+                strategy_cls,
+                param_grid,
+                self.fee,
+                self.initial_capital,
+                chunk_size=chunk_size,
+                feature_store=self.feature_store.bind(self.df),
+            )
+        logger.info("--- Sweep finished: %d combinations ---", len(results))
+        return results
+
+    def get_metrics(self, periods_per_year: float = 365) -> pd.DataFrame:
+        """Return numeric performance metrics, one row per strategy label.
+
+        Computed for all strategies at once from ``results`` without modifying them;
+        see ``src.engine.metrics.compute_metrics``. Use ``metrics.format_metrics`` to
+        render the table for display.
+
+        Args:
+            periods_per_year (float): Bars per year used to annualize volatility.
+        """
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        with self.profiler.stage("metrics", rows=len(self.results)):
+            return metrics_frame(self.results, periods_per_year=periods_per_year)
+
+    def portfolio(self, periods_per_year: float = 365) -> Portfolio:
+        """Portfolio over the strategies' return streams, with this backtester's fee and capital.
+
+        See ``src.engine.portfolio.Portfolio`` for weight schemes, rebalancing
+        and grid evaluation.
+        """
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        return Portfolio.from_result(
+            self.results, fee=self.fee, initial_capital=self.initial_capital, periods_per_year=periods_per_year
+        )
+
+    def bootstrap(
+        self,
+        n_paths: int = 10_000,
+        method: str = "block",
+        block_size: int = 20,
+        confidence: float = 0.95,
+        periods_per_year: float = 365,
+        n_jobs=None,
+        executor=None,
+        seed: int = None,
+    ) -> pd.DataFrame:
+        """Confidence intervals for every metric, from resampled strategy return paths.
+
+        Each strategy's ``strategy_returns`` are resampled *n_paths* times and every
+        path is evaluated with the same metrics as ``get_metrics``; see
+        ``src.engine.bootstrap``.
+
+        Args:
+            n_paths (int): Resampled paths per strategy.
+            method (str): ``"block"``, ``"stationary"`` or ``"iid"``.
+            block_size (int): (Mean) block length in bars.
+            confidence (float): Central coverage of the reported band.
+            periods_per_year (float): Bars per year used to annualize volatility.
+            n_jobs (int, optional): Worker processes (``-1`` for all cores).
+            executor (concurrent.futures.Executor, optional): Existing pool to use.
+            seed (int, optional): Seed for reproducible paths.
+
+        Returns:
+            pandas.DataFrame: Estimate, Mean, Std, Lower, Median and Upper per
+            (Strategy, Metric).
+        """
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        with self.profiler.stage("bootstrap", rows=len(self.results) * n_paths):
+            return bootstrap_metrics(
+                self.results,
+                confidence=confidence,
+                periods_per_year=periods_per_year,
+                n_paths=n_paths,
+                method=method,
+                block_size=block_size,
+                n_jobs=n_jobs,
+                executor=executor,
+                seed=seed,
+            )
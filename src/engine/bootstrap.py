@@ -0,0 +1,296 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.engine.metrics import METRIC_COLUMNS, combine_metrics, compute_metrics, period_years
+
+
+METHODS = ("block", "stationary", "iid")
+
+
+def resample(values, n_paths: int, method: str = "block", block_size: int = 20, rng: np.random.Generator = None) -> np.ndarray:
+    """Resample one or more aligned series into (n_paths, n_bars) paths.
+
+    Args:
+        values: (n_bars,) series or (n_series, n_bars) array. Every series is
+            resampled with the same draws, so e.g. returns and trades stay paired.
+        n_paths (int): Number of paths to draw.
+        method (str): ``"block"`` concatenates fixed-size blocks starting at
+            random bars (circular moving block bootstrap). ``"stationary"``
+            uses geometrically distributed block lengths with mean
+            *block_size* (Politis-Romano). ``"iid"`` draws single bars, i.e.
+            a plain Monte Carlo reshuffle that ignores autocorrelation.
+        block_size (int): Block length, or mean block length for ``"stationary"``.
+        rng (numpy.random.Generator, optional): Source of randomness.
+
+    Returns:
+        numpy.ndarray: (n_paths, n_bars) paths, or (n_series, n_paths, n_bars).
+
+    Blocks wrap around the end of the series. Paths are built with whole-array
+    gathers; fixed blocks are copied from a sliding-window view, so no
+    per-bar index array is materialized.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    rng = rng if rng is not None else np.random.default_rng()
+    values = np.asarray(values)
+    series = np.atleast_2d(values)
+    length = series.shape[1]
+    block_size = min(block_size, length)
+    index_dtype = _index_dtype(length)
+
+    if method == "block" and block_size > 1:
+        starts = _block_starts(length, n_paths, block_size, rng)
+        wrapped = np.concatenate([series, series[:, :block_size - 1]], axis=1)
+        blocks = sliding_window_view(wrapped, block_size, axis=1)
+        paths = blocks[:, starts].reshape(len(series), n_paths, -1)[:, :, :length]
+    elif method == "stationary" and block_size > 1:
+        new_block = rng.random((n_paths, length)) < 1.0 / block_size
+        new_block[:, 0] = True
+        # Bar at which the block covering each position began, and that block's random start.
+        bars = np.arange(length, dtype=index_dtype)
+        block_began = np.maximum.accumulate(np.where(new_block, bars, 0), axis=1)
+        starts = rng.integers(0, length, size=(n_paths, length), dtype=index_dtype)
+        indices = np.take_along_axis(starts, block_began, axis=1)
+        indices += bars
+        indices -= block_began
+        indices %= length
+        paths = series[:, indices]
+    else:
+        paths = series[:, rng.integers(0, length, size=(n_paths, length), dtype=index_dtype)]
+
+    return paths if values.ndim == 2 else paths[0]
+
+
+def _index_dtype(length: int):
+    return np.int32 if length < 2 ** 31 else np.int64
+
+
+def _block_starts(length: int, n_paths: int, block_size: int, rng: np.random.Generator) -> np.ndarray:
+    n_blocks = -(-length // block_size)
+    return rng.integers(0, length, size=(n_paths, n_blocks), dtype=_index_dtype(length))
+
+
+def _block_summaries(series: np.ndarray, width: int, block_size: int) -> np.ndarray:
+    """Statistics of the first *width* bars of the block starting at every bar.
+
+    Rows: log growth, highest and lowest log level relative to the block's
+    start, deepest drawdown from a peak inside the block, sum of returns, of
+    squared returns, of squared negative returns, and of trades.
+    """
+    wrapped = np.concatenate([series, series[:, :block_size - 1]], axis=1)
+    windows = sliding_window_view(wrapped, block_size, axis=1)[:, :, :width]
+    returns = windows[0]
+    level = np.log1p(returns).cumsum(axis=1)
+    return np.stack([
+        level[:, -1],
+        level.max(axis=1),
+        level.min(axis=1),
+        (level - np.maximum.accumulate(level, axis=1)).min(axis=1),
+        returns.sum(axis=1),
+        (returns * returns).sum(axis=1),
+        (np.minimum(returns, 0) ** 2).sum(axis=1),
+        windows[1].sum(axis=1) if len(series) > 1 else np.full(len(returns), np.nan),
+    ])
+
+
+def _summaries(series: np.ndarray, method: str, block_size: int):
+    """Full-block and last-block summaries when *series* can use _block_metrics, else None."""
+    length = series.shape[1]
+    block_size = min(block_size, length)
+    if method != "block" or block_size < 2 or not (series[0] > -1).all():
+        return None
+    last_width = length - (-(-length // block_size) - 1) * block_size
+    return _block_summaries(series, block_size, block_size), _block_summaries(series, last_width, block_size)
+
+
+def _block_metrics(returns, summaries, index, n_paths, block_size, periods_per_year, rng) -> np.ndarray:
+    """Metrics of moving-block paths computed from per-block statistics.
+
+    Equivalent to evaluating the paths drawn by ``resample(series, n_paths,
+    "block", block_size, rng)`` with compute_metrics, but each path costs
+    O(n_bars / block_size): sums combine across blocks, and the maximum
+    drawdown follows from every block's log-level range and the running peak
+    of the blocks before it. Requires returns above -100%.
+    """
+    length = len(returns)
+    starts = _block_starts(length, n_paths, block_size, rng)
+    full, last = summaries
+
+    blocks = full[:, starts]
+    blocks[:, :, -1] = last[:, starts[:, -1]]
+    growth, high, low, inner_drawdown, total, squares, downside, trades = blocks
+
+    level = np.cumsum(growth, axis=1)
+    before = level - growth
+    peak = np.maximum.accumulate(before + high, axis=1)
+    peak[:, 1:] = peak[:, :-1].copy()
+    peak[:, 0] = -np.inf
+    drawdown = np.minimum(inner_drawdown, before + low - peak).min(axis=1)
+
+    years = period_years(index, 0, length - 1, periods_per_year)
+    # Equity is measured from the close of the first bar, so its own return is not part of the total.
+    total_return = np.expm1(level[:, -1] - np.log1p(returns[starts[:, 0]]))
+    total, squares = total.sum(axis=1), squares.sum(axis=1)
+    volatility = np.sqrt(np.maximum(squares - total * total / length, 0) / (length - 1))
+    return combine_metrics(
+        total_return,
+        np.expm1(drawdown),
+        volatility,
+        np.sqrt(downside.sum(axis=1) / length),
+        trades.sum(axis=1) / years,
+        years,
+        periods_per_year,
+    )
+
+
+def _resample_chunk(series, summaries, index, n_paths, method, block_size, periods_per_year, seed) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    block_size = min(block_size, series.shape[1])
+    if summaries is not None:
+        return _block_metrics(series[0], summaries, index, n_paths, block_size, periods_per_year, rng)
+
+    paths = resample(series, n_paths, method, block_size, rng)
+    path_returns = paths[0]
+    equity = np.add(path_returns, 1)
+    np.cumprod(equity, axis=1, out=equity)
+    path_trades = paths[1] if len(paths) > 1 else None
+    return compute_metrics(equity, path_returns, trades=path_trades, index=index, periods_per_year=periods_per_year)
+
+
+def resample_metrics(
+    strategy_returns,
+    trades=None,
+    index: pd.Index = None,
+    n_paths: int = 10_000,
+    method: str = "block",
+    block_size: int = 20,
+    periods_per_year: float = 365,
+    chunk_size: int = 1_000,
+    n_jobs: int = None,
+    executor=None,
+    seed: int = None,
+) -> np.ndarray:
+    """Resample each strategy's returns and evaluate every path's metrics.
+
+    Args:
+        strategy_returns: (n_strategies, n_bars) per-bar strategy returns.
+        trades (optional): Matching absolute position changes, resampled with
+            the same indices so turnover is available per path.
+        index (pandas.Index, optional): Bar timestamps, used to annualize like
+            ``compute_metrics``. Paths keep the original calendar.
+        n_paths (int): Resampled paths per strategy.
+        method (str): See resample.
+        chunk_size (int): Paths evaluated per (paths x bars) block, bounding memory.
+        n_jobs (int, optional): Worker processes (``-1`` for all cores);
+            serial by default.
+        executor (concurrent.futures.Executor, optional): Pool to submit to
+            instead of creating one.
+        seed (int, optional): Makes the result reproducible, independently of
+            the number of workers.
+
+    Returns:
+        numpy.ndarray: (n_strategies, n_paths, len(METRIC_COLUMNS)) metric samples.
+
+    Each strategy is resampled over its valid bars only (leading and missing
+    bars are dropped first), and every chunk of paths is evaluated as one
+    array operation.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}")
+    strategy_returns = np.atleast_2d(np.asarray(strategy_returns, dtype=np.float64))
+    if trades is not None:
+        trades = np.atleast_2d(np.asarray(trades, dtype=np.float64))
+    n_strategies = len(strategy_returns)
+
+    chunks = [(lo, min(lo + chunk_size, n_paths)) for lo in range(0, n_paths, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(n_strategies * len(chunks))
+
+    tasks = []
+    for row in range(n_strategies):
+        valid = ~np.isnan(strategy_returns[row])
+        series = strategy_returns[row, valid][None]
+        if trades is not None:
+            series = np.vstack([series, np.nan_to_num(trades[row, valid])])
+        row_index = index[valid] if index is not None else None
+        # Moving-block paths are evaluated from per-block statistics, computed once per strategy.
+        summaries = _summaries(series, method, block_size)
+        if summaries is not None:
+            series = series[:1]
+        for k, (lo, hi) in enumerate(chunks):
+            tasks.append((row, lo, hi, (
+                series, summaries, row_index, hi - lo, method, block_size, periods_per_year,
+                seeds[row * len(chunks) + k],
+            )))
+
+    samples = np.empty((n_strategies, n_paths, len(METRIC_COLUMNS)))
+    if executor is None and (n_jobs is None or n_jobs == 1):
+        for row, lo, hi, args in tasks:
+            samples[row, lo:hi] = _resample_chunk(*args)
+        return samples
+
+    owns_executor = executor is None
+    if owns_executor:
+        workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)))
+    try:
+        futures = [(row, lo, hi, executor.submit(_resample_chunk, *args)) for row, lo, hi, args in tasks]
+        for row, lo, hi, future in futures:
+            samples[row, lo:hi] = future.result()
+    finally:
+        if owns_executor:
+            executor.shutdown()
+    return samples
+
+
+def confidence_intervals(samples: np.ndarray, labels, estimate: np.ndarray = None, confidence: float = 0.95) -> pd.DataFrame:
+    """Summarize metric samples into CI bands.
+
+    Args:
+        samples: (n_strategies, n_paths, n_metrics) array from resample_metrics.
+        labels: Strategy labels, one per row of *samples*.
+        estimate (optional): (n_strategies, n_metrics) point estimates on the
+            original series, reported alongside the bands.
+        confidence (float): Central coverage of the [Lower, Upper] band.
+
+    Returns:
+        pandas.DataFrame: Indexed by (Strategy, Metric) with Estimate, Mean, Std,
+        Lower, Median and Upper columns. Non-finite samples are ignored.
+    """
+    alpha = (1 - confidence) / 2
+    finite = np.where(np.isfinite(samples), samples, np.nan)
+    lower, median, upper = np.nanpercentile(finite, [100 * alpha, 50, 100 * (1 - alpha)], axis=1)
+
+    columns = {
+        "Estimate": estimate if estimate is not None else np.full(lower.shape, np.nan),
+        "Mean": np.nanmean(finite, axis=1),
+        "Std": np.nanstd(finite, axis=1),
+        "Lower": lower,
+        "Median": median,
+        "Upper": upper,
+    }
+    index = pd.MultiIndex.from_product([list(labels), METRIC_COLUMNS], names=["Strategy", "Metric"])
+    return pd.DataFrame({name: np.asarray(values).reshape(-1) for name, values in columns.items()}, index=index)
+
+
+def bootstrap_metrics(result, confidence: float = 0.95, periods_per_year: float = 365, **kwargs) -> pd.DataFrame:
+    """Confidence intervals for every metric of every strategy in a BacktestResult.
+
+    Keyword arguments are passed to resample_metrics (n_paths, method,
+    block_size, chunk_size, n_jobs, executor, seed).
+    """
+    samples = resample_metrics(
+        result.strategy_returns,
+        trades=result.trades,
+        index=result.index,
+        periods_per_year=periods_per_year,
+        **kwargs,
+    )
+    estimate = compute_metrics(
+        result.equity, result.strategy_returns, trades=result.trades, index=result.index,
+        periods_per_year=periods_per_year,
+    )
+    return confidence_intervals(samples, result.labels, estimate=estimate, confidence=confidence)
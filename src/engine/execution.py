@@ -0,0 +1,254 @@
+import logging
+import math
+import numbers
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.cpp import bridge
+except ImportError:
+    bridge = None
+
+logger = logging.getLogger(__name__)
+
+# Codes in the ``exit_reason`` output; keep in sync with ExitReason in analytics.cpp.
+EXIT_REASONS = {
+    1: "stop_loss",
+    2: "take_profit",
+    3: "trailing_stop",
+    4: "max_holding",
+}
+
+
+# ExecutionConfig fields that may be None to disable the rule.
+_OPTIONAL_RULES = ("stop_loss", "take_profit", "trailing_stop", "max_holding", "target_volatility")
+
+
+class ExecutionConfig:
+    """Order and risk rules applied on top of a strategy's signals.
+
+    Without any rule the backtester's vectorized execution is used: the signal
+    at bar t is filled at that bar's close and held over bar t + 1. With rules,
+    every position is run through a per-bar state machine (compiled in
+    ``analytics.cpp``):
+
+    Args:
+        stop_loss (float, optional): Close a position once price moves this
+            fraction against its entry price, e.g. ``0.05``.
+        take_profit (float, optional): Close it once price moves this fraction
+            in its favour.
+        trailing_stop (float, optional): Close it once price retraces this
+            fraction from the best high (long) or low (short) since entry.
+        max_holding (int, optional): Close it at the close of its
+            *max_holding*-th bar.
+        target_volatility (float, optional): Annualized volatility to size
+            positions for: ``signal * target_volatility / realized volatility``
+            of the last *vol_window* returns, capped at *max_leverage*. The
+            size is fixed at entry and kept while the signal is unchanged.
+        vol_window (int): Returns used for the realized volatility.
+        max_leverage (float): Cap on the volatility-targeted size.
+        periods_per_year (float): Bars per year, to annualize volatility.
+
+    Stops and take-profits are checked against each bar's low/high and filled
+    at their level, or at the open when the bar gaps through it; when both are
+    hit in the same bar the stop is assumed first. After a rule closes a
+    position the strategy stays flat until its signal changes. Exits pay the
+    usual fee.
+    """
+
+    def __init__(
+        self,
+        stop_loss: float = None,
+        take_profit: float = None,
+        trailing_stop: float = None,
+        max_holding: int = None,
+        target_volatility: float = None,
+        vol_window: int = 20,
+        max_leverage: float = 1.0,
+        periods_per_year: float = 365,
+    ) -> None:
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.trailing_stop = trailing_stop
+        self.max_holding = max_holding
+        self.target_volatility = target_volatility
+        self.vol_window = vol_window
+        self.max_leverage = max_leverage
+        self.periods_per_year = periods_per_year
+        for name, value in vars(self).items():
+            if value is None and name in _OPTIONAL_RULES:
+                continue
+            if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+
+    def __repr__(self) -> str:
+        rules = ", ".join(f"{name}={value!r}" for name, value in vars(self).items() if value is not None)
+        return f"ExecutionConfig({rules})"
+
+    def params(self, fee: float) -> np.ndarray:
+        """Kernel parameters: fee, stop_loss, take_profit, trailing_stop, max_holding (0 disables)."""
+        values = (fee, self.stop_loss, self.take_profit, self.trailing_stop, self.max_holding)
+        return np.array([0.0 if value is None else float(value) for value in values])
+
+    def position_size(self, close: np.ndarray):
+        """Volatility-targeted size per bar, or None without a volatility target.
+
+        NaN while the volatility window is warming up, which keeps the strategy flat.
+        """
+        if self.target_volatility is None:
+            return None
+        returns = pd.Series(close).pct_change()
+        realized = returns.rolling(self.vol_window).std().to_numpy() * np.sqrt(self.periods_per_year)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.minimum(self.target_volatility / realized, self.max_leverage)
+
+
+def execute(df: pd.DataFrame, signal, fee: float, config: ExecutionConfig, n_threads: int = None) -> dict:
+    """Execute *signal* over the bars of *df* under *config*'s rules.
+
+    Args:
+        df (pandas.DataFrame): Bars with ``Close`` and, for intrabar stops,
+            ``Open``/``High``/``Low`` (the close is used for missing columns).
+        signal: (n_bars,) signal array, or an (n_series, n_bars) block of
+            signals evaluated over the same bars in one native call.
+        fee (float): Fee per unit of position traded.
+        n_threads (int, optional): Threads for a 2-D block.
+
+    Returns:
+        dict: ``position``, ``trades``, ``strategy_returns``, ``exit_price``
+        and ``exit_reason`` arrays shaped like *signal*, with the backtester's
+        conventions (see run_strategy). ``exit_reason`` codes are listed in
+        EXIT_REASONS.
+
+    Falls back to a pure-Python loop, orders of magnitude slower, when the C++
+    library is not built.
+    """
+    close = df['Close'].to_numpy(dtype=np.float64)
+    prices = [df[column].to_numpy(dtype=np.float64) if column in df else close for column in ('Open', 'High', 'Low')]
+    signal = np.asarray(signal, dtype=np.float64)
+    size = config.position_size(close)
+    if size is not None and signal.ndim == 2:
+        size = np.broadcast_to(size, signal.shape)
+    params = config.params(fee)
+
+    if bridge is not None:
+        try:
+            return bridge.simulate_execution(*prices, close, signal, params, size=size, n_threads=n_threads)
+        except (FileNotFoundError, RuntimeError) as e:
+            logger.warning("Native execution unavailable (%s); using the Python fallback", e)
+
+    if signal.ndim == 1:
+        return _execute_python(*prices, close, signal, size, params)
+    rows = [
+        _execute_python(*prices, close, signal[k], None if size is None else size[k], params)
+        for k in range(len(signal))
+    ]
+    return {name: np.stack([row[name] for row in rows]) for name in rows[0]}
+
+
+def exits_frame(index: pd.Index, executed: dict) -> pd.DataFrame:
+    """Rule-based exits of one executed series: ``Price`` and ``Reason`` per exit bar."""
+    rows = np.flatnonzero(executed["exit_reason"])
+    return pd.DataFrame(
+        {
+            "Price": executed["exit_price"][rows],
+            "Reason": [EXIT_REASONS[code] for code in executed["exit_reason"][rows]],
+        },
+        index=index[rows],
+    )
+
+
+def _execute_python(open_, high, low, close, signal, size, params) -> dict:
+    """Reference implementation of ``execution_kernel`` in analytics.cpp."""
+    fee, stop_loss, take_profit, trailing_stop, max_holding = params
+    use_stop, use_take, use_trail, use_hold = (value > 0 for value in params[1:])
+    length = len(close)
+
+    position = np.zeros(length)
+    trades = np.full(length, np.nan)
+    strategy_returns = np.full(length, np.nan)
+    exit_price = np.full(length, np.nan)
+    exit_reason = np.zeros(length, dtype=np.int32)
+
+    held = end_position = 0.0
+    entry_price = extreme = blocked_signal = math.nan
+    entry_signal = 0.0
+    bars_held = 0
+    force_flat = False
+
+    for t in range(length):
+        if t > 0:
+            previous_close = close[t - 1]
+            trade = abs(held - end_position)
+            if held != 0.0 and held != end_position:
+                entry_price = extreme = previous_close
+                bars_held = 0
+
+            position[t] = held
+            bar_return = held * (close[t] / previous_close - 1.0)
+            end_position = held
+
+            if held != 0.0:
+                bars_held += 1
+                direction = 1.0 if held > 0.0 else -1.0
+                adverse, favourable = (low[t], high[t]) if held > 0.0 else (high[t], low[t])
+
+                stop_level, stop_reason = math.nan, 0
+                if use_stop:
+                    stop_level, stop_reason = entry_price * (1.0 - direction * stop_loss), 1
+                if use_trail:
+                    trail_level = extreme * (1.0 - direction * trailing_stop)
+                    if stop_reason == 0 or direction * (trail_level - stop_level) > 0.0:
+                        stop_level, stop_reason = trail_level, 3
+
+                fill, reason = math.nan, 0
+                if stop_reason and direction * (adverse - stop_level) <= 0.0:
+                    fill = open_[t] if direction * (open_[t] - stop_level) < 0.0 else stop_level
+                    reason = stop_reason
+                elif use_take:
+                    take_level = entry_price * (1.0 + direction * take_profit)
+                    if direction * (favourable - take_level) >= 0.0:
+                        fill = open_[t] if direction * (open_[t] - take_level) > 0.0 else take_level
+                        reason = 2
+
+                if reason:
+                    bar_return = held * (fill / previous_close - 1.0)
+                    trade += abs(held)
+                    end_position = 0.0
+                    exit_price[t], exit_reason[t] = fill, reason
+                    blocked_signal = entry_signal
+                else:
+                    if (favourable > extreme) if held > 0.0 else (favourable < extreme):
+                        extreme = favourable
+                    if use_hold and bars_held >= max_holding:
+                        exit_price[t], exit_reason[t] = close[t], 4
+                        blocked_signal = entry_signal
+                        force_flat = True
+
+            trades[t] = trade
+            strategy_returns[t] = bar_return - fee * trade
+
+        current = 0.0 if math.isnan(signal[t]) else signal[t]
+        if not math.isnan(blocked_signal) and current != blocked_signal:
+            blocked_signal = math.nan
+
+        if force_flat or not math.isnan(blocked_signal):
+            target = 0.0
+        elif end_position != 0.0 and current == entry_signal:
+            target = end_position
+        else:
+            scale = 1.0 if size is None else size[t]
+            target = 0.0 if math.isnan(scale) else current * scale
+            if target != 0.0:
+                entry_signal = current
+        force_flat = False
+        held = target
+
+    return {
+        "position": position,
+        "trades": trades,
+        "strategy_returns": strategy_returns,
+        "exit_price": exit_price,
+        "exit_reason": exit_reason,
+    }
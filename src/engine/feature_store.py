@@ -0,0 +1,111 @@
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+class FeatureStore:
+    """Memoized indicator cache shared by every strategy in a backtest.
+
+    The backtester binds the store to its price frame before running the
+    strategies. Strategies then request indicators such as
+    ``store.sma("Close", 20)`` and get back a Series computed at most once
+    per (column, operation, parameters) key.
+
+    By default the cache is cleared on every bind, i.e. it lives for one
+    run. With ``persist=True`` entries are additionally keyed by a content
+    hash of the source column, survive across runs and are evicted in
+    least-recently-used order once ``max_entries`` is exceeded.
+
+    Returned Series are shared between callers and must be treated as
+    read-only; assigning them into a DataFrame column copies them.
+    """
+
+    def __init__(self, persist: bool = False, max_entries: int = 256) -> None:
+        self.persist = persist
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._df = None
+        self._fingerprints = {}
+        self._cache = OrderedDict()
+
+    def bind(self, df: pd.DataFrame) -> "FeatureStore":
+        """Attach the store to *df*, the frame every strategy starts from."""
+        self._df = df
+        self._fingerprints = {}
+        if not self.persist:
+            self._cache.clear()
+        return self
+
+    def covers(self, df: pd.DataFrame) -> bool:
+        """Whether *df* is (a copy of) the bound frame, so cached features align with it."""
+        if self._df is None or len(df) != len(self._df):
+            return False
+        return df.index is self._df.index or df.index.equals(self._df.index)
+
+    def get(self, key: tuple, compute) -> pd.Series:
+        """Return the feature stored under *key*, calling ``compute()`` on a miss.
+
+        The first element of *key* names the source column of the bound frame;
+        the remaining elements identify the operation and its parameters.
+        """
+        if self._df is None:
+            raise RuntimeError("FeatureStore is not bound; call bind(df) first")
+
+        cache_key = (self._fingerprint(key[0]),) + tuple(key) if self.persist else tuple(key)
+        if cache_key in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        self.misses += 1
+        value = compute()
+        if not isinstance(value, pd.Series):
+            value = pd.Series(value, index=self._df.index)
+
+        self._cache[cache_key] = value
+        if self.persist:
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return value
+
+    def sma(self, column: str, window: int) -> pd.Series:
+        return self.get((column, "sma", window), lambda: self._df[column].rolling(window).mean())
+
+    def std(self, column: str, window: int, ddof: int = 1) -> pd.Series:
+        return self.get(
+            (column, "std", window, ddof), lambda: self._df[column].rolling(window).std(ddof=ddof)
+        )
+
+    def ema(self, column: str, span=None, com=None, adjust: bool = False) -> pd.Series:
+        return self.get(
+            (column, "ema", span, com, adjust),
+            lambda: self._df[column].ewm(span=span, com=com, adjust=adjust).mean(),
+        )
+
+    def diff(self, column: str, periods: int = 1) -> pd.Series:
+        return self.get((column, "diff", periods), lambda: self._df[column].diff(periods))
+
+    def pct_change(self, column: str, periods: int = 1) -> pd.Series:
+        return self.get((column, "pct_change", periods), lambda: self._df[column].pct_change(periods))
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def _fingerprint(self, column: str) -> str:
+        fingerprint = self._fingerprints.get(column)
+        if fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            index = self._df.index
+            digest.update(np.ascontiguousarray(index.asi8 if hasattr(index, "asi8") else index.to_numpy()).tobytes())
+            digest.update(np.ascontiguousarray(self._df[column].to_numpy()).tobytes())
+            fingerprint = digest.hexdigest()
+            self._fingerprints[column] = fingerprint
+        return fingerprint
@@ -0,0 +1,420 @@
+import hashlib
+import inspect
+import json
+import logging
+import math
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Fields of a backtest job and their defaults; see normalize_job.
+JOB_DEFAULTS = {
+    "tickers": None,
+    "strategies": None,
+    "fee": 0.001,
+    "initial_capital": 10000.0,
+    "freq": None,
+    "execution": None,
+    "periods_per_year": 365,
+    "equity": False,
+}
+
+# Symbols a job may name: letters, digits and . - = _ (e.g. BRK.B, BTC-USD,
+# EURUSD=X), optionally after a ^ for indices. Tickers become file names, so
+# path separators are never accepted.
+TICKER_PATTERN = re.compile(r"\^?[A-Za-z0-9][A-Za-z0-9._=-]{0,31}")
+
+# Frames kept warm per worker process, most recently used last.
+MAX_WARM_FRAMES = 32
+
+_warm_frames = OrderedDict()
+_warm_lock = threading.Lock()
+
+
+def strategy_registry() -> dict:
+    """Strategy classes a job may name, keyed by class name."""
+    import src.strategies as strategies
+    from src.strategies import BaseStrategy
+
+    return {
+        name: cls
+        for name in strategies.__all__
+        for cls in [getattr(strategies, name)]
+        if isinstance(cls, type) and issubclass(cls, BaseStrategy) and cls is not BaseStrategy
+    }
+
+
+def describe_strategies() -> dict:
+    """Constructor parameters and defaults of every registered strategy."""
+    described = {}
+    for name, cls in strategy_registry().items():
+        params = {}
+        for param_name, param in inspect.signature(cls.__init__).parameters.items():
+            if param_name == "self" or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+                continue
+            params[param_name] = None if param.default is inspect.Parameter.empty else param.default
+        described[name] = {"params": params, "doc": inspect.getdoc(cls).splitlines()[0] if cls.__doc__ else ""}
+    return described
+
+
+def strategy_spec(spec) -> dict:
+    """Copy of a strategy spec as a dict, accepting a bare class name.
+
+    Raises:
+        ValueError: *spec* is neither a class name nor a mapping with a ``name``.
+    """
+    if isinstance(spec, str):
+        return {"name": spec}
+    if not isinstance(spec, dict) or "name" not in spec:
+        raise ValueError("Each strategy must be a class name or an object with 'name'")
+    return dict(spec)
+
+
+def strategy_from_spec(spec, registry: dict = None):
+    """Build a strategy from ``"ClassName"`` or ``{"name": "ClassName", "params": {...}, "label": ...}``."""
+    registry = registry if registry is not None else strategy_registry()
+    if isinstance(spec, str):
+        spec = {"name": spec}
+    cls = registry.get(spec.get("name"))
+    if cls is None:
+        raise ValueError(f"Unknown strategy {spec.get('name')!r}; expected one of {sorted(registry)}")
+    try:
+        strategy = cls(**spec.get("params", {}))
+    except TypeError as e:
+        raise ValueError(f"Invalid parameters for {spec['name']}: {e}") from None
+    if spec.get("label"):
+        strategy.name = spec["label"]
+    return strategy
+
+
+def normalize_job(payload: dict) -> dict:
+    """Validate a job payload and fill in defaults.
+
+    A job names ``tickers`` (one symbol or a list) and ``strategies`` (specs
+    accepted by strategy_from_spec), plus optional ``fee``,
+    ``initial_capital``, ``freq``, ``execution`` (ExecutionConfig keyword
+    arguments), ``periods_per_year`` and ``equity`` (include equity curves in
+    the result).
+
+    Raises:
+        ValueError: If the payload is malformed or names an unknown strategy.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("A job must be a JSON object")
+    unknown = set(payload) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {sorted(unknown)}")
+    job = {**JOB_DEFAULTS, **payload}
+
+    tickers = job["tickers"]
+    if isinstance(tickers, str):
+        tickers = [tickers]
+    if not tickers or not isinstance(tickers, (list, tuple)) or not all(isinstance(ticker, str) and ticker for ticker in tickers):
+        raise ValueError("tickers must be a symbol or a non-empty list of symbols")
+    for ticker in tickers:
+        if not TICKER_PATTERN.fullmatch(ticker):
+            raise ValueError(f"Invalid ticker symbol {ticker!r}")
+    job["tickers"] = list(dict.fromkeys(tickers))
+
+    strategies = job["strategies"]
+    if not strategies or not isinstance(strategies, list):
+        raise ValueError("strategies must be a non-empty list")
+    specs = []
+    registry = strategy_registry()
+    for spec in strategies:
+        spec = strategy_spec(spec)
+        spec.setdefault("params", {})
+        strategy_from_spec(spec, registry)
+        specs.append(spec)
+    job["strategies"] = specs
+
+    for field in ("fee", "initial_capital", "periods_per_year"):
+        if not isinstance(job[field], (int, float)) or isinstance(job[field], bool):
+            raise ValueError(f"{field} must be a number")
+    if job["execution"] is not None:
+        from src.engine.execution import ExecutionConfig
+
+        if not isinstance(job["execution"], dict):
+            raise ValueError("execution must be an object of ExecutionConfig fields")
+        try:
+            ExecutionConfig(**job["execution"])
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid execution rules: {e}") from None
+    job["equity"] = bool(job["equity"])
+    return job
+
+
+def job_key(job: dict) -> str:
+    """Content hash of a normalized job; identical jobs share a key."""
+    return hashlib.blake2b(json.dumps(job, sort_keys=True, default=str).encode(), digest_size=16).hexdigest()
+
+
+def load_frame(ticker: str, freq: str = None, data_dir: str = None):
+    """Load *ticker*, reusing the frame this process loaded last time while its CSV is unchanged."""
+    from src.data_pipeline import DataLoader
+
+    loader = DataLoader(data_dir=data_dir)
+    path = os.path.join(loader.data_dir, f"{ticker}.csv")
+    key = (loader.data_dir, ticker, freq)
+    try:
+        stat = os.stat(path)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        stamp = None
+
+    with _warm_lock:
+        warm = _warm_frames.get(key)
+        if warm is not None and stamp is not None and warm[0] == stamp:
+            _warm_frames.move_to_end(key)
+            return warm[1]
+
+    df = loader.load_data(ticker, freq)
+    stat = os.stat(path)
+    with _warm_lock:
+        _warm_frames[key] = ((stat.st_size, stat.st_mtime_ns), df)
+        _warm_frames.move_to_end(key)
+        while len(_warm_frames) > MAX_WARM_FRAMES:
+            _warm_frames.popitem(last=False)
+    return df
+
+
+def run_job(job: dict, data_dir: str = None) -> dict:
+    """Run a normalized job: one Backtester per ticker over the job's strategies.
+
+    Returns:
+        dict: JSON-serializable result: per ticker, ``metrics`` (label ->
+        metric -> value), ``bars``, ``start``/``end`` and, when requested,
+        ``equity`` (``index`` plus one list per label); ``elapsed`` seconds.
+    """
+    from src.engine.backtester import Backtester
+    from src.engine.execution import ExecutionConfig
+
+    started = time.perf_counter()
+    registry = strategy_registry()
+    execution = ExecutionConfig(**job["execution"]) if job["execution"] is not None else None
+    results = {}
+    for ticker in job["tickers"]:
+        df = load_frame(ticker, job["freq"], data_dir)
+        backtester = Backtester(
+            df,
+            [strategy_from_spec(spec, registry) for spec in job["strategies"]],
+            initial_capital=job["initial_capital"],
+            fee=job["fee"],
+            execution=execution,
+        )
+        backtester.run()
+        metrics = backtester.get_metrics(periods_per_year=job["periods_per_year"])
+        entry = {
+            "bars": len(backtester.results),
+            "start": backtester.results.index[0].isoformat(),
+            "end": backtester.results.index[-1].isoformat(),
+            "metrics": {label: _json_values(row) for label, row in metrics.iterrows()},
+        }
+        if job["equity"]:
+            equity = backtester.results.equity
+            entry["equity"] = {
+                "index": [timestamp.isoformat() for timestamp in backtester.results.index],
+                **{label: _json_values(equity[row]) for row, label in enumerate(backtester.labels)},
+            }
+        results[ticker] = entry
+    return {"tickers": results, "elapsed": time.perf_counter() - started}
+
+
+def _json_values(values):
+    """Plain floats with NaN/inf as None, which JSON cannot represent."""
+    if hasattr(values, "items"):
+        return {key: _json_value(value) for key, value in values.items()}
+    return [_json_value(value) for value in np.asarray(values, dtype=np.float64).tolist()]
+
+
+def _json_value(value):
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+class JobManager:
+    """Runs backtest jobs on a bounded process pool with a result cache.
+
+    Identical jobs (same normalized payload) are answered from an in-memory
+    LRU cache of results, and a job submitted while an identical one is still
+    running attaches to it instead of running twice. Each worker process
+    keeps recently loaded price frames warm across jobs (see load_frame).
+
+    If a worker process dies (e.g. killed for running out of memory), the
+    jobs running on the pool fail and a pool the manager created itself is
+    replaced, so later jobs run normally.
+
+    Args:
+        max_workers (int, optional): Worker processes; all cores by default.
+        cache_size (int): Results kept in the LRU cache.
+        data_dir (str, optional): Data directory passed to DataLoader.
+        executor (concurrent.futures.Executor, optional): Pool to use instead
+            of creating one, e.g. a ThreadPoolExecutor to run jobs in-process.
+        history (int): Finished job records and latency samples kept.
+    """
+
+    def __init__(self, max_workers: int = None, cache_size: int = 256, data_dir: str = None, executor=None, history: int = 1000) -> None:
+        self.executor = executor if executor is not None else ProcessPoolExecutor(max_workers=max_workers)
+        self.max_workers = max_workers
+        self._owns_executor = executor is None
+        self.cache_size = cache_size
+        self.data_dir = data_dir
+        self.history = history
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._inflight = {}
+        self._jobs = OrderedDict()
+        self._latencies = deque(maxlen=history)
+        self._completions = deque(maxlen=history)
+        self._counts = {"submitted": 0, "completed": 0, "failed": 0, "cached": 0}
+        self._started = time.time()
+
+    def submit(self, payload: dict) -> dict:
+        """Queue a job and return its record (``id``, ``status``, ...) without waiting.
+
+        Raises:
+            ValueError: If the payload is invalid.
+        """
+        job = normalize_job(payload)
+        # Results go stale when a ticker's CSV changes, so its size/mtime is part of the key.
+        key = job_key({**job, "data": self._data_stamps(job["tickers"])})
+        submitted = time.time()
+        record = {"id": uuid.uuid4().hex, "key": key, "status": "queued", "submitted": submitted}
+        with self._lock:
+            self._counts["submitted"] += 1
+            self._remember(record)
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._counts["cached"] += 1
+                record.update(status="done", cached=True, finished=submitted, result=self._cache[key])
+                self._latencies.append(0.0)
+                return dict(record)
+            future = self._inflight.get(key)
+            if future is None:
+                executor = self.executor
+                try:
+                    future = executor.submit(run_job, job, self.data_dir)
+                except BrokenProcessPool:
+                    executor = self._replace_pool(executor)
+                    future = executor.submit(run_job, job, self.data_dir)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done, key=key, executor=executor: self._finished(key, done, executor))
+            record["future"] = future
+        future.add_done_callback(lambda done, record=record: self._settle(record, done))
+        return self.status(record["id"])
+
+    def run(self, payload: dict, timeout: float = None) -> dict:
+        """Submit a job and wait up to *timeout* seconds for it; returns its record either way."""
+        record = self.submit(payload)
+        future = self._jobs[record["id"]].get("future")
+        if future is not None:
+            try:
+                future.result(timeout=timeout)
+            except TimeoutError:
+                pass
+            except Exception:
+                # Reported in the record.
+                pass
+        return self.status(record["id"])
+
+    def status(self, job_id: str) -> dict:
+        """Record of job *job_id*: ``status`` is queued, running, done or failed; ``result``
+        or ``error`` once finished. Raises KeyError for unknown ids."""
+        with self._lock:
+            record = self._jobs[job_id]
+            future = record.get("future")
+            if record["status"] == "queued" and future is not None and future.running():
+                record["status"] = "running"
+            return {name: value for name, value in record.items() if name != "future"}
+
+    def stats(self) -> dict:
+        """Job counts, cache usage, latency percentiles and recent throughput."""
+        now = time.time()
+        with self._lock:
+            latencies = np.array(self._latencies) * 1000
+            recent = sum(1 for finished in self._completions if now - finished <= 60)
+            hits = self._counts["cached"]
+            return {
+                "uptime_s": now - self._started,
+                "jobs": {**self._counts, "in_flight": len(self._inflight)},
+                "cache": {
+                    "entries": len(self._cache),
+                    "hit_rate": hits / self._counts["submitted"] if self._counts["submitted"] else None,
+                },
+                "latency_ms": {
+                    "p50": float(np.percentile(latencies, 50)) if latencies.size else None,
+                    "p95": float(np.percentile(latencies, 95)) if latencies.size else None,
+                    "max": float(latencies.max()) if latencies.size else None,
+                },
+                "throughput_per_min": recent,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self.executor.shutdown(wait=wait)
+
+    def _data_stamps(self, tickers) -> dict:
+        from src.data_pipeline import DataLoader
+
+        data_dir = DataLoader(data_dir=self.data_dir).data_dir
+        stamps = {}
+        for ticker in tickers:
+            try:
+                stat = os.stat(os.path.join(data_dir, f"{ticker}.csv"))
+                stamps[ticker] = [stat.st_size, stat.st_mtime_ns]
+            except FileNotFoundError:
+                stamps[ticker] = None
+        return stamps
+
+    def _replace_pool(self, broken):
+        """Swap a broken process pool for a new one and return the pool to use."""
+        with self._lock:
+            if self.executor is broken and self._owns_executor:
+                logger.error("A worker process died; replacing the process pool")
+                self.executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                broken.shutdown(wait=False)
+            return self.executor
+
+    def _finished(self, key: str, future, executor) -> None:
+        if isinstance(future.exception(), BrokenProcessPool):
+            self._replace_pool(executor)
+        with self._lock:
+            self._inflight.pop(key, None)
+            if future.exception() is None:
+                self._cache[key] = future.result()
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def _settle(self, record: dict, future) -> None:
+        finished = time.time()
+        with self._lock:
+            error = future.exception()
+            if error is None:
+                record.update(status="done", result=future.result())
+                self._counts["completed"] += 1
+            else:
+                logger.error("Job %s failed: %s", record["id"], error)
+                record.update(status="failed", error=f"{type(error).__name__}: {error}")
+                self._counts["failed"] += 1
+            record["finished"] = finished
+            record.pop("future", None)
+            self._latencies.append(finished - record["submitted"])
+            self._completions.append(finished)
+
+    def _remember(self, record: dict) -> None:
+        self._jobs[record["id"]] = record
+        # Forget the oldest finished records beyond the history limit.
+        while len(self._jobs) > self.history:
+            oldest = next(iter(self._jobs))
+            if self._jobs[oldest]["status"] in ("queued", "running"):
+                break
+            self._jobs.popitem(last=False)
@@ -0,0 +1,213 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+try:
+    from src.cpp import bridge
+except ImportError:
+    bridge = None
+
+
+METRIC_COLUMNS = [
+    "Total Return",
+    "Annualized Return",
+    "Annualized Volatility",
+    "Max Drawdown",
+    "Sharpe Ratio",
+    "Sortino Ratio",
+    "Calmar Ratio",
+    "Turnover",
+]
+
+# Metrics shown as percentages by format_metrics; the rest are plain ratios.
+PERCENT_COLUMNS = ("Total Return", "Annualized Return", "Annualized Volatility", "Max Drawdown")
+
+_NS_PER_DAY = 86_400_000_000_000
+
+
+def compute_metrics(
+    equity,
+    strategy_returns,
+    trades=None,
+    index: pd.Index = None,
+    periods_per_year: float = 365,
+) -> np.ndarray:
+    """Compute every metric for every strategy in one vectorized pass.
+
+    Args:
+        equity: (n_strategies, n_bars) equity curves, or one curve.
+        strategy_returns: Per-bar strategy returns shaped like *equity*.
+        trades (optional): Absolute position changes per bar shaped like
+            *equity*, used for turnover; turnover is NaN without it.
+        index (pandas.Index, optional): Bar timestamps. With a DatetimeIndex the
+            period length is measured in calendar days / 365.25, as
+            ``Backtester.get_metrics`` always has; otherwise it is the number
+            of bars / *periods_per_year*.
+        periods_per_year (float): Bars per year, used to annualize volatility.
+
+    Returns:
+        numpy.ndarray: (n_strategies, len(METRIC_COLUMNS)) array of floats.
+
+    NaNs are skipped per strategy: each curve is measured from its first to its
+    last valid value, and reductions ignore missing bars instead of dropping
+    them for every strategy. Sharpe, Sortino and Calmar use the annualized
+    return as numerator.
+    """
+    equity = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    strategy_returns = np.atleast_2d(np.asarray(strategy_returns, dtype=np.float64))
+    n_strategies, length = equity.shape
+    rows = np.arange(n_strategies)
+
+    valid = ~np.isnan(equity)
+    # Without missing values the plain reductions give the same result at about half the cost.
+    complete = valid.all() and not np.isnan(strategy_returns).any()
+    has_values = valid.any(axis=1)
+    first = valid.argmax(axis=1)
+    last = length - 1 - valid[:, ::-1].argmax(axis=1)
+    accumulate_max, reduce_min, mean, std = (
+        (np.maximum.accumulate, np.min, np.mean, np.std)
+        if complete
+        else (np.fmax.accumulate, np.nanmin, np.nanmean, np.nanstd)
+    )
+
+    years = period_years(index, first, last, periods_per_year)
+
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        # All-NaN rows legitimately produce NaN metrics.
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+
+        total_return = equity[rows, last] / equity[rows, first] - 1
+        drawdown = accumulate_max(equity, axis=1)
+        np.divide(equity, drawdown, out=drawdown)
+        max_drawdown = reduce_min(drawdown, axis=1) - 1
+
+        volatility = std(strategy_returns, axis=1, ddof=1)
+        downside = np.minimum(strategy_returns, 0)
+        np.square(downside, out=downside)
+        downside = np.sqrt(mean(downside, axis=1))
+
+        if trades is None:
+            turnover = np.full(n_strategies, np.nan)
+        else:
+            trades = np.atleast_2d(np.asarray(trades, dtype=np.float64))
+            turnover = np.nansum(trades, axis=1) / years
+
+    metrics = combine_metrics(total_return, max_drawdown, volatility, downside, turnover, years, periods_per_year)
+    metrics[~has_values] = np.nan
+    return metrics
+
+
+def period_years(index: pd.Index, first, last, periods_per_year: float = 365):
+    """Years between bar positions *first* and *last*: calendar days / 365.25 with a
+    DatetimeIndex, bars / *periods_per_year* otherwise."""
+    if isinstance(index, pd.DatetimeIndex):
+        timestamps = index.asi8
+        return (timestamps[last] - timestamps[first]) // _NS_PER_DAY / 365.25
+    return (np.asarray(last) - np.asarray(first)) / periods_per_year
+
+
+def combine_metrics(total_return, max_drawdown, volatility, downside, turnover, years, periods_per_year: float = 365) -> np.ndarray:
+    """Assemble the METRIC_COLUMNS array from per-strategy building blocks.
+
+    Args:
+        total_return, max_drawdown: Fractions, e.g. -0.25 for a 25% drawdown.
+        volatility: Per-bar sample standard deviation of the strategy returns.
+        downside: Per-bar downside deviation, ``sqrt(mean(min(r, 0) ** 2))``.
+        turnover: Annual turnover.
+        years: Period length from period_years.
+
+    Returns:
+        numpy.ndarray: (n_strategies, len(METRIC_COLUMNS)) array; the annualized
+        figures and ratios are derived here.
+    """
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        annualized_return = (1 + total_return) ** (1 / years) - 1
+        annualized_volatility = volatility * np.sqrt(periods_per_year)
+        downside = downside * np.sqrt(periods_per_year)
+        return np.column_stack([
+            total_return,
+            annualized_return,
+            annualized_volatility,
+            max_drawdown,
+            annualized_return / annualized_volatility,
+            annualized_return / downside,
+            annualized_return / np.abs(max_drawdown),
+            np.broadcast_to(turnover, np.shape(total_return)),
+        ])
+
+
+def metrics_frame(result, periods_per_year: float = 365) -> pd.DataFrame:
+    """Numeric metrics of a BacktestResult, one row per strategy label."""
+    metrics = compute_metrics(
+        result.equity,
+        result.strategy_returns,
+        trades=result.trades,
+        index=result.index,
+        periods_per_year=periods_per_year,
+    )
+    return pd.DataFrame(metrics, index=pd.Index(result.labels, name="Strategy"), columns=METRIC_COLUMNS)
+
+
+def format_metrics(metrics: pd.DataFrame) -> pd.DataFrame:
+    """Render a numeric metrics frame as strings: percentages for returns and drawdown, two decimals otherwise."""
+    formatted = pd.DataFrame(index=metrics.index)
+    for column in metrics.columns:
+        if column in PERCENT_COLUMNS:
+            formatted[column] = [f"{value * 100:.2f}%" for value in metrics[column]]
+        else:
+            formatted[column] = [f"{value:.2f}" for value in metrics[column]]
+    return formatted
+
+
+def _rolling(op: str, data, window: int, n_threads: int = None):
+    """Apply a rolling kernel row-wise to 1-D/2-D arrays or column-wise to pandas objects.
+
+    The C++ library is used when it is available; otherwise pandas computes
+    the same values.
+    """
+    if isinstance(data, (pd.Series, pd.DataFrame)):
+        values = data.to_numpy(dtype=np.float64)
+        result = _rolling(op, values.T if values.ndim == 2 else values, window, n_threads)
+        if isinstance(data, pd.Series):
+            return pd.Series(result, index=data.index, name=data.name)
+        return pd.DataFrame(result.T, index=data.index, columns=data.columns)
+
+    values = np.asarray(data, dtype=np.float64)
+    if bridge is not None:
+        try:
+            function = {
+                "mean": bridge.calculate_sma,
+                "std": bridge.calculate_stddev,
+                "max": bridge.calculate_rolling_max,
+            }[op]
+            return function(values, window, n_threads=n_threads)
+        except (FileNotFoundError, RuntimeError):
+            pass
+
+    frame = pd.DataFrame(np.atleast_2d(values).T)
+    result = getattr(frame.rolling(window), op)().to_numpy().T
+    return result if values.ndim == 2 else result[0]
+
+
+def rolling_sharpe(returns, window: int, periods_per_year: float = 365, n_threads: int = None):
+    """Annualized rolling Sharpe ratio: mean / sample std of the last *window* returns.
+
+    O(n) per series via the C++ rolling mean and Welford standard deviation.
+    Accepts one series, an (n_strategies, n_bars) array or a bars x strategies
+    DataFrame such as ``results.field("strategy_returns")``.
+    """
+    mean = _rolling("mean", returns, window, n_threads)
+    std = _rolling("std", returns, window, n_threads)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return mean / std * np.sqrt(periods_per_year)
+
+
+def rolling_drawdown(equity, window: int, n_threads: int = None):
+    """Drawdown from the highest equity within the last *window* bars (``equity / peak - 1``).
+
+    O(n) per series via the C++ monotonic-deque rolling maximum. Accepts the
+    same inputs as rolling_sharpe.
+    """
+    peak = _rolling("max", equity, window, n_threads)
+    return equity / peak - 1
@@ -0,0 +1,227 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Fields kept by Panel.from_frames / from_long when none are named.
+PANEL_FIELDS = ("Open", "High", "Low", "Close", "Volume")
+
+
+class Panel:
+    """Prices of a universe of tickers on one common calendar.
+
+    Every field is a (n_tickers, n_bars) array, one row per ticker, so
+    cross-sectional operations are column-wise NumPy reductions instead of a
+    loop over tickers. ``valid`` marks the bars at which a ticker has a
+    price: before its listing, after its delisting and across gaps in its
+    history it is False and the fields hold NaN.
+
+    Args:
+        index (pandas.DatetimeIndex): The common calendar.
+        tickers: Row labels.
+        fields (dict): Maps field names (``Close`` at least) to
+            (n_tickers, n_bars) arrays.
+        valid (numpy.ndarray, optional): (n_tickers, n_bars) bool mask;
+            defaults to the bars with a finite close.
+    """
+
+    def __init__(self, index: pd.Index, tickers, fields: dict, valid: np.ndarray = None) -> None:
+        self.index = index
+        self.tickers = pd.Index(tickers)
+        self.fields = fields
+        if "Close" not in fields:
+            raise ValueError("A panel needs a Close field")
+        shape = (len(self.tickers), len(index))
+        for name, values in fields.items():
+            if values.shape != shape:
+                raise ValueError(f"Field {name} has shape {values.shape}, expected {shape}")
+        self.valid = np.isfinite(fields["Close"]) if valid is None else valid
+        self._returns = None
+
+    @classmethod
+    def from_frames(cls, frames: dict, fields=None, dtype=np.float64) -> "Panel":
+        """Align per-ticker OHLCV frames, e.g. from ``DataLoader.load_many``, on the union of their dates.
+
+        Args:
+            frames (dict): Maps tickers to frames indexed by timestamp.
+            fields: Columns to keep; PANEL_FIELDS present in every frame by default.
+            dtype: Float dtype of the field arrays; ``np.float32`` halves their memory.
+        """
+        tickers = list(frames)
+        if fields is None:
+            fields = [name for name in PANEL_FIELDS if all(name in frame for frame in frames.values())]
+        index = pd.DatetimeIndex(
+            np.unique(np.concatenate([frame.index.asi8 for frame in frames.values()]))
+        )
+        first = next(iter(frames.values()), None)
+        if first is not None and first.index.tz is not None:
+            index = index.tz_localize("UTC").tz_convert(first.index.tz)
+
+        arrays = {name: np.full((len(tickers), len(index)), np.nan, dtype=dtype) for name in fields}
+        for row, frame in enumerate(frames.values()):
+            # Placing each ticker's rows is the only per-ticker step; everything downstream is 2-D.
+            columns = index.get_indexer(frame.index)
+            for name in fields:
+                arrays[name][row, columns] = frame[name].to_numpy(dtype=dtype)
+        return cls(index.rename("Date"), tickers, arrays)
+
+    @classmethod
+    def from_long(cls, df: pd.DataFrame, ticker: str = "Ticker", date: str = "Date", fields=None, dtype=np.float64) -> "Panel":
+        """Pivot a long (date, ticker, fields...) table, e.g. a vendor dump, without a per-ticker loop.
+
+        Args:
+            df (pandas.DataFrame): One row per (date, ticker); *date* and *ticker*
+                may be columns or index levels.
+            fields: Columns to keep; PANEL_FIELDS present in *df* by default.
+        """
+        df = df.reset_index() if date not in df or ticker not in df else df
+        if fields is None:
+            fields = [name for name in PANEL_FIELDS if name in df]
+        rows, tickers = pd.factorize(df[ticker], sort=True)
+        columns, dates = pd.factorize(pd.DatetimeIndex(df[date]), sort=True)
+        arrays = {}
+        for name in fields:
+            values = np.full((len(tickers), len(dates)), np.nan, dtype=dtype)
+            values[rows, columns] = df[name].to_numpy(dtype=dtype)
+            arrays[name] = values
+        return cls(pd.DatetimeIndex(dates, name="Date"), tickers, arrays)
+
+    @property
+    def n_tickers(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def n_bars(self) -> int:
+        return len(self.index)
+
+    @property
+    def close(self) -> np.ndarray:
+        return self.fields["Close"]
+
+    def field(self, name: str) -> np.ndarray:
+        return self.fields[name]
+
+    def frame(self, name: str = "Close") -> pd.DataFrame:
+        """One field as a bars x tickers DataFrame."""
+        return pd.DataFrame(self.fields[name].T, index=self.index, columns=self.tickers, copy=False)
+
+    def returns(self) -> np.ndarray:
+        """(n_tickers, n_bars) simple returns, NaN where the ticker is not valid.
+
+        Measured from the last valid close, so a ticker resuming after a gap
+        earns the move over the gap on its first bar back. Computed once and cached.
+        """
+        if self._returns is None:
+            close = np.where(self.valid, self.close, np.nan)
+            # Position of the last valid close at or before every bar, without a loop over tickers.
+            last = np.where(self.valid, np.arange(self.n_bars), -1)
+            np.maximum.accumulate(last, axis=1, out=last)
+            last[:, 1:] = last[:, :-1].copy()
+            last[:, 0] = -1
+            previous = np.take_along_axis(close, np.maximum(last, 0), axis=1)
+            previous[last < 0] = np.nan
+            with np.errstate(divide="ignore", invalid="ignore"):
+                self._returns = close / previous - 1
+        return self._returns
+
+    def subset(self, tickers=None, start=None, end=None) -> "Panel":
+        """Panel restricted to *tickers* and the dates between *start* and *end* (inclusive)."""
+        rows = slice(None) if tickers is None else self.tickers.get_indexer(tickers)
+        if isinstance(rows, np.ndarray) and (rows < 0).any():
+            raise KeyError(f"Unknown tickers: {list(np.asarray(tickers)[rows < 0])}")
+        columns = self.index.slice_indexer(start, end)
+        return Panel(
+            self.index[columns],
+            self.tickers[rows],
+            {name: values[rows, columns] for name, values in self.fields.items()},
+            self.valid[rows, columns],
+        )
+
+    def __repr__(self) -> str:
+        span = f"{self.index[0]} .. {self.index[-1]}" if self.n_bars else "empty"
+        return f"Panel({self.n_tickers} tickers x {self.n_bars} bars, {span}, fields={list(self.fields)})"
+
+
+def trailing_return(close: np.ndarray, lookback: int, skip: int = 0) -> np.ndarray:
+    """Return from *lookback* bars ago to *skip* bars ago, per ticker row; NaN until available."""
+    if not 0 <= skip < lookback:
+        raise ValueError("skip must be in [0, lookback)")
+    result = np.full(close.shape, np.nan, dtype=close.dtype)
+    if close.shape[1] <= lookback:
+        return result
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[:, lookback:] = close[:, lookback - skip:close.shape[1] - skip] / close[:, :close.shape[1] - lookback] - 1
+    return result
+
+
+def _ordinal_ranks(values: np.ndarray, valid: np.ndarray = None):
+    """0-based rank of each valid entry within its column, and the number of valid entries per column."""
+    valid = np.isfinite(values) if valid is None else valid & np.isfinite(values)
+    # Invalid entries sort last and are never read back.
+    keys = np.where(valid, values, np.inf)
+    order = np.argsort(keys, axis=0, kind="stable")
+    ranks = np.empty(values.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(len(values))[:, None], axis=0)
+    return ranks, valid, valid.sum(axis=0)
+
+
+def cross_sectional_rank(values: np.ndarray, valid: np.ndarray = None, pct: bool = True) -> np.ndarray:
+    """Rank of every ticker among the valid tickers of each bar.
+
+    Args:
+        values: (n_tickers, n_bars) scores.
+        valid (optional): Mask of the entries to rank; non-finite values are
+            always excluded.
+        pct (bool): Scale ranks to [0, 1] (lowest to highest) instead of 0-based positions.
+
+    Returns:
+        numpy.ndarray: Float ranks, NaN where excluded. Ties are ordered by ticker row.
+    """
+    ranks, valid, counts = _ordinal_ranks(values, valid)
+    ranks = ranks.astype(np.float64)
+    if pct:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ranks /= np.maximum(counts - 1, 1)
+    ranks[~valid] = np.nan
+    return ranks
+
+
+def cross_sectional_zscore(values: np.ndarray, valid: np.ndarray = None) -> np.ndarray:
+    """``(value - mean) / std`` across the valid tickers of each bar; NaN where excluded
+    or where a bar has fewer than two valid tickers."""
+    values = np.where(np.isfinite(values) if valid is None else valid & np.isfinite(values), values, np.nan)
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        return (values - mean) / std
+
+
+def long_short_baskets(scores: np.ndarray, valid: np.ndarray = None, quantile: float = 0.1, long_only: bool = False) -> np.ndarray:
+    """Equal-weighted baskets of the highest and lowest scoring tickers of each bar.
+
+    Args:
+        scores: (n_tickers, n_bars) scores, e.g. trailing returns.
+        valid (optional): Mask of the eligible entries.
+        quantile (float): Fraction of the eligible tickers in each basket (at
+            least one when two or more are eligible).
+        long_only (bool): Hold only the top basket.
+
+    Returns:
+        numpy.ndarray: (n_tickers, n_bars) weights: ``1 / n`` for each of the *n*
+        longs and ``-1 / n`` for each of the *n* shorts, 0 elsewhere, so the
+        book is dollar neutral with a gross exposure of 2 (1 when long-only).
+    """
+    if not 0 < quantile <= 0.5:
+        raise ValueError("quantile must be in (0, 0.5]")
+    ranks, valid, counts = _ordinal_ranks(scores, valid)
+    size = np.where(counts >= 2, np.maximum(np.floor(counts * quantile), 1), 0).astype(np.int64)
+    weights = np.zeros(scores.shape, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        unit = np.where(size > 0, 1.0 / size, 0.0)
+    longs = valid & (ranks >= counts - size)
+    np.copyto(weights, np.broadcast_to(unit, weights.shape), where=longs)
+    if not long_only:
+        shorts = valid & (ranks < size)
+        np.copyto(weights, np.broadcast_to(-unit, weights.shape), where=shorts)
+    return weights
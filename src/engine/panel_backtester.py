@@ -0,0 +1,167 @@
+import logging
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from src.engine.metrics import metrics_frame
+from src.engine.panel import Panel
+from src.engine.profiler import NullProfiler
+from src.engine.results import BacktestResult, strategy_labels
+
+logger = logging.getLogger(__name__)
+
+
+def evaluate_weights(weights: np.ndarray, returns: np.ndarray, fee: float, chunk_size: int = 256) -> np.ndarray:
+    """Per-bar exposure, turnover and returns of a (n_tickers, n_bars) weight book.
+
+    Weights decided at bar t are held over bar t + 1 as fractions of capital,
+    i.e. the book is reset to its targets every bar. Tickers without a return
+    on a bar (NaN) contribute nothing, and NaN weights count as 0.
+
+    Args:
+        weights: (n_tickers, n_bars) target weights from a PanelStrategy.
+        returns: (n_tickers, n_bars) returns from ``Panel.returns``.
+        fee (float): Fee per unit of weight traded.
+        chunk_size (int): Bars processed per block, bounding the temporaries
+            to a few (n_tickers, chunk_size) arrays.
+
+    Returns:
+        numpy.ndarray: (3, n_bars) rows: net exposure (sum of weights held),
+        turnover (sum of absolute weight changes) and strategy returns net of
+        fees. The first bar has no return, as in run_strategy.
+    """
+    n_tickers, n_bars = returns.shape
+    out = np.empty((3, n_bars))
+    exposure, turnover, strategy_returns = out
+    exposure[:1] = 0
+    turnover[:1] = np.nan
+    strategy_returns[:1] = np.nan
+
+    previous = np.zeros(n_tickers)
+    for first in range(1, n_bars, chunk_size):
+        last = min(first + chunk_size, n_bars)
+        held = np.nan_to_num(weights[:, first - 1:last - 1], nan=0.0)
+        exposure[first:last] = held.sum(axis=0)
+        turnover[first:last] = np.abs(np.diff(held, axis=1, prepend=previous[:, None])).sum(axis=0)
+        previous = held[:, -1]
+        contribution = held * returns[:, first:last]
+        strategy_returns[first:last] = np.nansum(contribution, axis=0)
+    strategy_returns[1:] -= fee * turnover[1:]
+    return out
+
+
+def first_held_bar(weights: np.ndarray, chunk_size: int = 256):
+    """First bar at which the book holds any weight, or None if it never does.
+
+    Uses gross exposure rather than the net exposure of ``evaluate_weights``,
+    which is exactly 0 for a dollar-neutral book. Weights decided at bar t
+    are held from bar t + 1, as in evaluate_weights; NaN weights count as 0.
+    """
+    n_bars = weights.shape[1]
+    for first in range(0, n_bars - 1, chunk_size):
+        last = min(first + chunk_size, n_bars - 1)
+        held = np.flatnonzero((np.abs(weights[:, first:last]) > 0).any(axis=0))
+        if held.size:
+            return first + int(held[0]) + 1
+    return None
+
+
+class PanelBacktester:
+    """Backtest PanelStrategy instances over a whole universe.
+
+    Each strategy returns a (n_tickers, n_bars) weight book and is evaluated
+    with column-wise NumPy over blocks of bars, so the cost grows with
+    tickers x bars but no Python code runs per ticker. Results are held as in
+    Backtester: ``results`` is a BacktestResult with one row per strategy,
+    where ``position`` is the book's net exposure, ``trades`` its turnover and
+    ``returns`` the equal-weighted universe return. ``weights`` maps each
+    label to its book.
+
+    Args:
+        panel (Panel): The universe, e.g. ``Panel.from_frames(loader.load_many(tickers))``.
+        strategies: PanelStrategy instances.
+        initial_capital (float): Starting equity.
+        fee (float): Fee per unit of weight traded.
+        profiler (Profiler, optional): Receives a stage per strategy.
+        dtype: Float dtype of the result arrays.
+    """
+
+    def __init__(self, panel: Panel, strategies, initial_capital=10000.0, fee=0.001, profiler=None, dtype=np.float64):
+        self.panel = panel
+        self.strategies = strategies
+        self.initial_capital = initial_capital
+        self.fee = fee
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.dtype = np.dtype(dtype)
+        self.results = None
+        self.labels = None
+        self.weights = None
+
+    def run(self, chunk_size: int = 256) -> None:
+        """Run every strategy and compile their aligned equity curves into ``results``."""
+        logger.info("--- PanelBacktester running: %d tickers x %d bars ---", self.panel.n_tickers, self.panel.n_bars)
+        panel = self.panel
+        size = panel.n_tickers * panel.n_bars
+        with self.profiler.stage("run", rows=size):
+            with self.profiler.stage("returns", rows=size):
+                returns = panel.returns()
+
+            books = []
+            activation_points = []
+            blocks = np.empty((len(self.strategies), 3, panel.n_bars))
+            for i, strategy in enumerate(self.strategies):
+                with self.profiler.stage(f"strategy:{strategy.__class__.__name__}", rows=size):
+                    with self.profiler.stage("weights", rows=size):
+                        weights = np.asarray(strategy.generate_weights(panel))
+                    if weights.shape != returns.shape:
+                        raise ValueError(
+                            f"{strategy.__class__.__name__}.generate_weights returned shape {weights.shape}, expected {returns.shape}"
+                        )
+                    with self.profiler.stage("evaluate", rows=size):
+                        blocks[i] = evaluate_weights(weights, returns, self.fee, chunk_size)
+                books.append(weights)
+                activation_points.append(first_held_bar(weights, chunk_size))
+
+            with self.profiler.stage("alignment") as stage:
+                position, trades, strategy_returns = blocks.transpose(1, 0, 2)
+                start_candidates = [idx for idx in activation_points if idx is not None]
+                if not start_candidates:
+                    raise ValueError("No strategy took a position; cannot run backtest.")
+                start = max(start_candidates)
+                logger.debug("Activation points: %s, aligned at %s", activation_points, panel.index[start])
+
+                equity = np.nancumprod(1 + strategy_returns[:, start:], axis=1)
+                equity *= self.initial_capital / equity[:, :1]
+
+                with warnings.catch_warnings():
+                    # Bars where no ticker trades have no universe return.
+                    warnings.simplefilter("ignore", category=RuntimeWarning)
+                    universe = np.nanmean(returns[:, start:], axis=0)
+
+                self.labels = strategy_labels(self.strategies)
+                self.weights = dict(zip(self.labels, books))
+                self.results = BacktestResult(
+                    panel.index[start:],
+                    self.labels,
+                    universe.astype(self.dtype),
+                    position[:, start:].astype(self.dtype),
+                    trades[:, start:].astype(self.dtype),
+                    strategy_returns[:, start:].astype(self.dtype),
+                    equity.astype(self.dtype),
+                )
+                stage.rows = len(self.results)
+
+        logger.info("--- PanelBacktester ended running ---")
+
+    @property
+    def returns(self) -> pd.DataFrame:
+        """Wide, labelled view of ``results``, built on first access."""
+        return self.results.frame() if self.results is not None else None
+
+    def get_metrics(self, periods_per_year: float = 365) -> pd.DataFrame:
+        """Numeric performance metrics, one row per strategy label (see Backtester.get_metrics)."""
+        if self.results is None:
+            raise ValueError("Run .run() first")
+        with self.profiler.stage("metrics", rows=len(self.results)):
+            return metrics_frame(self.results, periods_per_year=periods_per_year)
@@ -0,0 +1,258 @@
+"""Equity plots that stay fast on very long histories.
+
+Every curve is decimated to a few points per horizontal pixel before it is
+drawn, so rendering costs grow with the image width rather than the number of
+bars. Figures are built on matplotlib's Agg canvas without pyplot, which works
+on headless workers and from several threads at once.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.engine.results import BacktestResult
+
+DECIMATION_METHODS = ("lttb", "minmax", None)
+
+
+def minmax_indices(values: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Indices of the minimum and maximum of every bucket of bars, per row.
+
+    Keeps each bucket's extremes, so spikes and drawdowns survive at any
+    zoom level; with one bucket per pixel column the plot is identical to
+    drawing every bar.
+
+    Args:
+        values: (n_rows, n_bars) curves; NaNs are ignored.
+        n_buckets (int): Buckets of consecutive bars.
+
+    Returns:
+        numpy.ndarray: (n_rows, n_points) sorted bar indices, including the
+        first and last bar. Every row keeps the same number of points.
+    """
+    values = np.atleast_2d(values)
+    n_rows, n_bars = values.shape
+    if n_bars <= 2 * n_buckets + 2:
+        return np.broadcast_to(np.arange(n_bars), (n_rows, n_bars)).copy()
+    size = -(-n_bars // n_buckets)
+    n_buckets = -(-n_bars // size)
+    padded = np.full((n_rows, n_buckets * size), np.nan)
+    padded[:, :n_bars] = values
+    blocks = padded.reshape(n_rows, n_buckets, size)
+    # An all-NaN bucket has no extremes; fall back to its first bar.
+    filled = np.isnan(blocks).all(axis=2, keepdims=True)
+    blocks = np.where(filled, 0.0, blocks)
+    offsets = np.arange(n_buckets) * size
+    low = np.nanargmin(blocks, axis=2) + offsets
+    high = np.nanargmax(blocks, axis=2) + offsets
+    indices = np.concatenate([
+        np.zeros((n_rows, 1), dtype=np.int64),
+        np.minimum(low, n_bars - 1),
+        np.minimum(high, n_bars - 1),
+        np.full((n_rows, 1), n_bars - 1, dtype=np.int64),
+    ], axis=1)
+    indices.sort(axis=1)
+    return indices
+
+
+def lttb_indices(x: np.ndarray, values: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling of every row to *n_out* points.
+
+    Each bucket keeps the bar forming the largest triangle with the point
+    kept from the previous bucket and the mean of the next one, which keeps
+    the visual shape of the curve with a single point per bucket. The loop
+    runs over buckets, not bars: each step is one NumPy operation over a
+    bucket for all rows at once.
+
+    Args:
+        x: (n_bars,) increasing x coordinates, e.g. ``index.asi8``.
+        values: (n_rows, n_bars) curves; NaNs are treated as 0 when scoring.
+        n_out (int): Points to keep per row (at least 3).
+
+    Returns:
+        numpy.ndarray: (n_rows, n_out) sorted bar indices, starting at the
+        first bar and ending at the last.
+    """
+    values = np.atleast_2d(values)
+    n_rows, n_bars = values.shape
+    if n_out >= n_bars or n_out < 3:
+        return np.broadcast_to(np.arange(n_bars), (n_rows, n_bars)).copy()
+    x = np.asarray(x, dtype=np.float64)
+    x = x - x[0]
+    y = np.nan_to_num(values.astype(np.float64, copy=False), nan=0.0)
+
+    # Buckets of the inner bars; the first and last bar are always kept.
+    edges = np.linspace(1, n_bars - 1, n_out - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.add.reduceat(x[1:n_bars - 1], edges[:-1] - 1) / counts
+    mean_y = np.add.reduceat(y[:, 1:n_bars - 1], edges[:-1] - 1, axis=1) / counts
+
+    indices = np.empty((n_rows, n_out), dtype=np.int64)
+    indices[:, 0] = 0
+    indices[:, -1] = n_bars - 1
+    rows = np.arange(n_rows)
+    previous = np.zeros(n_rows, dtype=np.int64)
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        if bucket + 1 < n_out - 2:
+            next_x, next_y = mean_x[bucket + 1], mean_y[:, bucket + 1]
+        else:
+            next_x, next_y = x[-1], y[:, -1]
+        prev_x, prev_y = x[previous], y[rows, previous]
+        # Twice the triangle area; the constant factor does not change the argmax.
+        area = np.abs(
+            (prev_x - next_x)[:, None] * (y[:, start:stop] - prev_y[:, None])
+            - (prev_x[:, None] - x[start:stop]) * (next_y - prev_y)[:, None]
+        )
+        previous = start + np.argmax(area, axis=1)
+        indices[:, bucket + 1] = previous
+    return indices
+
+
+def decimate(index: pd.Index, values: np.ndarray, n_points: int, method: str = "lttb"):
+    """Reduce (n_rows, n_bars) curves to about *n_points* points each.
+
+    Args:
+        index (pandas.Index): The bars' timestamps (or any monotonic index).
+        values: (n_rows, n_bars) curves.
+        n_points (int): Target points per row.
+        method (str): ``"lttb"`` (one point per bucket), ``"minmax"`` (the two
+            extremes per bucket) or None to keep every bar.
+
+    Returns:
+        tuple: ``(indices, values)``, both (n_rows, n_kept); ``indices`` are bar
+        positions into *index*.
+    """
+    values = np.atleast_2d(np.asarray(values))
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method {method!r}; expected one of {DECIMATION_METHODS}")
+    if method is None:
+        indices = np.broadcast_to(np.arange(values.shape[1]), values.shape).copy()
+    elif method == "minmax":
+        indices = minmax_indices(values, max(n_points // 2 - 1, 1))
+    else:
+        x = index.asi8 if isinstance(index, pd.DatetimeIndex) else np.arange(len(index))
+        indices = lttb_indices(x, values, n_points)
+    return indices, np.take_along_axis(values, indices, axis=1)
+
+
+def _plot_x(index: pd.Index) -> np.ndarray:
+    # Matplotlib takes datetime64 natively; tz-aware indexes are drawn in their own wall time.
+    if isinstance(index, pd.DatetimeIndex):
+        return index.tz_localize(None).to_numpy() if index.tz is not None else index.to_numpy()
+    return np.asarray(index)
+
+
+def draw_equity(
+    ax,
+    result: BacktestResult,
+    labels=None,
+    n_points: int = 1200,
+    method: str = "lttb",
+    title: str = "Equity - For strategies",
+    log_scale: bool = False,
+) -> None:
+    """Draw the decimated equity curves of *result* on a matplotlib Axes.
+
+    Args:
+        ax (matplotlib.axes.Axes): Target axes.
+        result (BacktestResult): E.g. ``Backtester.results``.
+        labels: Strategies to draw; all of them by default.
+        n_points (int): Points kept per curve, about one per horizontal pixel.
+        method (str): Decimation method passed to ``decimate``.
+        title (str): Axes title.
+        log_scale (bool): Logarithmic equity axis.
+    """
+    labels = list(result.labels) if labels is None else list(labels)
+    rows = [result.row(label) for label in labels]
+    index = result.index
+    indices, values = decimate(index, result.equity[rows], n_points, method)
+    x = _plot_x(index)
+    for label, bars, curve in zip(labels, indices, values):
+        ax.plot(x[bars], curve, label=label, linewidth=1)
+    ax.legend(loc="best")
+    ax.set_title(title)
+    ax.set_ylabel("Portfolio size ($)")
+    ax.set_xlabel("Date")
+    if log_scale:
+        ax.set_yscale("log")
+
+
+def equity_figure(
+    result: BacktestResult,
+    width: int = 1200,
+    height: int = 600,
+    dpi: int = 100,
+    points_per_pixel: float = 1.0,
+    **kwargs,
+):
+    """Build a matplotlib Figure of the equity curves in *result*.
+
+    Args:
+        result (BacktestResult): E.g. ``Backtester.results``.
+        width, height (int): Image size in pixels.
+        dpi (int): Dots per inch; only scales fonts and line widths.
+        points_per_pixel (float): Points kept per curve and horizontal pixel.
+        **kwargs: Passed to ``draw_equity`` (``labels``, ``method``, ``title``, ``log_scale``).
+
+    Returns:
+        matplotlib.figure.Figure: Attached to an Agg canvas, independent of pyplot.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+    draw_equity(ax, result, n_points=int(width * points_per_pixel), **kwargs)
+    figure.autofmt_xdate()
+    figure.tight_layout()
+    return figure
+
+
+def save_equity(result: BacktestResult, path: str, **kwargs) -> str:
+    """Render the equity curves of *result* to *path* without a display.
+
+    The format follows the extension (``.png``, ``.svg``, ``.pdf``...).
+    Keyword arguments go to ``equity_figure``. Returns *path*.
+    """
+    figure = equity_figure(result, **kwargs)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    figure.savefig(path)
+    return path
+
+
+def _save_one(args) -> str:
+    result, path, kwargs = args
+    return save_equity(result, path, **kwargs)
+
+
+def render_equity_batch(runs: dict, n_jobs: int = None, executor=None, **kwargs) -> list:
+    """Render many runs, e.g. every ticker of a sweep, to image files.
+
+    Args:
+        runs (dict): Maps output paths to BacktestResult instances.
+        n_jobs (int, optional): Worker processes (``-1`` for all cores);
+            ``None`` or ``1`` renders in this process.
+        executor (concurrent.futures.Executor, optional): Existing pool to use
+            instead of creating one.
+        **kwargs: Passed to ``equity_figure`` for every run.
+
+    Returns:
+        list: The written paths, in the order of *runs*.
+    """
+    tasks = [(result, path, kwargs) for path, result in runs.items()]
+    if executor is None and (n_jobs is None or n_jobs == 1 or len(tasks) <= 1):
+        return [_save_one(task) for task in tasks]
+    owns_executor = executor is None
+    if owns_executor:
+        workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)))
+    try:
+        return list(executor.map(_save_one, tasks))
+    finally:
+        if owns_executor:
+            executor.shutdown()
@@ -0,0 +1,436 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.engine.metrics import METRIC_COLUMNS, compute_metrics
+
+SCHEMES = ("static", "equal_risk", "inverse_vol", "mean_variance")
+
+# Cap on the (rebalances x weight vectors x assets) temporaries built for turnover.
+_TURNOVER_CHUNK = 1 << 22
+
+# Default cap on the (weight vectors x bars x assets) values simulated per Portfolio.evaluate pass.
+_EVALUATE_CHUNK = 1 << 22
+
+
+def rebalance_points(index: pd.Index, rebalance=None) -> np.ndarray:
+    """Bar positions at whose close the portfolio is rebalanced.
+
+    Args:
+        index (pandas.Index): Bar timestamps.
+        rebalance: ``None`` to never rebalance after the initial allocation,
+            an int to rebalance every *rebalance* bars, or a pandas period
+            alias such as ``"W"``, ``"M"`` or ``"Q"`` to rebalance on the last
+            bar of each calendar period.
+
+    Returns:
+        numpy.ndarray: Sorted positions, excluding the last bar.
+    """
+    length = len(index)
+    if rebalance is None or length < 2:
+        return np.empty(0, dtype=np.int64)
+    if isinstance(rebalance, (int, np.integer)):
+        if rebalance < 1:
+            raise ValueError("rebalance must be a positive number of bars")
+        return np.arange(rebalance - 1, length - 1, rebalance, dtype=np.int64)
+    if not isinstance(index, pd.DatetimeIndex):
+        raise TypeError("Calendar rebalancing needs a DatetimeIndex; pass a number of bars instead")
+    naive = index.tz_localize(None) if index.tz is not None else index
+    periods = naive.to_period(rebalance).asi8
+    return np.flatnonzero(periods[1:] != periods[:-1]).astype(np.int64)
+
+
+def weight_grid(n_assets: int, step: float = 0.1) -> np.ndarray:
+    """Every long-only, fully invested weight vector on a grid of *step*.
+
+    Returns:
+        numpy.ndarray: (n_vectors, n_assets) weights, e.g. 286 vectors for
+        four assets at ``step=0.1``.
+    """
+    units = int(round(1 / step))
+    if not np.isclose(units * step, 1):
+        raise ValueError("step must divide 1")
+    # Stars and bars: choosing n_assets - 1 dividers among units + n_assets - 1 slots.
+    dividers = np.array(list(itertools.combinations(range(units + n_assets - 1), n_assets - 1)), dtype=np.int64)
+    dividers = dividers.reshape(-1, n_assets - 1)
+    bounds = np.hstack([np.full((len(dividers), 1), -1), dividers, np.full((len(dividers), 1), units + n_assets - 1)])
+    return (np.diff(bounds, axis=1) - 1) / units
+
+
+def inverse_vol_weights(returns: np.ndarray) -> np.ndarray:
+    """Weights proportional to 1 / volatility of each column of *returns*."""
+    volatility = np.nanstd(returns, axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = np.where(volatility > 0, 1 / volatility, 0.0)
+    return _normalize(inverse)
+
+
+def equal_risk_weights(cov: np.ndarray, max_iter: int = 500, tol: float = 1e-10) -> np.ndarray:
+    """Equal-risk-contribution weights: every asset adds the same share of portfolio variance.
+
+    Solved by cyclical coordinate descent on ``w_i * (cov @ w)_i = 1``, then
+    rescaled to sum to one.
+    """
+    cov = np.asarray(cov, dtype=np.float64)
+    n = len(cov)
+    variances = np.diag(cov).copy()
+    if not (variances > 0).any():
+        return np.full(n, 1 / n)
+    variances[variances <= 0] = np.min(variances[variances > 0])
+    w = 1 / np.sqrt(variances)
+    for _ in range(max_iter):
+        previous = w.copy()
+        for i in range(n):
+            cross = cov[i] @ w - cov[i, i] * w[i]
+            w[i] = (-cross + np.sqrt(cross * cross + 4 * variances[i])) / (2 * variances[i])
+        if np.max(np.abs(w - previous)) <= tol * np.max(np.abs(w)):
+            break
+    return _normalize(w)
+
+
+def mean_variance_weights(mean: np.ndarray, cov: np.ndarray, risk_aversion: float = 1.0, max_iter: int = 1000) -> np.ndarray:
+    """Long-only, fully invested weights maximizing ``mean @ w - risk_aversion / 2 * w @ cov @ w``.
+
+    Solved by projected gradient ascent on the simplex.
+    """
+    mean = np.nan_to_num(np.asarray(mean, dtype=np.float64))
+    cov = np.nan_to_num(np.asarray(cov, dtype=np.float64))
+    n = len(mean)
+    largest = np.max(np.linalg.eigvalsh(cov)) if n else 0.0
+    step = 1 / max(risk_aversion * largest, 1e-12)
+    w = np.full(n, 1 / n)
+    for _ in range(max_iter):
+        updated = _project_simplex(w + step * (mean - risk_aversion * (cov @ w)))
+        if np.max(np.abs(updated - w)) <= 1e-12:
+            return updated
+        w = updated
+    return w
+
+
+def target_weights(
+    returns: np.ndarray,
+    points: np.ndarray,
+    scheme: str = "static",
+    weights=None,
+    lookback: int = 60,
+    risk_aversion: float = 1.0,
+) -> np.ndarray:
+    """Target weights for the initial allocation and every rebalance in *points*.
+
+    Args:
+        returns: (n_bars, n_assets) returns.
+        points: Rebalance positions from rebalance_points.
+        scheme (str): One of SCHEMES. ``"static"`` holds *weights* (a vector,
+            or an (n_vectors, n_assets) grid); the others are estimated at each
+            rebalance from the trailing *lookback* bars up to and including it.
+        risk_aversion (float): Variance penalty of ``"mean_variance"``.
+
+    Returns:
+        numpy.ndarray: (len(points) + 1, n_vectors, n_assets). Estimated schemes
+        give one vector per rebalance and start equal-weighted.
+    """
+    n_assets = returns.shape[1]
+    if scheme == "static":
+        if weights is None:
+            weights = np.full(n_assets, 1 / n_assets)
+        weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        if weights.shape[1] != n_assets:
+            raise ValueError(f"weights have {weights.shape[1]} columns for {n_assets} assets")
+        return np.broadcast_to(weights, (len(points) + 1,) + weights.shape)
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown weight scheme {scheme!r}; expected one of {SCHEMES}")
+
+    targets = np.empty((len(points) + 1, 1, n_assets))
+    targets[0] = 1 / n_assets
+    for k, point in enumerate(points, start=1):
+        window = returns[max(0, point + 1 - lookback):point + 1]
+        if len(window) < 2:
+            targets[k] = 1 / n_assets
+        elif scheme == "inverse_vol":
+            targets[k] = inverse_vol_weights(window)
+        else:
+            cov = np.atleast_2d(np.cov(np.nan_to_num(window), rowvar=False))
+            if scheme == "equal_risk":
+                targets[k] = equal_risk_weights(cov)
+            else:
+                targets[k] = mean_variance_weights(np.nanmean(window, axis=0), cov, risk_aversion)
+    return targets
+
+
+def simulate_portfolio(returns: np.ndarray, targets: np.ndarray, points: np.ndarray, fee: float = 0.0, threshold: float = None):
+    """Portfolio returns and turnover of every weight vector in *targets*.
+
+    The portfolio allocates to *targets[0]* before the first bar, lets the
+    holdings drift with the asset returns and is reset to *targets[k]* at the
+    close of ``points[k - 1]``. Weights summing below one leave the rest in
+    cash. Each rebalance (including the initial allocation) trades
+    ``sum(|target - drifted weights|)`` of the portfolio and pays *fee* on it,
+    charged on the first bar held, as the backtester charges trades.
+
+    Args:
+        returns: (n_bars, n_assets) returns; NaN counts as a flat bar.
+        targets: (len(points) + 1, n_vectors, n_assets) from target_weights.
+        threshold (float, optional): Also rebalance whenever any weight has
+            drifted more than this from its target.
+
+    Returns:
+        tuple: ``(portfolio_returns, turnover)``, each (n_vectors, n_bars).
+
+    Without a threshold every vector is evaluated at once: within each
+    rebalance period the portfolio value is the assets' growth since the
+    period start times the weights, i.e. one (bars x assets) @ (assets x
+    vectors) matrix product over the whole history for static weights.
+    Thresholds make rebalancing path dependent and are stepped bar by bar,
+    still across all vectors at once.
+    """
+    returns = np.nan_to_num(np.asarray(returns, dtype=np.float64))
+    targets = np.asarray(targets, dtype=np.float64)
+    if threshold is not None:
+        return _simulate_threshold(returns, targets, points, fee, threshold)
+
+    length = len(returns)
+    starts = np.concatenate(([0], np.asarray(points) + 1))
+    segment = np.zeros(length, dtype=np.int64)
+    segment[starts[1:]] = 1
+    np.cumsum(segment, out=segment)
+
+    # Growth of each asset since the start of its rebalance period.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_growth = np.cumsum(np.log1p(returns), axis=0)
+        offset = np.vstack([np.zeros((1, returns.shape[1])), log_growth[starts[1:] - 1]])
+        growth = np.exp(log_growth - offset[segment])
+
+    cash = 1 - targets.sum(axis=2)
+    if (targets == targets[0]).all():
+        value = growth @ targets[0].T + cash[0]
+    else:
+        value = np.empty((length, targets.shape[1]))
+        bounds = np.append(starts, length)
+        for k in range(len(starts)):
+            value[bounds[k]:bounds[k + 1]] = growth[bounds[k]:bounds[k + 1]] @ targets[k].T + cash[k]
+
+    previous = np.empty_like(value)
+    previous[1:] = value[:-1]
+    previous[starts] = 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        portfolio_returns = value / previous - 1
+
+    turnover = np.zeros_like(value)
+    turnover[0] = np.abs(targets[0]).sum(axis=1)
+    ends = starts[1:] - 1
+    rows = max(1, _TURNOVER_CHUNK // max(1, targets[0].size))
+    for first in range(0, len(ends), rows):
+        k = np.arange(first, min(first + rows, len(ends)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            drifted = targets[k] * growth[ends[k], None, :] / value[ends[k], :, None]
+        turnover[starts[k + 1]] = np.abs(targets[k + 1] - drifted).sum(axis=2)
+
+    portfolio_returns -= fee * turnover
+    return portfolio_returns.T, turnover.T
+
+
+def _simulate_threshold(returns, targets, points, fee, threshold):
+    length = len(returns)
+    scheduled = np.zeros(length, dtype=bool)
+    scheduled[points] = True
+
+    portfolio_returns = np.empty((targets.shape[1], length))
+    turnover = np.zeros((targets.shape[1], length))
+    k = 0
+    holdings = targets[0].copy()
+    cash = 1 - holdings.sum(axis=1)
+    turnover[:, 0] = np.abs(holdings).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for t in range(length):
+            holdings *= 1 + returns[t]
+            value = cash + holdings.sum(axis=1)
+            portfolio_returns[:, t] = value - 1 - fee * turnover[:, t]
+            holdings /= value[:, None]
+            cash /= value
+            if t + 1 == length:
+                break
+
+            if scheduled[t]:
+                k += 1
+                rebalance = np.ones(len(holdings), dtype=bool)
+            else:
+                rebalance = np.abs(holdings - targets[k]).max(axis=1) > threshold
+            if rebalance.any():
+                target = np.broadcast_to(targets[k], holdings.shape)[rebalance]
+                turnover[rebalance, t + 1] = np.abs(target - holdings[rebalance]).sum(axis=1)
+                holdings[rebalance] = target
+                cash[rebalance] = 1 - target.sum(axis=1)
+    return portfolio_returns, turnover
+
+
+def _normalize(weights: np.ndarray) -> np.ndarray:
+    total = weights.sum()
+    if not np.isfinite(total) or total <= 0:
+        return np.full(len(weights), 1 / len(weights))
+    return weights / total
+
+
+def _project_simplex(v: np.ndarray) -> np.ndarray:
+    """Euclidean projection of *v* onto ``{w >= 0, sum(w) = 1}``."""
+    u = np.sort(v)[::-1]
+    cumulative = np.cumsum(u) - 1
+    ranks = np.arange(1, len(v) + 1)
+    rho = np.flatnonzero(u - cumulative / ranks > 0)[-1]
+    return np.maximum(v - cumulative[rho] / (rho + 1), 0)
+
+
+class Portfolio:
+    """Allocation across return streams: strategies of a backtest, tickers, or both.
+
+    Args:
+        returns (pandas.DataFrame): Bars x assets returns, e.g. from_result or
+            from_prices. NaN is treated as a flat bar.
+        fee (float): Fee per unit of portfolio value traded at a rebalance.
+        initial_capital (float): Starting value of the equity curves.
+        periods_per_year (float): Bars per year used to annualize metrics.
+    """
+
+    def __init__(self, returns: pd.DataFrame, fee: float = 0.001, initial_capital: float = 10000.0, periods_per_year: float = 365) -> None:
+        self.returns = returns
+        self.fee = fee
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+
+    @classmethod
+    def from_result(cls, result, **kwargs) -> "Portfolio":
+        """Allocate across the strategies of a BacktestResult (their ``strategy_returns``)."""
+        return cls(result.field("strategy_returns"), **kwargs)
+
+    @classmethod
+    def from_prices(cls, prices, **kwargs) -> "Portfolio":
+        """Allocate across tickers held outright.
+
+        Args:
+            prices: Dict of ticker -> close Series or OHLCV frame, or a frame
+                of closes with one column per ticker. Only bars every ticker
+                has are kept.
+        """
+        if isinstance(prices, dict):
+            prices = pd.concat(
+                {ticker: frame['Close'] if isinstance(frame, pd.DataFrame) else frame for ticker, frame in prices.items()},
+                axis=1,
+                join="inner",
+            )
+        return cls(prices.pct_change().iloc[1:], **kwargs)
+
+    @property
+    def assets(self) -> list:
+        return list(self.returns.columns)
+
+    def target_weights(self, scheme: str = "static", weights=None, rebalance="M", lookback: int = 60, risk_aversion: float = 1.0) -> pd.DataFrame:
+        """Target weights set at the start and at each rebalance, indexed by the bar they are set after.
+
+        The initial allocation is labelled with the first bar. See the
+        module-level target_weights for the arguments.
+        """
+        points = rebalance_points(self.returns.index, rebalance)
+        targets = target_weights(self._values(), points, scheme, weights, lookback, risk_aversion)
+        if targets.shape[1] != 1:
+            raise ValueError("target_weights describes one portfolio; use evaluate() for a grid")
+        index = self.returns.index[np.concatenate(([0], points))]
+        return pd.DataFrame(targets[:, 0], index=index, columns=self.assets)
+
+    def run(
+        self,
+        scheme: str = "static",
+        weights=None,
+        rebalance="M",
+        threshold: float = None,
+        lookback: int = 60,
+        risk_aversion: float = 1.0,
+    ) -> pd.DataFrame:
+        """Simulate one allocation.
+
+        Args:
+            scheme (str): ``"static"`` (hold *weights*, equal weights when
+                omitted), ``"equal_risk"``, ``"inverse_vol"`` or
+                ``"mean_variance"``; estimated schemes use the trailing
+                *lookback* bars at every rebalance.
+            weights: Static weights, a sequence or a Series keyed by asset.
+            rebalance: Schedule; see rebalance_points.
+            threshold (float, optional): Also rebalance when a weight drifts
+                this far from its target.
+            risk_aversion (float): Variance penalty of ``"mean_variance"``.
+
+        Returns:
+            pandas.DataFrame: ``Returns`` (net of fees), ``Turnover`` and
+            ``Equity`` per bar.
+        """
+        portfolio_returns, turnover = self._simulate(scheme, weights, rebalance, threshold, lookback, risk_aversion)
+        if portfolio_returns.shape[0] != 1:
+            raise ValueError("run() simulates one portfolio; use evaluate() for a grid")
+        return pd.DataFrame(
+            {
+                "Returns": portfolio_returns[0],
+                "Turnover": turnover[0],
+                "Equity": self.initial_capital * np.cumprod(1 + portfolio_returns[0]),
+            },
+            index=self.returns.index,
+        )
+
+    def evaluate(self, grid=None, rebalance="M", threshold: float = None, step: float = 0.1, chunk_size: int = None) -> pd.DataFrame:
+        """Metrics of every static weight vector in *grid*, evaluated in one vectorized pass.
+
+        Args:
+            grid: (n_vectors, n_assets) weights, or a frame with one column per
+                asset. Defaults to weight_grid(n_assets, step).
+            rebalance, threshold: As in run.
+            chunk_size (int, optional): Vectors simulated per pass; bounds memory
+                at a few (chunk_size x n_bars x n_assets) arrays. By default sized
+                so each holds about 4M values.
+
+        Returns:
+            pandas.DataFrame: One row per vector: its weights followed by
+            METRIC_COLUMNS (turnover counts rebalancing trades).
+        """
+        if grid is None:
+            grid = weight_grid(len(self.assets), step)
+        elif isinstance(grid, pd.DataFrame):
+            grid = grid[self.assets].to_numpy(dtype=np.float64)
+        grid = np.atleast_2d(np.asarray(grid, dtype=np.float64))
+
+        values = self._values()
+        if chunk_size is None:
+            chunk_size = max(1, _EVALUATE_CHUNK // values.size)
+        points = rebalance_points(self.returns.index, rebalance)
+        metrics = np.empty((len(grid), len(METRIC_COLUMNS)))
+        for first in range(0, len(grid), chunk_size):
+            chunk = grid[first:first + chunk_size]
+            targets = target_weights(values, points, "static", chunk)
+            portfolio_returns, turnover = simulate_portfolio(values, targets, points, self.fee, threshold)
+            equity = np.cumprod(1 + portfolio_returns, axis=1)
+            equity *= self.initial_capital
+            metrics[first:first + len(chunk)] = compute_metrics(
+                equity, portfolio_returns, trades=turnover, index=self.returns.index, periods_per_year=self.periods_per_year
+            )
+        return pd.concat(
+            [pd.DataFrame(grid, columns=self.assets), pd.DataFrame(metrics, columns=METRIC_COLUMNS)], axis=1
+        )
+
+    def metrics(self, frame: pd.DataFrame) -> pd.Series:
+        """METRIC_COLUMNS of a frame returned by run."""
+        values = compute_metrics(
+            frame["Equity"].to_numpy(),
+            frame["Returns"].to_numpy(),
+            trades=frame["Turnover"].to_numpy(),
+            index=frame.index,
+            periods_per_year=self.periods_per_year,
+        )
+        return pd.Series(values[0], index=METRIC_COLUMNS)
+
+    def _values(self) -> np.ndarray:
+        return self.returns.to_numpy(dtype=np.float64)
+
+    def _simulate(self, scheme, weights, rebalance, threshold, lookback=60, risk_aversion=1.0):
+        if isinstance(weights, (pd.Series, dict)):
+            weights = pd.Series(weights).reindex(self.assets).fillna(0.0).to_numpy(dtype=np.float64)
+        values = self._values()
+        points = rebalance_points(self.returns.index, rebalance)
+        targets = target_weights(values, points, scheme, weights, lookback, risk_aversion)
+        return simulate_portfolio(values, targets, points, self.fee, threshold)
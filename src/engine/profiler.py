@@ -0,0 +1,267 @@
+import contextlib
+import json
+import time
+import tracemalloc
+
+
+class StageRecord:
+    """Measurements of one completed stage.
+
+    ``path`` is the tuple of enclosing stage names ending with this stage,
+    e.g. ``("run", "strategy:MeanReversionStrategy", "features")``.
+    ``peak_bytes`` is the peak traced allocation above what was allocated
+    when the stage started, or ``None`` when memory tracing is off.
+    """
+
+    __slots__ = ("path", "wall", "cpu", "peak_bytes", "rows")
+
+    def __init__(self, path, wall=0.0, cpu=0.0, peak_bytes=None, rows=None):
+        self.path = tuple(path)
+        self.wall = wall
+        self.cpu = cpu
+        self.peak_bytes = peak_bytes
+        self.rows = rows
+
+    @property
+    def name(self) -> str:
+        return self.path[-1]
+
+    def to_dict(self) -> dict:
+        return {
+            "path": list(self.path),
+            "wall": self.wall,
+            "cpu": self.cpu,
+            "peak_bytes": self.peak_bytes,
+            "rows": self.rows,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StageRecord":
+        return cls(data["path"], data["wall"], data["cpu"], data["peak_bytes"], data["rows"])
+
+
+class _OpenStage:
+    """Handle yielded by ``Profiler.stage``; set ``rows`` to record how much data the stage handled."""
+
+    __slots__ = ("path", "rows", "_wall", "_cpu", "_start_bytes", "_peak")
+
+    def __init__(self, path, rows):
+        self.path = path
+        self.rows = rows
+
+
+class Profiler:
+    """Records wall time, CPU time, peak memory and row counts per pipeline stage.
+
+    Stages are opened with the ``stage`` context manager and nest, so a run
+    produces a tree such as ``run > strategy:TrendFollowingStrategy > signals``.
+    Every completed stage is appended to ``records`` and passed to each hook.
+
+    Example:
+        >>> profiler = Profiler()
+        >>> backtester = Backtester(df, strategies, profiler=profiler)
+        >>> backtester.run()
+        >>> print(profiler.report().summary())
+        >>> profiler.report().to_json("profile.json")
+
+    Args:
+        memory (bool): Track peak allocations with tracemalloc. Tracing slows
+            allocation-heavy code noticeably, so turn it off for pure timing.
+        hooks (list, optional): Callables invoked with each completed StageRecord.
+    """
+
+    enabled = True
+
+    def __init__(self, memory: bool = True, hooks=None) -> None:
+        self.memory = memory
+        self.hooks = list(hooks or [])
+        self.records = []
+        self._stack = []
+        self._started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name: str, rows: int = None):
+        """Measure the enclosed block as stage *name*, nested under any open stage."""
+        parent = self._stack[-1].path if self._stack else ()
+        handle = _OpenStage(parent + (name,), rows)
+
+        if self.memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            current, peak = tracemalloc.get_traced_memory()
+            # The global peak is reset per stage, so hand what was seen so far to the open stages.
+            for open_stage in self._stack:
+                open_stage._peak = max(open_stage._peak, peak)
+            tracemalloc.reset_peak()
+            handle._start_bytes = current
+            handle._peak = current
+
+        self._stack.append(handle)
+        handle._wall = time.perf_counter()
+        handle._cpu = time.process_time()
+        try:
+            yield handle
+        finally:
+            wall = time.perf_counter() - handle._wall
+            cpu = time.process_time() - handle._cpu
+            self._stack.pop()
+
+            peak_bytes = None
+            if self.memory:
+                peak = max(handle._peak, tracemalloc.get_traced_memory()[1])
+                peak_bytes = peak - handle._start_bytes
+                for open_stage in self._stack:
+                    open_stage._peak = max(open_stage._peak, peak)
+                tracemalloc.reset_peak()
+                if not self._stack and self._started_tracing:
+                    tracemalloc.stop()
+                    self._started_tracing = False
+
+            self._add(StageRecord(handle.path, wall, cpu, peak_bytes, handle.rows))
+
+    @property
+    def current_path(self) -> tuple:
+        return self._stack[-1].path if self._stack else ()
+
+    def merge(self, records, parent=None) -> None:
+        """Add records measured elsewhere (e.g. in a worker process) under *parent*.
+
+        Args:
+            records: StageRecords or their ``to_dict()`` form.
+            parent (tuple, optional): Path to nest them under; defaults to the
+                currently open stage.
+        """
+        parent = self.current_path if parent is None else tuple(parent)
+        for record in records:
+            if isinstance(record, dict):
+                record = StageRecord.from_dict(record)
+            self._add(StageRecord(parent + record.path, record.wall, record.cpu, record.peak_bytes, record.rows))
+
+    def report(self) -> "ProfileReport":
+        return ProfileReport(self.records)
+
+    def reset(self) -> None:
+        self.records = []
+
+    def _add(self, record: StageRecord) -> None:
+        self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+
+class _NullStage:
+    __slots__ = ("rows",)
+
+    def __init__(self):
+        self.rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Profiler stand-in that measures nothing; the default everywhere."""
+
+    enabled = False
+    records = ()
+    current_path = ()
+
+    def stage(self, name: str, rows: int = None) -> _NullStage:
+        return _NullStage()
+
+    def merge(self, records, parent=None) -> None:
+        pass
+
+    def report(self) -> "ProfileReport":
+        return ProfileReport([])
+
+    def reset(self) -> None:
+        pass
+
+
+class ProfileReport:
+    """Per-stage totals of a profile, aggregated over repeated calls of the same stage path."""
+
+    def __init__(self, records) -> None:
+        self.stages = {}
+        for record in records:
+            stage = self.stages.get(record.path)
+            if stage is None:
+                stage = self.stages[record.path] = {
+                    "path": list(record.path),
+                    "calls": 0,
+                    "wall": 0.0,
+                    "cpu": 0.0,
+                    "peak_bytes": None,
+                    "rows": None,
+                }
+            stage["calls"] += 1
+            stage["wall"] += record.wall
+            stage["cpu"] += record.cpu
+            if record.peak_bytes is not None:
+                stage["peak_bytes"] = max(stage["peak_bytes"] or 0, record.peak_bytes)
+            if record.rows is not None:
+                stage["rows"] = (stage["rows"] or 0) + record.rows
+
+        # Stages complete child-first; order them parent-first, keeping first-seen order among siblings.
+        children = {}
+        for path in self.stages:
+            parent = path[:-1] if path[:-1] in self.stages else None
+            children.setdefault(parent, []).append(path)
+
+        ordered = {}
+
+        def visit(parent):
+            for path in children.get(parent, ()):
+                ordered[path] = self.stages[path]
+                visit(path)
+
+        visit(None)
+        self.stages = ordered
+
+        # Self time excludes time spent in child stages.
+        for path, stage in self.stages.items():
+            child_wall = sum(self.stages[child]["wall"] for child in children.get(path, ()))
+            stage["self_wall"] = max(stage["wall"] - child_wall, 0.0)
+
+    def to_dict(self) -> dict:
+        return {"stages": list(self.stages.values())}
+
+    def to_json(self, path: str = None, indent: int = 2) -> str:
+        """Return the report as JSON, also writing it to *path* when given."""
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def flame(self) -> str:
+        """Folded-stack lines (``run;strategy:X;features 1234``) weighted by self time in microseconds.
+
+        The output can be fed to flamegraph.pl or speedscope.
+        """
+        lines = []
+        for path, stage in self.stages.items():
+            weight = int(round(stage["self_wall"] * 1e6))
+            if weight > 0:
+                lines.append(f"{';'.join(path)} {weight}")
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        """Indented text tree with time, share of the parent stage, CPU, memory and rows."""
+        lines = [f"{'stage':<48}{'calls':>6}{'wall':>11}{'%':>7}{'cpu':>11}{'peak MB':>10}{'rows':>12}"]
+        for path, stage in self.stages.items():
+            parent = self.stages.get(path[:-1])
+            share = stage["wall"] / parent["wall"] * 100 if parent and parent["wall"] > 0 else 100.0
+            peak = "" if stage["peak_bytes"] is None else f"{stage['peak_bytes'] / 2 ** 20:.1f}"
+            rows = "" if stage["rows"] is None else f"{stage['rows']:,}"
+            label = "  " * (len(path) - 1) + path[-1]
+            lines.append(
+                f"{label:<48}{stage['calls']:>6}{stage['wall']:>10.4f}s{share:>6.1f}%"
+                f"{stage['cpu']:>10.4f}s{peak:>10}{rows:>12}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,172 @@
+import hashlib
+import inspect
+import logging
+import os
+import pickle
+import shutil
+import uuid
+
+import numpy as np
+import pandas as pd
+
+from src.engine.results import FIELDS, strategy_params
+
+logger = logging.getLogger(__name__)
+
+# Part of every key; bump when run_strategy's outputs change meaning.
+CACHE_VERSION = 1
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of *df*'s index, column names and values."""
+    digest = hashlib.blake2b(digest_size=16)
+    index = df.index
+    digest.update(np.ascontiguousarray(index.asi8 if hasattr(index, "asi8") else index.to_numpy()).tobytes())
+    digest.update(repr(list(df.columns)).encode())
+    for column in df.columns:
+        values = df[column].to_numpy()
+        if values.dtype == object:
+            digest.update(repr(values.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+def _class_source(cls) -> str:
+    # Editing a strategy's code invalidates its entries, not just changing its parameters.
+    sources = []
+    for klass in cls.__mro__[:-1]:
+        try:
+            sources.append(inspect.getsource(klass))
+        except (OSError, TypeError):
+            sources.append(f"{klass.__module__}.{klass.__qualname__}")
+    return "\n".join(sources)
+
+
+class ResultCache:
+    """On-disk cache of per-strategy backtest results, addressed by content.
+
+    An entry is keyed by a hash of the price frame, the strategy's class (name
+    and source) and constructor parameters, the fee, the initial capital, the
+    result dtype and the execution rules, so it is reused only when every
+    input of ``run_strategy`` is unchanged. Each entry is a directory holding
+    one ``.npy`` column per result field (``results.FIELDS``, over the bars of
+    the frame, before alignment) plus the strategy it ran (with any fitted
+    state), its activation point and its rule-based exits.
+
+    Entries are evicted in least-recently-used order once the cache exceeds
+    ``max_bytes``; reading an entry marks it as used.
+
+    Args:
+        cache_dir (str, optional): Directory holding the entries. Defaults to
+            ``data/.cache/results`` under the project root.
+        max_bytes (int): Size limit of the cache on disk.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 1 << 30) -> None:
+        if cache_dir is None:
+            base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+            cache_dir = os.path.join(base_dir, "data", ".cache", "results")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, fingerprint: str, strategy, fee: float, initial_capital: float, dtype=np.float64, execution=None) -> str:
+        """Key of *strategy* run over the frame with content hash *fingerprint*."""
+        cls = type(strategy)
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (
+            CACHE_VERSION,
+            fingerprint,
+            f"{cls.__module__}.{cls.__qualname__}",
+            _class_source(cls),
+            sorted(strategy_params(strategy).items()),
+            float(fee),
+            float(initial_capital),
+            np.dtype(dtype).str,
+            execution,
+        ):
+            digest.update(repr(part).encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Return ``(strategy, block, activation, exits)`` stored under *key*, or None."""
+        path = os.path.join(self.cache_dir, key)
+        try:
+            block = np.stack([np.load(os.path.join(path, f"{field}.npy")) for field in FIELDS])
+            with open(os.path.join(path, "state.pkl"), "rb") as f:
+                state = pickle.load(f)
+            os.utime(path)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError) as e:
+            if os.path.exists(path):
+                logger.warning("Discarding unreadable result cache entry %s: %s", key, e)
+                shutil.rmtree(path, ignore_errors=True)
+            self.misses += 1
+            return None
+        self.hits += 1
+        return state["strategy"], block, state["activation"], state["exits"]
+
+    def put(self, key: str, strategy, block: np.ndarray, activation, exits=None) -> None:
+        """Store one ``run_strategy`` result under *key*, then evict down to ``max_bytes``."""
+        path = os.path.join(self.cache_dir, key)
+        # Written aside and renamed into place, so readers never see a partial entry.
+        tmp_path = os.path.join(self.cache_dir, f".tmp-{uuid.uuid4().hex}")
+        os.makedirs(tmp_path)
+        try:
+            for field, values in zip(FIELDS, block):
+                np.save(os.path.join(tmp_path, f"{field}.npy"), values)
+            with open(os.path.join(tmp_path, "state.pkl"), "wb") as f:
+                pickle.dump({"strategy": strategy, "activation": activation, "exits": exits}, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(path):
+                shutil.rmtree(path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+        self.evict()
+
+    def evict(self) -> int:
+        """Drop least recently used entries until the cache fits ``max_bytes``; return how many."""
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+            removed += 1
+        if removed:
+            logger.debug("Evicted %d result cache entries", removed)
+        return removed
+
+    def size(self) -> int:
+        """Bytes used by the cache on disk."""
+        return sum(size for _, _, size in self._entries())
+
+    def clear(self) -> None:
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    def _entries(self) -> list:
+        """``(path, last used, bytes)`` of every complete entry."""
+        entries = []
+        try:
+            scan = list(os.scandir(self.cache_dir))
+        except FileNotFoundError:
+            return entries
+        for entry in scan:
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.path, entry.stat().st_mtime, size))
+            except FileNotFoundError:
+                continue
+        return entries
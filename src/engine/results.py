@@ -0,0 +1,169 @@
+import inspect
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+
+# Per-strategy result fields and the column prefix each had in the wide results frame.
+FIELDS = ("position", "trades", "strategy_returns", "equity")
+COLUMN_PREFIXES = {
+    "returns": "Returns",
+    "position": "Position",
+    "trades": "Trades",
+    "strategy_returns": "Strategy_Returns",
+    "equity": "Strategy_Equity",
+}
+
+
+def strategy_params(strategy) -> dict:
+    """Constructor arguments of *strategy*, read back from the attributes of the same name."""
+    params = {}
+    for name, param in inspect.signature(type(strategy).__init__).parameters.items():
+        if name == "self" or param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        if hasattr(strategy, name):
+            params[name] = getattr(strategy, name)
+    return params
+
+
+def strategy_labels(strategies) -> list:
+    """Return a unique label per strategy.
+
+    A strategy is labelled by its ``name`` attribute when set, otherwise by its
+    class name. Strategies sharing a label are told apart by the parameters
+    that differ between them, e.g. ``MeanReversionStrategy(short_window=10)``,
+    and identical configurations get a ``#n`` suffix.
+    """
+    labels = [getattr(strategy, "name", None) or type(strategy).__name__ for strategy in strategies]
+
+    groups = {}
+    for i, label in enumerate(labels):
+        groups.setdefault(label, []).append(i)
+
+    for label, members in groups.items():
+        if len(members) < 2:
+            continue
+        params = [strategy_params(strategies[i]) for i in members]
+        names = list(dict.fromkeys(name for p in params for name in p))
+        differing = [name for name in names if len({repr(p.get(name)) for p in params}) > 1]
+        if differing:
+            for i, p in zip(members, params):
+                labels[i] = f"{label}({', '.join(f'{name}={p.get(name)!r}' for name in differing)})"
+
+    counts = Counter(labels)
+    seen = Counter()
+    for i, label in enumerate(labels):
+        if counts[label] > 1:
+            seen[label] += 1
+            labels[i] = f"{label}#{seen[label]}"
+    return labels
+
+
+def _array_property(field: str) -> property:
+    def get(self) -> np.ndarray:
+        self._flush()
+        return self._arrays[field]
+
+    get.__doc__ = f"``{field}`` array; see BacktestResult."
+    return property(get)
+
+
+class BacktestResult:
+    """Aligned results of every strategy in a run, held as contiguous NumPy arrays.
+
+    ``position``, ``trades``, ``strategy_returns`` and ``equity`` are
+    (n_strategies, n_bars) arrays of ``dtype`` with one row per label;
+    ``returns`` holds the asset returns shared by every strategy, shape
+    (n_bars,). Labelled pandas objects are only built on request:
+    ``field(name)`` gives a bars x strategies frame of one field and
+    ``frame()`` the wide ``Strategy_Equity_<label>``-style layout.
+
+    Rows added with ``append`` are buffered and concatenated on the next read,
+    so appending a few bars at a time does not copy the history each time.
+    """
+
+    def __init__(self, index: pd.Index, labels, returns, position, trades, strategy_returns, equity) -> None:
+        self.labels = list(labels)
+        self._index = index
+        self._arrays = {
+            "returns": returns,
+            "position": position,
+            "trades": trades,
+            "strategy_returns": strategy_returns,
+            "equity": equity,
+        }
+        self._pending = []
+        self._frame = None
+
+    returns = _array_property("returns")
+    position = _array_property("position")
+    trades = _array_property("trades")
+    strategy_returns = _array_property("strategy_returns")
+    equity = _array_property("equity")
+
+    @property
+    def index(self) -> pd.Index:
+        self._flush()
+        return self._index
+
+    @property
+    def dtype(self) -> np.dtype:
+        return self._arrays["equity"].dtype
+
+    @property
+    def n_strategies(self) -> int:
+        return len(self.labels)
+
+    def __len__(self) -> int:
+        return len(self._index) + sum(len(pending[0]) for pending in self._pending)
+
+    def row(self, label: str) -> int:
+        """Row of *label* in the per-strategy arrays."""
+        return self.labels.index(label)
+
+    def append(self, index: pd.Index, returns, position, trades, strategy_returns, equity) -> None:
+        """Buffer new bars: *returns* has shape (n_new,), the other arrays (n_strategies, n_new)."""
+        dtype = self.dtype
+        self._pending.append((
+            index,
+            np.asarray(returns, dtype=dtype),
+            *(np.asarray(values, dtype=dtype) for values in (position, trades, strategy_returns, equity)),
+        ))
+        self._frame = None
+
+    def field(self, name: str) -> pd.DataFrame:
+        """One field as a bars x strategies DataFrame (a view of the array where possible)."""
+        values = getattr(self, name)
+        if values.ndim == 1:
+            return pd.DataFrame({label: values for label in self.labels}, index=self.index)
+        return pd.DataFrame(values.T, index=self.index, columns=self.labels, copy=False)
+
+    def frame(self) -> pd.DataFrame:
+        """Wide DataFrame with ``Returns_``, ``Position_``, ``Trades_``, ``Strategy_Returns_`` and
+        ``Strategy_Equity_<label>`` columns per strategy. Built once and cached until the next append."""
+        if self._frame is None:
+            self._flush()
+            self._frame = self.labelled(self._index, self.labels, self._arrays)
+        return self._frame
+
+    @staticmethod
+    def labelled(index: pd.Index, labels, arrays: dict) -> pd.DataFrame:
+        """Build the wide per-strategy frame from field arrays shaped like BacktestResult's."""
+        columns = {}
+        for row, label in enumerate(labels):
+            columns[f"{COLUMN_PREFIXES['returns']}_{label}"] = arrays["returns"]
+            for field in FIELDS:
+                columns[f"{COLUMN_PREFIXES[field]}_{label}"] = arrays[field][row]
+        return pd.DataFrame(columns, index=index)
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        self._index = self._index.append([block[0] for block in pending])
+        for position, field in enumerate(("returns",) + FIELDS, start=1):
+            axis = 0 if field == "returns" else 1
+            self._arrays[field] = np.concatenate(
+                [self._arrays[field]] + [block[position] for block in pending], axis=axis
+            )
@@ -0,0 +1,204 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.engine.execution import execute, exits_frame
+from src.engine.feature_store import FeatureStore
+from src.engine.profiler import NullProfiler, Profiler
+from src.engine.shared_frame import SharedFrame, attach, attached
+
+logger = logging.getLogger(__name__)
+
+
+def asset_returns(close: np.ndarray) -> np.ndarray:
+    """Simple returns of *close*, NaN on the first bar (``Series.pct_change``)."""
+    returns = np.empty(len(close))
+    returns[:1] = np.nan
+    np.divide(close[1:], close[:-1], out=returns[1:])
+    returns[1:] -= 1
+    return returns
+
+
+def run_strategy(
+    strategy,
+    df: pd.DataFrame,
+    fee: float,
+    initial_capital: float,
+    position: int,
+    total: int,
+    feature_store=None,
+    profiler=None,
+    dtype=np.float64,
+    out=None,
+    execution=None,
+):
+    """Run one strategy's feature -> signal -> returns/equity pipeline.
+
+    Returns the (possibly fitted) strategy, a (4, len(df)) array of *dtype*
+    holding its position, trades, strategy returns and equity (the rows of
+    ``results.FIELDS``) aligned to ``df.index``, its activation point as a
+    position in ``df`` (``None`` if it never produced a valid value), and the
+    exits made by *execution*'s rules (``None`` without an ExecutionConfig).
+    The array is written into *out* when given.
+
+    When given, *feature_store* must be bound to *df*; it is exposed to the
+    strategy only for the duration of the call. Each step is measured as a
+    stage of *profiler*.
+    """
+    profiler = profiler if profiler is not None else NullProfiler()
+    strategy_name = strategy.__class__.__name__
+    logger.info("--- Running Strategy %d/%d: %s ---", position + 1, total, strategy_name)
+    logger.debug("%s", strategy)
+
+    with profiler.stage(f"strategy:{strategy_name}", rows=len(df)):
+        strategy.feature_store = feature_store
+        try:
+            with profiler.stage("features", rows=len(df)):
+                strategy_df = strategy.generate_features(df.copy())
+            with profiler.stage("signals", rows=len(strategy_df)):
+                strategy_df = strategy.generate_signals(strategy_df)
+        finally:
+            strategy.feature_store = None
+
+        with profiler.stage("returns", rows=len(strategy_df)):
+            # Computed over the strategy's own rows (it may have dropped some), then placed on df's index.
+            signal = strategy_df['Signal'].to_numpy(dtype=np.float64)
+            exits = None
+            if execution is not None:
+                # Stops, sizing and holding limits need the per-bar state machine.
+                executed = execute(strategy_df, signal, fee, execution)
+                positions, trades, strategy_returns = (
+                    executed['position'], executed['trades'], executed['strategy_returns']
+                )
+                exits = exits_frame(strategy_df.index, executed)
+            else:
+                returns = asset_returns(strategy_df['Close'].to_numpy(dtype=np.float64))
+                positions = np.zeros(len(signal))
+                positions[1:] = np.nan_to_num(signal[:-1], nan=0.0)
+                trades = np.empty(len(signal))
+                trades[:1] = np.nan
+                trades[1:] = np.abs(np.diff(positions))
+
+                strategy_returns = returns * positions - fee * trades
+
+            missing = np.isnan(strategy_returns)
+            equity = np.nancumprod(1 + strategy_returns) * initial_capital
+            equity[missing] = np.nan
+
+            active = np.flatnonzero(positions != 0)
+            if not active.size:
+                active = np.flatnonzero(~missing)
+            activation = int(active[0]) if active.size else None
+
+            block = np.empty((4, len(df)), dtype=dtype) if out is None else out
+            if strategy_df.index.equals(df.index):
+                block[:] = (positions, trades, strategy_returns, equity)
+            else:
+                rows = df.index.get_indexer(strategy_df.index)
+                kept = rows >= 0
+                block[:] = np.nan
+                block[:, rows[kept]] = np.vstack((positions, trades, strategy_returns, equity))[:, kept]
+                activation = int(rows[activation]) if activation is not None and rows[activation] >= 0 else None
+
+    logger.info("--- Strategy %d completed ---", position + 1)
+    return strategy, block, activation, exits
+
+
+_worker_stores = {}
+
+
+def _run_shared(handle, strategy, fee, initial_capital, position, total, profile=None, dtype=np.float64, execution=None):
+    frame = attach(handle)
+    # One store per attached frame, shared by every task this worker runs on it;
+    # stores of detached frames go too, so their segments can be unmapped.
+    for name in set(_worker_stores) - set(attached()):
+        del _worker_stores[name]
+    store = _worker_stores.get(handle.name)
+    if store is None:
+        store = _worker_stores[handle.name] = FeatureStore().bind(frame)
+    # Worker stages are measured locally and shipped back for the parent to merge.
+    profiler = Profiler(memory=profile["memory"]) if profile else None
+    result = run_strategy(
+        strategy, frame, fee, initial_capital, position, total,
+        feature_store=store, profiler=profiler, dtype=dtype, execution=execution,
+    )
+    records = [record.to_dict() for record in profiler.records] if profiler else []
+    return result, records
+
+
+def run_strategies(
+    df: pd.DataFrame,
+    strategies,
+    fee: float,
+    initial_capital: float,
+    n_jobs=None,
+    executor=None,
+    feature_store=None,
+    profiler=None,
+    dtype=np.float64,
+    out=None,
+    execution=None,
+):
+    """Run every strategy and return their results in input order.
+
+    Args:
+        n_jobs (int, optional): Worker processes to use. ``None`` or ``1`` runs
+            serially in this process, ``-1`` uses every core.
+        executor (concurrent.futures.Executor, optional): Pool to submit to
+            instead of creating one; it is left running afterwards.
+        feature_store (FeatureStore, optional): Store bound to *df*, shared by
+            the strategies in serial mode. Workers keep their own store.
+        profiler (Profiler, optional): Receives a stage per strategy. Stages
+            measured in worker processes are merged back under the stage that
+            is open when this is called.
+        dtype: Float dtype of the returned result blocks.
+        out (numpy.ndarray, optional): (4, n_strategies, len(df)) buffer. Each
+            strategy's block is written into ``out[:, i]`` as soon as it is
+            done and returned as that view, so no per-strategy copies are kept.
+        execution (ExecutionConfig, optional): Order/risk rules applied to every
+            strategy's signals; see run_strategy.
+
+    In parallel mode the price frame is published once through shared
+    memory and each worker attaches to it instead of unpickling a copy.
+    """
+    total = len(strategies)
+    if executor is None and (n_jobs is None or n_jobs == 1 or total <= 1):
+        return [
+            run_strategy(
+                strategy, df, fee, initial_capital, i, total,
+                feature_store=feature_store, profiler=profiler, dtype=dtype,
+                out=None if out is None else out[:, i], execution=execution,
+            )
+            for i, strategy in enumerate(strategies)
+        ]
+
+    owns_executor = executor is None
+    if owns_executor:
+        workers = os.cpu_count() if n_jobs == -1 else n_jobs
+        executor = ProcessPoolExecutor(max_workers=min(workers, total))
+
+    profile = {"memory": getattr(profiler, "memory", False)} if profiler is not None and profiler.enabled else None
+    try:
+        with SharedFrame(df) as shared:
+            futures = [
+                executor.submit(
+                    _run_shared, shared.handle, strategy, fee, initial_capital, i, total, profile, dtype, execution
+                )
+                for i, strategy in enumerate(strategies)
+            ]
+            results = []
+            for i, future in enumerate(futures):
+                (strategy, block, activation, exits), records = future.result()
+                if records:
+                    profiler.merge(records)
+                if out is not None:
+                    out[:, i] = block
+                    block = out[:, i]
+                results.append((strategy, block, activation, exits))
+            return results
+    finally:
+        if owns_executor:
+            executor.shutdown()
@@ -0,0 +1,265 @@
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Segments a worker process keeps mapped at once; the least recently used is detached beyond this.
+MAX_ATTACHED = 16
+
+
+class SharedFrameHandle:
+    """Picklable description of a frame published with SharedFrame."""
+
+    def __init__(self, name, length, columns, index_kind, index_dtype, index_name):
+        self.name = name
+        self.length = length
+        self.columns = columns
+        self.index_kind = index_kind
+        self.index_dtype = index_dtype
+        self.index_name = index_name
+
+
+class SharedFrame:
+    """Numeric price frame copied once into a shared memory segment.
+
+    The segment holds the index as int64 followed by the values as a
+    row-major float64 block, so worker processes can rebuild the frame as
+    zero-copy NumPy views instead of unpickling it for every task.
+
+    Example:
+        >>> with SharedFrame(df) as shared:
+        ...     executor.map(work, [shared.handle] * n_tasks)
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        if isinstance(df.index, pd.DatetimeIndex):
+            index_kind = "datetime"
+            index_values = df.index.asi8
+        else:
+            index_kind = "numeric"
+            index_values = df.index.to_numpy()
+        index_dtype = str(df.index.dtype)
+
+        values = df.to_numpy(dtype=np.float64)
+        length, width = values.shape
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(8 * length * (width + 1), 1))
+        # Unlinks the segment if the publisher forgets to close it or exits
+        # with an exception; if the process is killed outright,
+        # multiprocessing's resource tracker removes it instead.
+        self._finalizer = weakref.finalize(self, _unlink, self._shm)
+        index_view, values_view = _views(self._shm, length, width)
+        index_view[:] = np.asarray(index_values).astype(np.int64)
+        values_view[:] = values
+        del index_view, values_view
+
+        self.nbytes = self._shm.size
+        self.handle = SharedFrameHandle(
+            self._shm.name, length, list(df.columns), index_kind, index_dtype, df.index.name
+        )
+
+    def close(self) -> None:
+        """Release and unlink the segment. Safe to call more than once."""
+        if self._shm is None:
+            return
+        self._finalizer()
+        self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SharedStore:
+    """Data plane for worker pools: frames published once into shared memory and reference counted.
+
+    Every published frame starts with one reference, held by the store until
+    ``unpublish``. ``track(key, future)`` takes another for a submitted task
+    and returns it when the future finishes for any reason, including a
+    worker crash, which fails the future with BrokenProcessPool; a crashed
+    worker therefore never pins a segment. The segment is unlinked as soon
+    as the count drops to zero, and ``close`` (or leaving the ``with`` block)
+    unlinks whatever is left.
+
+    Example:
+        >>> with SharedStore(loader.load_many(tickers)) as store:
+        ...     futures = [store.track(t, executor.submit(work, store.handle(t))) for t in tickers]
+    """
+
+    def __init__(self, frames: dict = None) -> None:
+        self._frames = {}
+        self._refs = {}
+        self._lock = threading.Lock()
+        for key, df in (frames or {}).items():
+            self.publish(key, df)
+
+    def publish(self, key, df: pd.DataFrame) -> SharedFrameHandle:
+        """Copy *df* into a new segment under *key* and return its handle."""
+        shared = SharedFrame(df)
+        with self._lock:
+            if key in self._frames:
+                shared.close()
+                raise ValueError(f"{key!r} is already published")
+            self._frames[key] = shared
+            self._refs[key] = 1
+        return shared.handle
+
+    def handle(self, key) -> SharedFrameHandle:
+        return self._frames[key].handle
+
+    def acquire(self, key) -> SharedFrameHandle:
+        """Take a reference to *key*'s segment; pair with ``release``."""
+        with self._lock:
+            if key not in self._frames:
+                raise KeyError(key)
+            self._refs[key] += 1
+            return self._frames[key].handle
+
+    def release(self, key) -> None:
+        """Drop a reference; the segment is unlinked when none are left."""
+        with self._lock:
+            self._refs[key] -= 1
+            if self._refs[key] > 0:
+                return
+            del self._refs[key]
+            shared = self._frames.pop(key)
+        shared.close()
+
+    def track(self, key, future):
+        """Hold a reference to *key* until *future* is done, then return *future*."""
+        self.acquire(key)
+        future.add_done_callback(lambda _: self.release(key))
+        return future
+
+    def unpublish(self, key) -> None:
+        """Drop the store's own reference: no new tasks, freed once running ones finish."""
+        self.release(key)
+
+    def refcount(self, key) -> int:
+        return self._refs.get(key, 0)
+
+    @property
+    def nbytes(self) -> int:
+        """Shared memory currently held by published frames."""
+        return sum(shared.nbytes for shared in list(self._frames.values()))
+
+    def keys(self) -> list:
+        return list(self._frames)
+
+    def __contains__(self, key) -> bool:
+        return key in self._frames
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def close(self) -> None:
+        """Unlink every segment, whatever its reference count."""
+        with self._lock:
+            frames, self._frames, self._refs = self._frames, {}, {}
+        for shared in frames.values():
+            shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# name -> (SharedMemory, frame) per worker process, least recently used first.
+_attached = OrderedDict()
+# Detached segments whose memory is still exported to live views; closed on a later attach.
+_closing = []
+
+
+def attach(handle: SharedFrameHandle) -> pd.DataFrame:
+    """Return the DataFrame published under *handle*, attaching at most once per process.
+
+    Its columns are zero-copy, read-only views of the segment. At most
+    MAX_ATTACHED segments stay mapped; older ones are detached, so a
+    long-lived worker does not keep every segment it has ever seen alive.
+    """
+    cached = _attached.get(handle.name)
+    if cached is not None:
+        _attached.move_to_end(handle.name)
+        return cached[1]
+
+    # Pool workers share the publisher's resource tracker, so attaching here
+    # does not hand ownership of the segment to the worker.
+    shm = shared_memory.SharedMemory(name=handle.name)
+    index_view, values_view = _views(shm, handle.length, len(handle.columns))
+    values_view.flags.writeable = False
+    if handle.index_kind == "datetime":
+        dtype = pd.api.types.pandas_dtype(handle.index_dtype)
+        tz = getattr(dtype, "tz", None)
+        unit = getattr(dtype, "unit", None) or np.datetime_data(dtype)[0]
+        index = pd.DatetimeIndex(index_view.view(f"M8[{unit}]"))
+        if tz is not None:
+            index = index.tz_localize("UTC").tz_convert(tz)
+    else:
+        index = pd.Index(index_view.astype(handle.index_dtype))
+    index.name = handle.index_name
+
+    frame = pd.DataFrame(values_view, index=index, columns=handle.columns, copy=False)
+    _attached[handle.name] = (shm, frame)
+    while len(_attached) > MAX_ATTACHED:
+        detach(next(iter(_attached)))
+    _close_detached()
+    return frame
+
+
+def detach(name: str = None) -> None:
+    """Unmap the segment *name* (every segment when None) from this process.
+
+    Frames returned by attach for it must not be used afterwards. A segment
+    still referenced elsewhere, e.g. by a cached feature store, is unmapped
+    once those references are gone.
+    """
+    names = list(_attached) if name is None else [name]
+    for key in names:
+        entry = _attached.pop(key, None)
+        if entry is not None:
+            _closing.append(entry[0])
+    _close_detached()
+
+
+def attached() -> list:
+    """Names of the segments mapped in this process."""
+    return list(_attached)
+
+
+def _close_detached() -> None:
+    pending = []
+    for shm in _closing:
+        try:
+            shm.close()
+        except BufferError:
+            pending.append(shm)
+    _closing[:] = pending
+
+
+def _unlink(shm) -> None:
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+    try:
+        shm.close()
+    except BufferError:
+        # A view in this process still exports the buffer; the name is gone
+        # already and the mapping is released with that view.
+        logger.debug("Shared segment %s unlinked while still mapped", shm.name)
+
+
+def _views(shm, length, width):
+    index_view = np.ndarray((length,), dtype=np.int64, buffer=shm.buf)
+    values_view = np.ndarray((length, width), dtype=np.float64, buffer=shm.buf, offset=8 * length)
+    return index_view, values_view
@@ -0,0 +1,166 @@
+import inspect
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from src.engine.metrics import METRIC_COLUMNS, compute_metrics
+
+
+def rolling_mean_block(values: np.ndarray, windows) -> np.ndarray:
+    """Return a (len(windows), len(values)) block of simple moving averages.
+
+    Every window is computed from a single cumulative sum, so the cost is
+    O(n_windows * n_bars) regardless of window length. Rows match
+    ``pd.Series(values).rolling(window).mean()``: the first ``window - 1``
+    entries are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    length = values.size
+
+    if np.isnan(values).any():
+        series = pd.Series(values)
+        return np.vstack([series.rolling(int(w)).mean().to_numpy() for w in windows])
+
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    upper = np.arange(1, length + 1)[None, :]
+    lower = upper - windows[:, None]
+    valid = lower >= 0
+
+    block = (csum[upper] - csum[np.clip(lower, 0, None)]) / windows[:, None]
+    block[~valid] = np.nan
+    return block
+
+
+def expand_grid(strategy_cls, param_grid: dict) -> list:
+    """Expand *param_grid* into full keyword dicts for *strategy_cls*.
+
+    Parameters missing from the grid fall back to the defaults declared on
+    ``strategy_cls.__init__``.
+    """
+    defaults = {
+        name: param.default
+        for name, param in inspect.signature(strategy_cls.__init__).parameters.items()
+        if name != "self" and param.default is not inspect.Parameter.empty
+    }
+    names = list(param_grid.keys())
+    combos = []
+    for values in itertools.product(*(param_grid[name] for name in names)):
+        combos.append({**defaults, **dict(zip(names, values))})
+    return combos
+
+
+def batch_signals(df: pd.DataFrame, strategy_cls, combos: list, feature_store=None) -> np.ndarray:
+    """Build an (n_combos, n_bars) int8 signal matrix for *combos*.
+
+    Strategies that declare ``sweep_windows`` and implement a
+    ``sweep_signals`` classmethod are evaluated in one batched pass over a
+    shared SMA block. Any other strategy falls back to instantiating each
+    combination and running its regular feature/signal pipeline, sharing
+    indicators through *feature_store* (bound to *df*) when given.
+    """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    window_params = getattr(strategy_cls, "sweep_windows", None)
+
+    if not window_params or not hasattr(strategy_cls, "sweep_signals"):
+        signals = np.empty((len(combos), close.size), dtype=np.int8)
+        for row, params in enumerate(combos):
+            strategy = strategy_cls(**params)
+            strategy.feature_store = feature_store
+            strategy_df = strategy.generate_features(df.copy())
+            strategy_df = strategy.generate_signals(strategy_df)
+            strategy.feature_store = None
+            signals[row] = strategy_df["Signal"].reindex(df.index).fillna(0).to_numpy()
+        return signals
+
+    windows = sorted({int(params[name]) for params in combos for name in window_params})
+    block = rolling_mean_block(close, windows)
+    row_of = {window: row for row, window in enumerate(windows)}
+
+    sma = {
+        name: block[[row_of[int(params[name])] for params in combos]]
+        for name in window_params
+    }
+    return strategy_cls.sweep_signals(close, sma).astype(np.int8)
+
+
+def evaluate_signals(
+    df: pd.DataFrame,
+    signals: np.ndarray,
+    fee: float,
+    initial_capital: float,
+    chunk_size: int = 256,
+) -> np.ndarray:
+    """Backtest every row of *signals* and return an (n_combos, len(METRIC_COLUMNS)) metrics array.
+
+    Mirrors ``Backtester.run`` followed by ``Backtester.get_metrics``: positions
+    are the signal shifted by one bar, every combination is aligned to the
+    latest activation point across the grid, equity is rebased to
+    *initial_capital* there, and the metrics come from ``compute_metrics``.
+    Combinations are processed *chunk_size* rows at a time to bound memory.
+    """
+    close = df["Close"].to_numpy(dtype=np.float64)
+    n_combos, length = signals.shape
+
+    returns = np.empty(length)
+    returns[0] = np.nan
+    returns[1:] = close[1:] / close[:-1] - 1
+
+    # Activation point per combination: first bar holding a position, else the
+    # first bar with a valid equity value (bar 1, as bar 0 has no return).
+    positions_active = signals[:, :-1] != 0
+    has_position = positions_active.any(axis=1)
+    first_active = np.where(has_position, positions_active.argmax(axis=1) + 1, min(1, length - 1))
+    start = int(first_active.max())
+
+    index = df.index[start:]
+    metrics = np.empty((n_combos, len(METRIC_COLUMNS)))
+
+    for lo in range(0, n_combos, chunk_size):
+        hi = min(lo + chunk_size, n_combos)
+        position = np.zeros((hi - lo, length))
+        position[:, 1:] = signals[lo:hi, :-1]
+
+        trades = np.empty_like(position)
+        trades[:, 0] = np.nan
+        trades[:, 1:] = np.abs(np.diff(position, axis=1))
+
+        strategy_returns = returns * position - fee * trades
+        growth = np.cumprod(1 + strategy_returns[:, start:], axis=1)
+        equity = growth / growth[:, :1] * initial_capital
+
+        metrics[lo:hi] = compute_metrics(equity, strategy_returns[:, start:], trades=trades[:, start:], index=index)
+
+    return metrics
+
+
+def run_sweep(
+    df: pd.DataFrame,
+    strategy_cls,
+    param_grid: dict,
+    fee: float,
+    initial_capital: float,
+    chunk_size: int = 256,
+    feature_store=None,
+) -> pd.DataFrame:
+    """Evaluate every combination in *param_grid* and return a metrics table.
+
+    The result is indexed by the swept parameters and holds the numeric
+    metric columns returned by ``Backtester.get_metrics``.
+    """
+    if not param_grid:
+        raise ValueError("param_grid must contain at least one parameter")
+
+    combos = expand_grid(strategy_cls, param_grid)
+    signals = batch_signals(df, strategy_cls, combos, feature_store=feature_store)
+    metrics = evaluate_signals(df, signals, fee, initial_capital, chunk_size=chunk_size)
+
+    names = list(param_grid.keys())
+    if len(names) == 1:
+        index = pd.Index([params[names[0]] for params in combos], name=names[0])
+    else:
+        index = pd.MultiIndex.from_tuples(
+            [tuple(params[name] for name in names) for params in combos], names=names
+        )
+    return pd.DataFrame(metrics, index=index, columns=METRIC_COLUMNS)
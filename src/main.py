@@ -1,5 +1,9 @@
+import logging
+
 from data_pipeline import DataLoader 
 from engine.backtester import Backtester
+from engine.metrics import format_metrics
+from engine.result_cache import ResultCache
 from strategies import (
     BuyAndHoldStrategy,
     MeanReversionStrategy,
@@ -9,6 +13,9 @@ from strategies import (
 )
 
 if __name__ == "__main__":
+    # Library modules log progress at INFO; the engine stays quiet unless logging is configured.
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     data = DataLoader()
     data = data.load_data("BTC")
     
@@ -25,15 +32,16 @@ if __name__ == "__main__":
                 XGBoostStrategy()
                 ], 
             initial_capital=10000.0, 
-            fee=0.001 
+            fee=0.001,
+            # Strategies whose data and parameters are unchanged since the last run are not recomputed.
+            result_cache=ResultCache(),
         )
         
         backtester.run()
         
         metrics = backtester.get_metrics()
         print("\n--- Metrics ---")
-        for key, value in metrics.items():
-            print(f"{key:<25}: {value}")
+        print(format_metrics(metrics).to_string())
             
         backtester.plot_equity()
         
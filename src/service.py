@@ -0,0 +1,118 @@
+"""Local HTTP service running backtests for the research UI.
+
+Usage:
+    python -m src.service [--host 127.0.0.1] [--port 5000] [--workers N] [--cors-origin URL ...]
+
+Endpoints:
+    POST /backtest        Run a job and wait for it (up to ``?timeout=`` seconds, 30 by default).
+                          Answers 200 with the finished job, or 202 with its id if still running.
+    POST /jobs            Queue a job and answer 202 with its id immediately.
+    GET  /jobs/<id>       Status of a job, with its result once done.
+    GET  /strategies      Strategies a job may use, with their parameters.
+    GET  /metrics         Job counts, cache hit rate, latency percentiles and throughput.
+    GET  /health          Liveness check.
+
+A job is a JSON object such as::
+
+    {"tickers": ["BTC"], "strategies": ["BuyAndHoldStrategy",
+     {"name": "MeanReversionStrategy", "params": {"short_window": 20}}], "fee": 0.001}
+
+See ``src.engine.jobs.normalize_job`` for every field.
+"""
+import argparse
+import logging
+import os
+
+from flask import Flask, jsonify, request
+from flask_cors import CORS
+
+from src.engine.jobs import JobManager, describe_strategies
+
+logger = logging.getLogger(__name__)
+
+# Browser origins allowed to call the API by default: pages served from this machine.
+LOCAL_ORIGINS = (r"^https?://(localhost|127\.0\.0\.1)(:\d+)?$",)
+
+
+def cors_origins() -> list:
+    """Allowed origins from ``BACKTEST_CORS_ORIGINS`` (comma-separated), else LOCAL_ORIGINS."""
+    configured = os.environ.get("BACKTEST_CORS_ORIGINS", "")
+    return [origin.strip() for origin in configured.split(",") if origin.strip()] or list(LOCAL_ORIGINS)
+
+
+def create_app(manager: JobManager = None, origins=None, **kwargs) -> Flask:
+    """Build the Flask app around *manager* (a new JobManager(**kwargs) when omitted).
+
+    *origins* lists the browser origins (URLs or regular expressions) allowed
+    to call the API cross-origin; see cors_origins for the default.
+    """
+    manager = manager if manager is not None else JobManager(**kwargs)
+    app = Flask(__name__)
+    app.config["JOB_MANAGER"] = manager
+    CORS(app, origins=list(origins) if origins is not None else cors_origins())
+
+    def job_response(record: dict):
+        code = {"done": 200, "failed": 500}.get(record["status"], 202)
+        return jsonify(record), code
+
+    @app.errorhandler(ValueError)
+    def invalid_job(error):
+        return jsonify({"error": str(error)}), 400
+
+    @app.post("/backtest")
+    def backtest():
+        timeout = request.args.get("timeout", 30.0, type=float)
+        return job_response(manager.run(request.get_json(force=True), timeout=timeout))
+
+    @app.post("/jobs")
+    def submit():
+        record = manager.submit(request.get_json(force=True))
+        return jsonify(record), 200 if record["status"] == "done" else 202
+
+    @app.get("/jobs/<job_id>")
+    def job(job_id):
+        try:
+            record = manager.status(job_id)
+        except KeyError:
+            return jsonify({"error": f"Unknown job {job_id}"}), 404
+        return job_response(record)
+
+    @app.get("/strategies")
+    def strategies():
+        return jsonify(describe_strategies())
+
+    @app.get("/metrics")
+    def metrics():
+        return jsonify(manager.stats())
+
+    @app.get("/health")
+    def health():
+        return jsonify({"status": "ok"})
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (all cores by default)")
+    parser.add_argument("--cache-size", type=int, default=256, help="Job results kept in memory")
+    parser.add_argument("--data-dir", default=None)
+    parser.add_argument("--cors-origin", action="append", dest="origins", default=None,
+                        help="Browser origin allowed to call the API; repeat for several "
+                             "(default: BACKTEST_CORS_ORIGINS, else localhost)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    manager = JobManager(max_workers=args.workers, cache_size=args.cache_size, data_dir=args.data_dir)
+    app = create_app(manager, origins=args.origins)
+    try:
+        # Requests are handled on threads; the backtests themselves run in the worker processes.
+        app.run(host=args.host, port=args.port, threaded=True)
+    finally:
+        manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
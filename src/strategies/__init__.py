@@ -1,10 +1,24 @@
+"""Strategy classes, imported on first access.
+
+Only BaseStrategy is loaded with the package; every other class is imported
+from its module the first time it is used (PEP 562), so a worker that only
+needs MeanReversionStrategy never loads xgboost, scipy or the C++ bridge.
+"""
+import importlib
+
 from .base_strategy import BaseStrategy
-from .trend_following import TrendFollowingStrategy
-from .mean_reversion import MeanReversionStrategy
-from .buy_and_hold import BuyAndHoldStrategy
-from .xgboost import XGBoostStrategy
-from .numpy_momentum import MomentumStrategy
-from .cpp_strategy import CppStrategy
+
+# Public name -> submodule defining it.
+_LAZY = {
+    "TrendFollowingStrategy": "trend_following",
+    "MeanReversionStrategy": "mean_reversion",
+    "BuyAndHoldStrategy": "buy_and_hold",
+    "XGBoostStrategy": "xgboost",
+    "MomentumStrategy": "numpy_momentum",
+    "CppStrategy": "cpp_strategy",
+    "PanelStrategy": "panel_strategy",
+    "CrossSectionalMomentum": "cross_sectional_momentum",
+}
 
 __all__ = [
 	"BaseStrategy",
@@ -13,5 +27,20 @@ __all__ = [
 	"BuyAndHoldStrategy",
 	"XGBoostStrategy",
 	"MomentumStrategy",
-	"CppStrategy"
+	"CppStrategy",
+	"PanelStrategy",
+	"CrossSectionalMomentum"
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        # Cached on the package so later lookups skip this hook.
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,5 +1,8 @@
+import logging
 import pandas as pd
 
+logger = logging.getLogger(__name__)
+
 class BaseStrategy:
     """Base template for a trading strategy.
 
@@ -10,6 +13,18 @@ class BaseStrategy:
 
     If a subclass does not implement these methods, the base implementations will raise NotImplementedError.
 
+    Shared indicators:
+        When run by a Backtester, ``feature_store`` is set to the run's FeatureStore. Use the
+        ``_sma``/``_std``/``_ema``/``_feature`` helpers instead of computing rolling windows
+        directly so strategies sharing a window compute it only once.
+
+    Incremental updates (optional):
+      - warm_up(df: pd.DataFrame) -> int: prime O(window) rolling state from the full history
+        and return the signal for its last bar.
+      - update_signal(bar: pd.Series) -> int: consume one new bar and return its signal.
+        Backtester.update uses these to append bars without recomputing the history; strategies
+        without them are recomputed in full on every update.
+
     Example:
         class MyStrategy(BaseStrategy):
             def generate_features(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -21,6 +36,11 @@ class BaseStrategy:
                 return df
     """
 
+    feature_store = None
+    # Label for this strategy's results. When unset, the backtester uses the class name and
+    # tells apart instances of the same class by their differing constructor parameters.
+    name = None
+
     def __init__(self) -> None:
         pass
     
@@ -33,8 +53,8 @@ class BaseStrategy:
         Returns:
             pandas.DataFrame: DataFrame with added feature columns.
         """
-        print("--- Creating Strategy Features ---")
-        print("--- Strategy Features Created ---")
+        logger.info("--- Creating Strategy Features ---")
+        logger.info("--- Strategy Features Created ---")
         raise NotImplementedError("Implement generate_features() before using it.")
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -46,9 +66,45 @@ class BaseStrategy:
         Returns:
             pandas.DataFrame: Signals indexed like df (e.g. -1, 0, 1) in a 'Signal' column
         """
-        print("--- Creating Strategy Signals ---")
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Creating Strategy Signals ---")
+        logger.info("--- Strategy Signals Created ---")
         raise NotImplementedError("Implement generate_signals() before using it.")
         
+    def warm_up(self, df: pd.DataFrame) -> int:
+        """Prime incremental state from df and return the signal for its last bar."""
+        raise NotImplementedError("Incremental updates are not supported by this strategy.")
+
+    def update_signal(self, bar: pd.Series) -> int:
+        """Consume one new bar (after warm_up) and return its signal."""
+        raise NotImplementedError("Incremental updates are not supported by this strategy.")
+
+    def _feature(self, df: pd.DataFrame, key: tuple, compute):
+        """Return ``compute()``, memoized in the backtester's FeatureStore when df is its frame.
+
+        Args:
+            df (pandas.DataFrame): Frame the feature is computed from.
+            key (tuple): (source column, operation, *params) identifying the feature.
+            compute (callable): Zero-argument function computing the feature from df.
+        """
+        store = self.feature_store
+        if store is not None and store.covers(df):
+            return store.get(key, compute)
+        return compute()
+
+    def _sma(self, df: pd.DataFrame, column: str, window: int) -> pd.Series:
+        return self._feature(df, (column, "sma", window), lambda: df[column].rolling(window).mean())
+
+    def _std(self, df: pd.DataFrame, column: str, window: int, ddof: int = 1) -> pd.Series:
+        return self._feature(
+            df, (column, "std", window, ddof), lambda: df[column].rolling(window).std(ddof=ddof)
+        )
+
+    def _ema(self, df: pd.DataFrame, column: str, span=None, com=None, adjust: bool = False) -> pd.Series:
+        return self._feature(
+            df,
+            (column, "ema", span, com, adjust),
+            lambda: df[column].ewm(span=span, com=com, adjust=adjust).mean(),
+        )
+
     def __str__(self):
         return "Template Strategy"
\ No newline at end of file
@@ -1,6 +1,11 @@
+import logging
 import pandas as pd
 
-class BuyAndHoldStrategy:
+from .base_strategy import BaseStrategy
+
+logger = logging.getLogger(__name__)
+
+class BuyAndHoldStrategy(BaseStrategy):
     """Base template for a trading strategy.
 
     Subclass and implement the required methods:
@@ -30,9 +35,9 @@ class BuyAndHoldStrategy:
         Returns:
             pandas.DataFrame: DataFrame with added feature columns.
         """
-        print("--- Creating Strategy Features ---")
+        logger.info("--- Creating Strategy Features ---")
         
-        print("--- Strategy Features Created ---")
+        logger.info("--- Strategy Features Created ---")
         return df
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -44,10 +49,16 @@ class BuyAndHoldStrategy:
         Returns:
             pandas.DataFrame: Signals indexed like df (e.g. -1, 0, 1) in a 'Signal' column
         """
-        print("--- Creating Strategy Signals ---")
+        logger.info("--- Creating Strategy Signals ---")
         df['Signal'] = 1
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Strategy Signals Created ---")
         return df
+
+    def warm_up(self, df: pd.DataFrame) -> int:
+        return 1
+
+    def update_signal(self, bar: pd.Series) -> int:
+        return 1
         
     def __str__(self):
         return "Buy And Hold Strategy"
\ No newline at end of file
@@ -1,14 +1,21 @@
+import logging
 import pandas as pd
 import numpy as np
 from src.strategies import BaseStrategy
+from src.strategies.rolling_state import WilderRSI
 try:
     from src.cpp import bridge
 except ImportError:
     bridge = None
 
+logger = logging.getLogger(__name__)
+
 class CppStrategy(BaseStrategy):
     """
     A strategy that uses C++ accelerated indicators.
+
+    The bridge builds the library on first use and computes the same
+    indicators with NumPy when no compiler is available (see bridge.set_backend).
     """
     def __init__(self, rsi_window=14, ma_window=50, vol_window=20):
         super().__init__()
@@ -17,32 +24,40 @@ class CppStrategy(BaseStrategy):
         self.vol_window = vol_window
 
     def generate_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        print("--- Creating C++ Strategy Features ---")
-
-        bridge.load_library()
+        logger.info("--- Creating C++ Strategy Features ---")
 
         close_prices = df['Close'].values
 
         # 1. Calculate SMA using C++
-        df['SMA_Cpp'] = bridge.calculate_sma(close_prices, self.ma_window)
+        df['SMA_Cpp'] = self._feature(
+            df, ('Close', 'cpp_sma', self.ma_window), lambda: bridge.calculate_sma(close_prices, self.ma_window)
+        )
 
         # 2. Calculate EMA using C++ (using same window for demo)
-        df['EMA_Cpp'] = bridge.calculate_ema(close_prices, self.ma_window)
+        df['EMA_Cpp'] = self._feature(
+            df, ('Close', 'cpp_ema', self.ma_window), lambda: bridge.calculate_ema(close_prices, self.ma_window)
+        )
 
         # 3. Calculate RSI using C++
-        df['RSI_Cpp'] = bridge.calculate_rsi(close_prices, self.rsi_window)
+        df['RSI_Cpp'] = self._feature(
+            df, ('Close', 'cpp_rsi', self.rsi_window), lambda: bridge.calculate_rsi(close_prices, self.rsi_window)
+        )
 
         # 4. Calculate Volatility (StdDev) using C++
-        df['Vol_Cpp'] = bridge.calculate_stddev(close_prices, self.vol_window)
+        df['Vol_Cpp'] = self._feature(
+            df, ('Close', 'cpp_stddev', self.vol_window), lambda: bridge.calculate_stddev(close_prices, self.vol_window)
+        )
 
         # 5. Calculate Max Drawdown (Running) using C++
-        df['DD_Cpp'] = bridge.calculate_max_drawdown(close_prices)
+        df['DD_Cpp'] = self._feature(
+            df, ('Close', 'cpp_max_drawdown'), lambda: bridge.calculate_max_drawdown(close_prices)
+        )
 
-        print("--- C++ Strategy Features Created ---")
+        logger.info("--- C++ Strategy Features Created ---")
         return df
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        print("--- Creating C++ Strategy Signals ---")
+        logger.info("--- Creating C++ Strategy Signals ---")
 
         df['Signal'] = 0
 
@@ -55,8 +70,24 @@ class CppStrategy(BaseStrategy):
         # Filter out NaN signals (from beginning of data)
         df['Signal'] = df['Signal'].fillna(0)
 
-        print("--- C++ Strategy Signals Created ---")
+        logger.info("--- C++ Strategy Signals Created ---")
         return df
 
+    def warm_up(self, df: pd.DataFrame) -> int:
+        self._rsi = WilderRSI(self.rsi_window).prime(df['Close'].to_numpy())
+        return self._incremental_signal()
+
+    def update_signal(self, bar: pd.Series) -> int:
+        self._rsi.update(bar['Close'])
+        return self._incremental_signal()
+
+    def _incremental_signal(self) -> int:
+        rsi = self._rsi.value
+        if rsi < 30:
+            return 1
+        if rsi > 70:
+            return -1
+        return 0
+
     def __str__(self):
         return f"CppStrategy(RSI={self.rsi_window}, MA={self.ma_window})"
@@ -0,0 +1,55 @@
+import logging
+
+import numpy as np
+
+from src.engine.panel import long_short_baskets
+from .panel_strategy import PanelStrategy
+
+logger = logging.getLogger(__name__)
+
+
+class CrossSectionalMomentum(PanelStrategy):
+    """Long the recent winners and short the recent losers of a universe.
+
+    Every *rebalance* bars, tickers are ranked by their return from *lookback*
+    bars ago to *skip* bars ago (skipping the most recent bars avoids
+    short-term reversal). The top *quantile* is bought and the bottom
+    *quantile* sold short in equal weights, and the baskets are held until the
+    next rebalance. A ticker is dropped from its basket on bars without a price.
+    """
+
+    def __init__(self, lookback: int = 252, skip: int = 21, quantile: float = 0.1, rebalance: int = 21, long_only: bool = False) -> None:
+        if rebalance < 1:
+            raise ValueError("rebalance must be at least 1")
+        if not 0 <= skip < lookback:
+            raise ValueError("skip must be in [0, lookback)")
+        self.lookback = int(lookback)
+        self.skip = int(skip)
+        self.quantile = float(quantile)
+        self.rebalance = int(rebalance)
+        self.long_only = bool(long_only)
+
+    def generate_weights(self, panel) -> np.ndarray:
+        logger.info("--- Ranking %d tickers ---", panel.n_tickers)
+        points = np.arange(self.lookback, panel.n_bars, self.rebalance)
+        weights = np.zeros((panel.n_tickers, panel.n_bars))
+        if not points.size:
+            return weights
+
+        # Scores are only needed on rebalance bars, so only those columns are read.
+        valid = panel.valid[:, points] & panel.valid[:, points - self.skip] & panel.valid[:, points - self.lookback]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = panel.close[:, points - self.skip] / panel.close[:, points - self.lookback] - 1
+        baskets = long_short_baskets(scores, valid, self.quantile, self.long_only)
+
+        held = np.searchsorted(points, np.arange(panel.n_bars), side="right") - 1
+        active = held >= 0
+        weights[:, active] = baskets[:, held[active]]
+        weights[~panel.valid] = 0
+        return weights
+
+    def __str__(self) -> str:
+        return (
+            f"Cross-Sectional Momentum (lookback={self.lookback}, skip={self.skip}, "
+            f"quantile={self.quantile}, rebalance={self.rebalance})"
+        )
@@ -1,6 +1,11 @@
+import logging
+import numpy as np
 import pandas as pd
 
 from .base_strategy import BaseStrategy
+from .rolling_state import RollingMean
+
+logger = logging.getLogger(__name__)
 
 class MeanReversionStrategy(BaseStrategy):
     """
@@ -42,29 +47,58 @@ class MeanReversionStrategy(BaseStrategy):
         >>> strategy = MeanReversion(short_window=20, long_window=50)
         >>> df = strategy.generate_features(df)   # adds SMA_20 and SMA_50
         >>> df = strategy.generate_signals(df)    # adds/updates 'Signal' column
+    Parameter sweeps:
+        sweep_windows lists the SMA window parameters; Backtester.sweep computes each distinct
+        window once and calls sweep_signals with the batched SMA blocks.
     """
 
+    sweep_windows = ("short_window", "long_window")
 
     def __init__(self, short_window=30, long_window=100):
         self.short_window = short_window
         self.long_window = long_window
         
     def generate_features(self, df) -> pd.DataFrame:
-        print("--- Creating Strategy Features ---")
-        df[f'SMA_{self.short_window}'] = df['Close'].rolling(self.short_window).mean()
-        df[f'SMA_{self.long_window}'] = df['Close'].rolling(self.long_window).mean()
+        logger.info("--- Creating Strategy Features ---")
+        df[f'SMA_{self.short_window}'] = self._sma(df, 'Close', self.short_window)
+        df[f'SMA_{self.long_window}'] = self._sma(df, 'Close', self.long_window)
         
-        print("--- Strategy Features Created ---")
+        logger.info("--- Strategy Features Created ---")
         return df
     
     def generate_signals(self, df) -> pd.DataFrame:
-        print("--- Creating Strategy Signals ---")
+        logger.info("--- Creating Strategy Signals ---")
         df['Signal'] = 0
         df.loc[df['Close'] < df[f'SMA_{self.long_window}'], 'Signal'] = 1
         df.loc[df['Close'] > df[f'SMA_{self.short_window}'], 'Signal'] = -1
         
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Strategy Signals Created ---")
         return df
+
+    @classmethod
+    def sweep_signals(cls, close: np.ndarray, sma: dict) -> np.ndarray:
+        # Same precedence as generate_signals: the short-SMA sell rule overrides the buy rule.
+        short, long = sma["short_window"], sma["long_window"]
+        return np.where(close > short, -1, np.where(close < long, 1, 0))
+    
+    def warm_up(self, df: pd.DataFrame) -> int:
+        self._short_sma = RollingMean(self.short_window).prime(df['Close'])
+        self._long_sma = RollingMean(self.long_window).prime(df['Close'])
+        return self._incremental_signal(df['Close'].iloc[-1])
+
+    def update_signal(self, bar: pd.Series) -> int:
+        close = bar['Close']
+        self._short_sma.update(close)
+        self._long_sma.update(close)
+        return self._incremental_signal(close)
+
+    def _incremental_signal(self, close: float) -> int:
+        signal = 0
+        if close < self._long_sma.value:
+            signal = 1
+        if close > self._short_sma.value:
+            signal = -1
+        return signal
     
     def __str__(self):
         return (
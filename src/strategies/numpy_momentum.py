@@ -1,7 +1,10 @@
+import logging
 import numpy as np
 import pandas as pd
-from scipy.signal import lfilter
 from .base_strategy import BaseStrategy
+from .rolling_state import RollingMean, RollingStd
+
+logger = logging.getLogger(__name__)
 
 
 class MomentumStrategy(BaseStrategy):
@@ -27,7 +30,7 @@ class MomentumStrategy(BaseStrategy):
         return window
 
     def generate_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        print("--- Creating Strategy Features ---")
+        logger.info("--- Creating Strategy Features ---")
 
         price_series = df["Close"].astype(float).replace([np.inf, -np.inf], np.nan).ffill().bfill()
         prices = price_series.to_numpy()
@@ -40,6 +43,9 @@ class MomentumStrategy(BaseStrategy):
         if prices.size < 3:
             smoothed = np.zeros_like(log_returns)
         else:
+            # scipy is imported on first use; it is slow to import and only this path needs it.
+            from scipy.signal import lfilter
+
             kernel = np.ones(window, dtype=float) / window
             smoothed = lfilter(kernel, [1.0], log_returns)
             smoothed[: window - 1] = np.nan
@@ -51,11 +57,11 @@ class MomentumStrategy(BaseStrategy):
         df["SmoothedReturn"] = smoothed
         df["Momentum"] = np.nan_to_num(momentum, nan=0.0, posinf=0.0, neginf=0.0)
 
-        print("--- Strategy Features Created ---")
+        logger.info("--- Strategy Features Created ---")
         return df
 
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
-        print("--- Creating Strategy Signals ---")
+        logger.info("--- Creating Strategy Signals ---")
         if "Momentum" not in df:
             raise KeyError("Missing Momentum column; call generate_features first")
 
@@ -67,8 +73,41 @@ class MomentumStrategy(BaseStrategy):
         df["SignalStrength"] = momentum
         df["Signal"] = signal
 
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Strategy Signals Created ---")
         return df
 
+    def warm_up(self, df: pd.DataFrame) -> int:
+        price_series = df["Close"].astype(float).replace([np.inf, -np.inf], np.nan).ffill().bfill()
+        log_prices = np.log(np.clip(price_series.to_numpy(), a_min=1e-8, a_max=None))
+        log_returns = np.diff(log_prices, prepend=log_prices[0])
+
+        # The moving-average filter over log returns equals a rolling mean once the window is full.
+        window = self._resolve_window(log_prices.size)
+        self._smoothed = RollingMean(window).prime(log_returns)
+        self._volatility = RollingStd(window, ddof=0).prime(log_returns)
+        self._last_log_price = log_prices[-1]
+        return self._incremental_signal()
+
+    def update_signal(self, bar: pd.Series) -> int:
+        price = float(bar["Close"])
+        # Non-finite prices are forward-filled, as in generate_features.
+        log_price = np.log(max(price, 1e-8)) if np.isfinite(price) else self._last_log_price
+        log_return = log_price - self._last_log_price
+        self._last_log_price = log_price
+
+        self._smoothed.update(log_return)
+        self._volatility.update(log_return)
+        return self._incremental_signal()
+
+    def _incremental_signal(self) -> int:
+        momentum = self._smoothed.value / (self._volatility.value + 1e-4)
+        if not np.isfinite(momentum):
+            return 0
+        if momentum > self.threshold:
+            return 1
+        if momentum < -self.threshold:
+            return -1
+        return 0
+
     def __str__(self) -> str:
         return f"Momentum Strategy (window={self.window}, poly={self.poly}, threshold={self.threshold})"
@@ -0,0 +1,33 @@
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class PanelStrategy:
+    """Base template for a strategy trading a whole universe at once.
+
+    Where BaseStrategy sees one ticker's DataFrame, a panel strategy receives a
+    ``src.engine.panel.Panel``: (n_tickers, n_bars) price arrays on a common
+    calendar with a validity mask. It returns target weights for every ticker
+    and bar, built with vectorized NumPy (see the ranking, z-score and basket
+    helpers in ``src.engine.panel``) rather than a loop over tickers.
+
+    Subclass and implement:
+      - generate_weights(panel: Panel) -> numpy.ndarray: (n_tickers, n_bars) weights
+        decided at each bar's close, as fractions of capital (negative for shorts).
+        They are held over the next bar, like BaseStrategy's 'Signal'. NaN counts as 0.
+
+    Run with ``src.engine.panel_backtester.PanelBacktester``.
+    """
+
+    # Label for this strategy's results; the class name (plus differing parameters) when unset.
+    name = None
+
+    def generate_weights(self, panel) -> np.ndarray:
+        """Return (n_tickers, n_bars) target weights for *panel*."""
+        raise NotImplementedError("Implement generate_weights() before using it.")
+
+    def __str__(self):
+        return "Template Panel Strategy"
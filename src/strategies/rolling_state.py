@@ -0,0 +1,146 @@
+import math
+from collections import deque
+
+
+class RollingMean:
+    """O(window) running mean matching ``Series.rolling(window).mean()``."""
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self._values = deque(maxlen=self.window)
+        self._sum = 0.0
+
+    def prime(self, values) -> "RollingMean":
+        for value in list(values)[-self.window:]:
+            self.update(value)
+        return self
+
+    def update(self, value: float) -> float:
+        if len(self._values) == self.window:
+            self._sum -= self._values[0]
+        self._values.append(float(value))
+        self._sum += float(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self._values) < self.window:
+            return math.nan
+        return self._sum / self.window
+
+
+class RollingStd:
+    """O(window) running standard deviation matching ``Series.rolling(window).std(ddof=ddof)``.
+
+    Uses the same sliding Welford update as the C++ kernel: the mean and the
+    sum of squared deviations are adjusted as values enter and leave.
+    """
+
+    def __init__(self, window: int, ddof: int = 1) -> None:
+        self.window = int(window)
+        self.ddof = ddof
+        self._values = deque(maxlen=self.window)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def prime(self, values) -> "RollingStd":
+        for value in list(values)[-self.window:]:
+            self.update(value)
+        return self
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        if len(self._values) == self.window:
+            leaving = self._values[0]
+            new_mean = self._mean + (value - leaving) / self.window
+            self._m2 += (value - leaving) * (value - new_mean + leaving - self._mean)
+            self._mean = new_mean
+        else:
+            count = len(self._values) + 1
+            delta = value - self._mean
+            self._mean += delta / count
+            self._m2 += delta * (value - self._mean)
+        self._values.append(value)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if len(self._values) < self.window or self.window - self.ddof <= 0:
+            return math.nan
+        return math.sqrt(max(self._m2, 0.0) / (self.window - self.ddof))
+
+
+class EWMState:
+    """Exponentially weighted mean matching ``Series.ewm(alpha=..., adjust=False).mean()``.
+
+    NaN inputs are skipped; the first valid input seeds the average.
+    """
+
+    def __init__(self, alpha: float, value: float = math.nan) -> None:
+        self.alpha = alpha
+        self.value = value
+
+    @classmethod
+    def from_span(cls, span: float, value: float = math.nan) -> "EWMState":
+        return cls(2.0 / (span + 1.0), value)
+
+    @classmethod
+    def from_com(cls, com: float, value: float = math.nan) -> "EWMState":
+        return cls(1.0 / (com + 1.0), value)
+
+    def update(self, value: float) -> float:
+        if math.isnan(value):
+            return self.value
+        if math.isnan(self.value):
+            self.value = float(value)
+        else:
+            self.value = (1.0 - self.alpha) * self.value + self.alpha * value
+        return self.value
+
+
+class WilderRSI:
+    """Incremental RSI matching ``calculate_rsi`` in analytics.cpp.
+
+    The first ``window`` changes are averaged, after which gains and losses
+    follow Wilder's smoothing.
+    """
+
+    def __init__(self, window: int) -> None:
+        self.window = int(window)
+        self._previous = None
+        self._changes = 0
+        self._avg_gain = 0.0
+        self._avg_loss = 0.0
+
+    def prime(self, values) -> "WilderRSI":
+        for value in values:
+            self.update(value)
+        return self
+
+    def update(self, value: float) -> float:
+        value = float(value)
+        if self._previous is not None:
+            change = value - self._previous
+            gain = change if change > 0 else 0.0
+            loss = 0.0 if change > 0 else -change
+            self._changes += 1
+            if self._changes <= self.window:
+                # Accumulate sums first, as the C++ kernel does, then average once.
+                self._avg_gain += gain
+                self._avg_loss += loss
+                if self._changes == self.window:
+                    self._avg_gain /= self.window
+                    self._avg_loss /= self.window
+            else:
+                self._avg_gain = (self._avg_gain * (self.window - 1) + gain) / self.window
+                self._avg_loss = (self._avg_loss * (self.window - 1) + loss) / self.window
+        self._previous = value
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self._changes < self.window:
+            return math.nan
+        if self._avg_loss == 0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
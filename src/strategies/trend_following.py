@@ -1,5 +1,10 @@
+import logging
+import numpy as np
 import pandas as pd
 from .base_strategy import BaseStrategy
+from .rolling_state import RollingMean
+
+logger = logging.getLogger(__name__)
 
 class TrendFollowingStrategy(BaseStrategy):
     """Base template for a trading strategy.
@@ -22,6 +27,8 @@ class TrendFollowingStrategy(BaseStrategy):
                 return df
     """
 
+    sweep_windows = ("short_window", "long_window")
+
     def __init__(self,short_window=20, long_window=30):
         self.short_window = short_window
         self.long_window = long_window
@@ -35,11 +42,11 @@ class TrendFollowingStrategy(BaseStrategy):
         Returns:
             pandas.DataFrame: DataFrame with added feature columns.
         """
-        print("--- Creating Strategy Features ---")
-        df[f'SMA_{self.short_window}'] = df['Close'].rolling(self.short_window).mean()
-        df[f'SMA_{self.long_window}'] = df['Close'].rolling(self.long_window).mean()
+        logger.info("--- Creating Strategy Features ---")
+        df[f'SMA_{self.short_window}'] = self._sma(df, 'Close', self.short_window)
+        df[f'SMA_{self.long_window}'] = self._sma(df, 'Close', self.long_window)
         
-        print("--- Strategy Features Created ---")
+        logger.info("--- Strategy Features Created ---")
         
         return df
 
@@ -52,15 +59,47 @@ class TrendFollowingStrategy(BaseStrategy):
         Returns:
             pandas.DataFrame: Signals indexed like df (e.g. -1, 0, 1) in a 'Signal' column
         """
-        print("--- Creating Strategy Signals ---")
+        logger.info("--- Creating Strategy Signals ---")
         df['Signal'] = 0
         
         df['Signal'].loc[df[f'SMA_{self.short_window}'] > df[f'SMA_{self.long_window}']] = 1
         df['Signal'].loc[df[f'SMA_{self.short_window}'] < df[f'SMA_{self.long_window}']] = -1
         
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Strategy Signals Created ---")
         
         return df
+
+    @classmethod
+    def sweep_signals(cls, close: np.ndarray, sma: dict) -> np.ndarray:
+        """Batched equivalent of generate_signals for a parameter sweep.
+
+        Args:
+            close (numpy.ndarray): Close prices, shape (n_bars,).
+            sma (dict): Maps each name in ``sweep_windows`` to an (n_combos, n_bars) SMA block.
+
+        Returns:
+            numpy.ndarray: Signals (-1, 0, 1), shape (n_combos, n_bars).
+        """
+        short, long = sma["short_window"], sma["long_window"]
+        return np.where(short > long, 1, np.where(short < long, -1, 0))
+
+    def warm_up(self, df: pd.DataFrame) -> int:
+        self._short_sma = RollingMean(self.short_window).prime(df['Close'])
+        self._long_sma = RollingMean(self.long_window).prime(df['Close'])
+        return self._incremental_signal()
+
+    def update_signal(self, bar: pd.Series) -> int:
+        self._short_sma.update(bar['Close'])
+        self._long_sma.update(bar['Close'])
+        return self._incremental_signal()
+
+    def _incremental_signal(self) -> int:
+        short, long = self._short_sma.value, self._long_sma.value
+        if short > long:
+            return 1
+        if short < long:
+            return -1
+        return 0
         
     def __str__(self):
         return "Trend Following Strategy"
\ No newline at end of file
@@ -1,8 +1,19 @@
+import hashlib
+import json
+import logging
+import os
+from collections import deque
+
+import numpy as np
 import pandas as pd
-from xgboost import XGBClassifier
+
+from .base_strategy import BaseStrategy
+from .rolling_state import EWMState, RollingMean, RollingStd
+
+logger = logging.getLogger(__name__)
 
 # TODO: Add hyperparameter tunning for XGBoost model
-class XGBoostStrategy:
+class XGBoostStrategy(BaseStrategy):
     """Base template for a trading strategy.
 
     Subclass and implement the required methods:
@@ -21,14 +32,62 @@ class XGBoostStrategy:
             def generate_signals(self, df: pd.DataFrame) -> pd.Dataframe:
                 df['signal'] = (df['close'] > df['ma10']).astype(int)
                 return df
+
+    Walk-forward mode:
+        With ``walk_forward=True`` the model is refit every ``refit_every`` bars after the initial
+        ``train_ratio`` split and predicts the following block. The training window is either
+        expanding or the last ``train_window`` bars (``window='rolling'``). Training rows whose
+        ``lookahead_minutes`` target reaches into the predicted block are purged. With
+        ``warm_start=True`` each refit continues from the previous booster, adding
+        ``refit_trees`` trees instead of training from scratch.
+
+    Model persistence:
+        When ``modelPath`` is set it is used as a directory of saved models, keyed by the training
+        data range, feature set and model parameters. Matching models are loaded instead of retrained.
     """
 
-    def __init__(self, lookahead_minutes = 15, train_ratio = 0.8, modelPath = None) -> None:
+    # Feature parameters, shared by generate_features and the incremental update path
+    BB_WINDOW = 20
+    BB_K = 2
+    MACD_FAST = 12
+    MACD_SLOW = 26
+    MACD_SIGNAL = 9
+    RSI_WINDOW = 14
+
+    def __init__(
+        self,
+        lookahead_minutes = 15,
+        train_ratio = 0.8,
+        modelPath = None,
+        walk_forward = False,
+        refit_every = 1000,
+        window = 'expanding',
+        train_window = None,
+        warm_start = True,
+        refit_trees = 20,
+    ) -> None:
+        super().__init__()
+        if window not in ('expanding', 'rolling'):
+            raise ValueError("window must be 'expanding' or 'rolling'")
         self.lookahead_minutes = lookahead_minutes
         self.train_ratio = train_ratio
         self.modelPath = modelPath
-        self.model = XGBClassifier(use_label_encoder=False, eval_metric='logloss')
+        self.walk_forward = walk_forward
+        self.refit_every = refit_every
+        self.window = window
+        self.train_window = train_window
+        self.warm_start = warm_start
+        self.refit_trees = refit_trees
+        # xgboost (and the scikit-learn/scipy stack it loads) is imported only
+        # when a model is actually built.
+        from xgboost import XGBClassifier
+
+        self.model = XGBClassifier(eval_metric='logloss', tree_method='hist')
+        # Every fit starts from these; self.model is replaced by trained (and
+        # possibly warm-started) models whose n_estimators differ.
+        self._base_params = self.model.get_params()
         self.features = []
+        self._is_trained = False
         
     def generate_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Generate and return feature columns for df.
@@ -39,41 +98,45 @@ class XGBoostStrategy:
         Returns:
             pandas.DataFrame: DataFrame with added feature columns.
         """
-        print("--- Creating Strategy Features ---")
+        logger.info("--- Creating Strategy Features ---")
         
         # Bollinger Bands
-        N = 20
-        k = 2
-        df[f'SMA_{N}'] = df['Close'].rolling(window=N).mean()
-        df[f'STD_{N}'] = df['Close'].rolling(window=N).std()
+        N = self.BB_WINDOW
+        k = self.BB_K
+        df[f'SMA_{N}'] = self._sma(df, 'Close', N)
+        df[f'STD_{N}'] = self._std(df, 'Close', N)
         df[f'BBU_{N}_2.0'] = df[f'SMA_{N}'] + (k * df[f'STD_{N}'])
         df[f'BBL_{N}_2.0'] = df[f'SMA_{N}'] - (k * df[f'STD_{N}'])
         
         # MACD
-        MACD_N_fast = 12
-        MACD_N_slow = 26
-        MACD_N_signal = 9
-        df['EMA_fast'] = df['Close'].ewm(span=MACD_N_fast, adjust=False).mean()
-        df['EMA_slow'] = df['Close'].ewm(span=MACD_N_slow, adjust=False).mean()
+        MACD_N_fast = self.MACD_FAST
+        MACD_N_slow = self.MACD_SLOW
+        MACD_N_signal = self.MACD_SIGNAL
+        df['EMA_fast'] = self._ema(df, 'Close', span=MACD_N_fast)
+        df['EMA_slow'] = self._ema(df, 'Close', span=MACD_N_slow)
         df['MACD_Line'] = df['EMA_fast'] - df['EMA_slow']
         df['Signal_Line'] = df['MACD_Line'].ewm(span=MACD_N_signal, adjust=False).mean()
         df[f'MACDh_{MACD_N_fast}_{MACD_N_slow}_{MACD_N_signal}'] = df['MACD_Line'] - df['Signal_Line']
         
         # RSI (EMA)
-        RSI_N = 14
-        df['Change'] = df['Close'].diff()
+        RSI_N = self.RSI_WINDOW
+        df['Change'] = self._feature(df, ('Close', 'diff', 1), lambda: df['Close'].diff())
         df['Gain'] = df['Change'].clip(lower=0)
         df['Loss'] = -df['Change'].clip(upper=0)
         
-        df['Avg_Gain'] = df['Gain'].ewm(com=RSI_N-1, adjust=False).mean()
-        df['Avg_Loss'] = df['Loss'].ewm(com=RSI_N-1, adjust=False).mean()
+        df['Avg_Gain'] = self._feature(
+            df, ('Close', 'rsi_avg_gain', RSI_N), lambda: df['Gain'].ewm(com=RSI_N-1, adjust=False).mean()
+        )
+        df['Avg_Loss'] = self._feature(
+            df, ('Close', 'rsi_avg_loss', RSI_N), lambda: df['Loss'].ewm(com=RSI_N-1, adjust=False).mean()
+        )
         
         df['RS'] = df['Avg_Gain'] / df['Avg_Loss']
         df[f'RSI_{RSI_N}'] = 100 - (100 / (1 + df['RS']))
         
         # Ptc Rolling Returns
-        df['Return_5m'] = df['Close'].pct_change(5)
-        df['Return_15m'] = df['Close'].pct_change(15)
+        df['Return_5m'] = self._feature(df, ('Close', 'pct_change', 5), lambda: df['Close'].pct_change(5))
+        df['Return_15m'] = self._feature(df, ('Close', 'pct_change', 15), lambda: df['Close'].pct_change(15))
         
         self.features = [
             f'BBU_{N}_2.0', f'BBL_{N}_2.0',
@@ -86,7 +149,7 @@ class XGBoostStrategy:
         df['Target_Close'] = df['Close'].shift(-self.lookahead_minutes)
         df['Y_Target'] = (df['Target_Close'] > df['Close']).astype(int)
         
-        print("--- Strategy Features Created ---")
+        logger.info("--- Strategy Features Created ---")
         return df
     
     def generate_signals(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -98,7 +161,7 @@ class XGBoostStrategy:
         Returns:
             pandas.DataFrame: Signals indexed like df (e.g. -1, 0, 1) in a 'Signal' column
         """
-        print("--- Creating Strategy Signals ---")
+        logger.info("--- Creating Strategy Signals ---")
         
         df = df.dropna()
         
@@ -106,39 +169,129 @@ class XGBoostStrategy:
         if split_index <= 0 or split_index >= len(df):
             raise ValueError("Train/test split produced empty dataset; adjust train_ratio or ensure sufficient data")
 
-        df_train = df.iloc[:split_index]
-        df_test = df.iloc[split_index:]
-        self._train(df_train)
+        # Feature matrix is built once and sliced for every (re)fit and prediction
+        X = df[self.features].to_numpy(dtype=np.float32)
+        Y = df['Y_Target'].to_numpy()
 
-        df['Signal'] = 0
-        signals = self._predict(df_test)
-        df.loc[signals.index, 'Signal'] = signals
+        signals = np.zeros(len(df), dtype=int)
+        if self.walk_forward:
+            self._walk_forward(df.index, X, Y, split_index, signals)
+        else:
+            self.model = self._train(df.index, X, Y, 0, split_index)
+            signals[split_index:] = self._predict(X[split_index:])
+
+        df['Signal'] = signals
         
-        print("--- Strategy Signals Created ---")
+        logger.info("--- Strategy Signals Created ---")
         return df
+
+    def _walk_forward(self, index, X, Y, split_index, signals) -> None:
+        train_window = self.train_window or split_index
+        model = None
+        for block_start in range(split_index, len(X), self.refit_every):
+            block_end = min(block_start + self.refit_every, len(X))
+            # Purge rows whose lookahead target is not yet known at block_start
+            train_end = max(block_start - self.lookahead_minutes, 1)
+            train_start = 0 if self.window == 'expanding' else max(train_end - train_window, 0)
+
+            parent = model if self.warm_start else None
+            model = self._train(index, X, Y, train_start, train_end, parent=parent)
+            signals[block_start:block_end] = self._predict(X[block_start:block_end], model)
+
+        self.model = model
     
-    def _train(self, df_train) -> None | str:
-        print(f"Training XGBoost. Dataset Length - {len(df_train)}")
-        
-        X_train = df_train[self.features]
-        Y_train = df_train['Y_Target']
-        
-        self.model.fit(X_train, Y_train)
+    def _train(self, index, X, Y, start, end, parent=None) -> "XGBClassifier":
+        from xgboost import XGBClassifier
+
+        logger.info("Training XGBoost. Dataset Length - %d", end - start)
+
+        params = dict(self._base_params)
+        if parent is not None:
+            params['n_estimators'] = self.refit_trees
+        model = XGBClassifier(**params)
+
+        model_file = self._model_file(index, start, end, params, parent)
+        if model_file is not None and os.path.exists(model_file):
+            model.load_model(model_file)
+            logger.info("Loaded model from %s", model_file)
+        else:
+            booster = parent.get_booster() if parent is not None else None
+            model.fit(X[start:end], Y[start:end], xgb_model=booster)
+            if model_file is not None:
+                os.makedirs(self.modelPath, exist_ok=True)
+                model.save_model(model_file)
+
+        # Remember the key so warm-started children chain to this model's identity
+        model._model_key = model_file
+        self._is_trained = True
         
-        print("Training finished")
-        return
+        logger.info("Training finished")
+        return model
+
+    def _model_file(self, index, start, end, params, parent):
+        if self.modelPath is None:
+            return None
+        payload = json.dumps({
+            'features': self.features,
+            'train_start': str(index[start]),
+            'train_end': str(index[end - 1]),
+            'rows': end - start,
+            'lookahead': self.lookahead_minutes,
+            'params': params,
+            'parent': getattr(parent, '_model_key', None),
+        }, sort_keys=True, default=str)
+        key = hashlib.sha1(payload.encode()).hexdigest()[:16]
+        return os.path.join(self.modelPath, f"xgboost_{key}.json")
                   
-    def _predict(self, df_predict):
-        print(f"Creating Predictions...")
-        
-        X_predict = df_predict[self.features]
-        
-        predictions = self.model.predict(X_predict)
+    def _predict(self, X, model=None) -> np.ndarray:
+        logger.info("Creating Predictions...")
         
-        signals = pd.Series(predictions, index=X_predict.index)
-        signals = signals.replace(0, -1)
+        predictions = (model or self.model).predict(X)
         
-        return signals              
+        return np.where(predictions == 0, -1, predictions)
+
+    def warm_up(self, df: pd.DataFrame) -> int:
+        features = self.generate_features(df.copy())
+        last = features.iloc[-1]
+        closes = df['Close'].to_numpy()
+
+        self._closes = deque(closes[-16:], maxlen=16)
+        self._bb_mean = RollingMean(self.BB_WINDOW).prime(closes)
+        self._bb_std = RollingStd(self.BB_WINDOW).prime(closes)
+        self._ema_fast = EWMState.from_span(self.MACD_FAST, last['EMA_fast'])
+        self._ema_slow = EWMState.from_span(self.MACD_SLOW, last['EMA_slow'])
+        self._signal_line = EWMState.from_span(self.MACD_SIGNAL, last['Signal_Line'])
+        self._avg_gain = EWMState.from_com(self.RSI_WINDOW - 1, last['Avg_Gain'])
+        self._avg_loss = EWMState.from_com(self.RSI_WINDOW - 1, last['Avg_Loss'])
+        return self._predict_row(features[self.features].iloc[[-1]])
+
+    def update_signal(self, bar: pd.Series) -> int:
+        close = float(bar['Close'])
+        change = close - self._closes[-1]
+        self._closes.append(close)
+
+        sma = self._bb_mean.update(close)
+        std = self._bb_std.update(close)
+        macd_line = self._ema_fast.update(close) - self._ema_slow.update(close)
+        signal_line = self._signal_line.update(macd_line)
+        avg_gain = self._avg_gain.update(max(change, 0.0))
+        avg_loss = self._avg_loss.update(max(-change, 0.0))
+        rsi = 100.0 if avg_loss == 0 else 100 - (100 / (1 + avg_gain / avg_loss))
+
+        row = {
+            f'BBU_{self.BB_WINDOW}_2.0': sma + self.BB_K * std,
+            f'BBL_{self.BB_WINDOW}_2.0': sma - self.BB_K * std,
+            f'MACDh_{self.MACD_FAST}_{self.MACD_SLOW}_{self.MACD_SIGNAL}': macd_line - signal_line,
+            f'RSI_{self.RSI_WINDOW}': rsi,
+            'Return_5m': close / self._closes[-6] - 1,
+            'Return_15m': close / self._closes[0] - 1,
+        }
+        return self._predict_row(pd.DataFrame([row])[self.features])
+
+    def _predict_row(self, row: pd.DataFrame) -> int:
+        if not self._is_trained:
+            return 0
+        return 1 if self.model.predict(row.to_numpy(dtype=np.float32))[0] == 1 else -1
      
     def __str__(self):
         return "XGBoost Strategy"
\ No newline at end of file
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.cpp import bridge
+
+
+def _native():
+    try:
+        bridge.load_library()
+    except (FileNotFoundError, OSError) as e:
+        pytest.skip(f"native library unavailable: {e}")
+
+
+def _two_pass(data, window):
+    result = np.full(len(data), np.nan)
+    view = sliding_window_view(data, window)
+    deviations = view - view.mean(axis=1, keepdims=True)
+    result[window - 1:] = np.sqrt((deviations ** 2).sum(axis=1) / (window - 1))
+    return result
+
+
+@pytest.mark.parametrize("window", [2, 3, 5, 20])
+def test_native_stddev_matches_two_pass_at_high_price_level(window):
+    _native()
+    rng = np.random.default_rng(0)
+    # Cent-rounded prices around 30,000 repeat often, so many small windows are flat.
+    data = np.round(30000 * np.cumprod(1 + rng.normal(0, 1e-4, 200_000)), 2)
+    data[1000:1003] = np.nan
+
+    native = bridge.calculate_stddev(data, window, backend="native")
+    exact = _two_pass(data, window)
+
+    assert np.array_equal(np.isnan(native), np.isnan(exact))
+    np.testing.assert_allclose(native, exact, rtol=1e-9, atol=1e-9)
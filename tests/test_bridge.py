@@ -0,0 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.cpp import bridge
+
+
+def test_thread_pools_of_different_sizes_used_concurrently():
+    try:
+        bridge.load_library()
+    except (FileNotFoundError, OSError) as e:
+        pytest.skip(f"native library unavailable: {e}")
+    data = np.random.default_rng(0).normal(size=(16, 5000)).cumsum(axis=1)
+    expected = bridge.calculate_sma(data, 20)
+
+    def call(n_threads):
+        return bridge.calculate_sma(data, 20, n_threads=n_threads)
+
+    with ThreadPoolExecutor(max_workers=8) as callers:
+        results = list(callers.map(call, [2, 3, 4, 5, 6, 7, 8, 9] * 4))
+    for result in results:
+        np.testing.assert_array_equal(result, expected)
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from src.data_pipeline import DataLoader
+from src.data_providers import FrameProvider
+
+
+def _bars(n: int) -> pd.DataFrame:
+    index = pd.date_range("2024-01-01", periods=n, freq="D", tz="UTC", name="Date")
+    close = 100 + np.arange(n, dtype=float)
+    return pd.DataFrame(
+        {"Open": close, "High": close + 1, "Low": close - 1, "Close": close, "Volume": 1000.0}, index=index
+    )
+
+
+def test_refresh_replaces_a_partial_last_bar(tmp_path):
+    final = _bars(5)
+    partial = final.iloc[:3].copy()
+    partial.iloc[-1, partial.columns.get_loc("Close")] = 50.0  # Saved mid-session
+    provider = FrameProvider({"XYZ": partial})
+    loader = DataLoader(data_dir=str(tmp_path), provider=provider, use_cache=False, freq=None)
+    assert loader.refresh("XYZ") == 3
+
+    provider.frames["XYZ"] = final
+    assert loader.refresh("XYZ") == 3
+    assert provider.calls[-1] == ("XYZ", final.index[2])
+
+    stored = pd.read_csv(tmp_path / "XYZ.csv", index_col="Date", parse_dates=["Date"])
+    assert len(stored) == 5
+    np.testing.assert_array_equal(stored["Close"].to_numpy(), final["Close"].to_numpy())
+
+
+def test_refresh_leaves_a_final_last_bar_alone(tmp_path):
+    provider = FrameProvider({"XYZ": _bars(4)})
+    loader = DataLoader(data_dir=str(tmp_path), provider=provider, use_cache=False, freq=None)
+    loader.refresh("XYZ")
+    before = (tmp_path / "XYZ.csv").read_bytes()
+
+    assert loader.refresh("XYZ") == 0
+    assert (tmp_path / "XYZ.csv").read_bytes() == before
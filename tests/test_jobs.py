@@ -0,0 +1,23 @@
+import pytest
+
+from src.engine.jobs import normalize_job
+
+JOB = {"tickers": ["BTC"], "strategies": ["BuyAndHoldStrategy"]}
+
+
+@pytest.mark.parametrize("changes", [
+    {"tickers": ["../data/BTC"]},
+    {"tickers": ["a/b"]},
+    {"strategies": [5]},
+    {"strategies": [{"params": {}}]},
+    {"execution": {"stop_loss": "x"}},
+    {"execution": 5},
+])
+def test_malformed_jobs_raise_value_error(changes):
+    with pytest.raises(ValueError):
+        normalize_job({**JOB, **changes})
+
+
+def test_ticker_symbols():
+    tickers = ["^GSPC", "BRK.B", "EURUSD=X", "BTC-USD"]
+    assert normalize_job({**JOB, "tickers": tickers})["tickers"] == tickers
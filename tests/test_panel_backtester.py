@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from src.engine.panel import Panel
+from src.engine.panel_backtester import PanelBacktester, first_held_bar
+from src.strategies.cross_sectional_momentum import CrossSectionalMomentum
+
+
+def _panel(n_tickers: int, n_bars: int) -> Panel:
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2015-01-01", periods=n_bars, freq="D")
+    frames = {
+        f"T{i}": pd.DataFrame({"Close": 100 * np.cumprod(1 + rng.normal(0, 0.01, n_bars))}, index=index)
+        for i in range(n_tickers)
+    }
+    return Panel.from_frames(frames)
+
+
+def test_dollar_neutral_book_starts_at_first_held_bar():
+    # With 8 tickers the long and short baskets cancel exactly, so net exposure is 0 throughout.
+    panel = _panel(8, 600)
+    strategy = CrossSectionalMomentum(lookback=100, skip=5, quantile=0.25, rebalance=20)
+    backtester = PanelBacktester(panel, [strategy])
+    backtester.run()
+
+    assert np.all(backtester.results.position == 0)
+    assert backtester.results.index[0] == panel.index[101]
+    assert len(backtester.results) == 600 - 101
+
+
+def test_first_held_bar():
+    weights = np.zeros((3, 10))
+    assert first_held_bar(weights) is None
+    weights[1, 4] = np.nan
+    weights[2, 6] = -0.5
+    assert first_held_bar(weights, chunk_size=3) == 7